@@ -1,13 +1,20 @@
 import pywikibot
 import re
 import os
-import requests
+from pywikibot import pagegenerators
 from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
 import time
+import bisect
+from verify import VerdictCache, Verifier
 
 site = pywikibot.Site('en', 'wikipedia')
 max_edits = 50
 edit_counter = 0
+# pages fetched together, and whose URLs are verified together
+batch_pages = 10
+verifier = None
+# url -> (final url, status) for the pages of the current batch
+verified = {}
 
 log_file = os.path.expanduser("~/enwiki/amp/logs/amp_log.txt")
 change_file = os.path.expanduser("~/enwiki/amp/logs/amp_change.txt")
@@ -40,6 +47,102 @@ AMP_KEYWORDS = [
     "-amphtml", "/amphtml", "amphtml/", "?amphtml", "amphtml=", "amphtml?"
 ]
 
+REF_PATTERN = re.compile(r'<ref[^>]*>(.*?)</ref>', re.DOTALL)
+URL_PATTERN = re.compile(r'https?://[^\s|<]+')
+
+# what the template scanner stops at; comments and nowiki bodies are jumped over
+TEMPLATE_TOKEN = re.compile(r'<!--|<nowiki\b[^>]*>|\{\{|\}\}|\[\[|\]\]|\|', re.IGNORECASE)
+NOWIKI_END = re.compile(r'</nowiki\s*>', re.IGNORECASE)
+# url, archive-url, chapter-url, transcript-url, lay-url, archiveurl, url2 ...
+URL_PARAMETER = re.compile(r'[a-z_-]*url\d*$')
+PARAMETER_URL = re.compile(r'\s*(https?://[^\s<>|{}\[\]]+)')
+
+def ref_urls(text):
+    ## (start, end, url) of every URL inside a <ref>...</ref> body, in page order, from one scan
+    for ref in REF_PATTERN.finditer(text):
+        offset = ref.start(1)
+        for match in URL_PATTERN.finditer(ref.group(1)):
+            yield offset + match.start(), offset + match.end(), match.group()
+
+def is_cite_template(name):
+    name = name.replace('_', ' ').strip().lower()
+    if name.startswith('template:'):
+        name = name[len('template:'):].strip()
+    return name.startswith(('cite', 'citation'))
+
+def _cite_parameter(text, template, end):
+    # template: [name start, cite or not (None while the name is read), parameter start]
+    segment = text[template[2]:end]
+    equals = segment.find('=')
+    if equals < 0:
+        return None
+    name = segment[:equals].strip().lower()
+    if not URL_PARAMETER.match(name):
+        return None
+    value = PARAMETER_URL.match(text, template[2] + equals + 1, end)
+    if not value:
+        return None
+    return value.start(1), value.end(1), value.group(1)
+
+def cite_urls(text):
+    ## (start, end, url) of every URL parameter of a {{cite ...}} template, with its exact
+    ## offsets in the wikitext, from one left to right pass; templates nested in a
+    ## parameter and [[links|with pipes]] are kept apart with a stack
+    stack = []
+    pos = 0
+    while True:
+        match = TEMPLATE_TOKEN.search(text, pos)
+        if not match:
+            break
+        start, pos = match.span()
+        token = match.group()
+        top = stack[-1] if stack else None
+        if token == '<!--':
+            end = text.find('-->', pos)
+            pos = len(text) if end < 0 else end + 3
+        elif token[0] == '<':
+            end = NOWIKI_END.search(text, pos)
+            pos = end.end() if end else len(text)
+        elif token == '{{':
+            stack.append([pos, None, pos])
+        elif token == '[[':
+            stack.append(None)
+        elif token == ']]':
+            if None in stack:
+                while stack.pop() is not None:
+                    pass
+        elif token == '}}':
+            while stack and stack[-1] is None:
+                stack.pop()
+            if not stack:
+                continue
+            template = stack.pop()
+            if template[1]:
+                found = _cite_parameter(text, template, start)
+                if found:
+                    yield found
+        elif top is not None:
+            # a pipe of the innermost template: the name or a parameter ends here
+            if top[1] is None:
+                top[1] = is_cite_template(text[top[0]:start])
+            elif top[1]:
+                found = _cite_parameter(text, top, start)
+                if found:
+                    yield found
+            top[2] = pos
+
+def url_spans(text):
+    ## (start, end, url) of the URLs to look at: cite template parameters, then whatever
+    ## else is in a ref; a ref URL overlapping a parameter is the same one read less exactly
+    spans = sorted(cite_urls(text))
+    taken = [(start, end) for start, end, _ in spans]
+    for start, end, url in ref_urls(text):
+        i = bisect.bisect_right(taken, (start, float('inf')))
+        if i and taken[i - 1][1] > start or i < len(taken) and taken[i][0] < end:
+            continue
+        spans.append((start, end, url))
+    return sorted(spans)
+
 def is_amp_url(url):
     parsed_url = urlparse(url)
     if 'amp.' in parsed_url.netloc:
@@ -52,7 +155,7 @@ def is_amp_url(url):
             return True
     return False
 
-def clean_amp_url(url):
+def clean_amp_url(url, verbose=True):
     parsed_url = urlparse(url)
     domain = parsed_url.netloc
     path = parsed_url.path
@@ -61,39 +164,72 @@ def clean_amp_url(url):
     if domain.startswith(('amp.', 'mobile-amp.')) or '.amp.' in domain:
         cleaned_domain = re.sub(r'\b(?:amp|mobile-amp)\.', '', domain).lstrip('.')
         parsed_url = parsed_url._replace(netloc=cleaned_domain)
-        print(f"Subdomain cleaned: {cleaned_domain}")
+        if verbose:
+            print(f"Subdomain cleaned: {cleaned_domain}")
 
     path_patterns = ['/amp/', '-amp/', '/amp-', '-amp', '/amphtml/', '-amphtml', 'amp_articleshow']
     for pattern in path_patterns:
         if pattern in path:
             path = path.replace(pattern, '/')
-            print(f"Path cleaned from '{pattern}': {path}")
+            if verbose:
+                print(f"Path cleaned from '{pattern}': {path}")
 
     if path.endswith('/amp'):
         path = path[:path.rfind('/amp')]
-        print(f"Standalone '/amp' cleaned: {path}")
+        if verbose:
+            print(f"Standalone '/amp' cleaned: {path}")
 
     suffix_patterns = [r'-amp(\.html|\.php|\.asp|\.htm|_section)?$', r'_amp(\.html|\.php)?$', r'amp_articleshow']
     for pattern in suffix_patterns:
         if re.search(pattern, path):
             path = re.sub(pattern, r'\1', path)
-            print(f"Suffix pattern cleaned: {path}")
+            if verbose:
+                print(f"Suffix pattern cleaned: {path}")
 
     parsed_url = parsed_url._replace(path=path)
     cleaned_query = {k: v for k, v in query_params.items() if 'amp' not in k.lower() and v.lower() not in ['amp', 'amphtml']}
     parsed_url = parsed_url._replace(query=urlencode(cleaned_query))
 
     cleaned_url = urlunparse(parsed_url)
-    print(f"Cleaned URL: {cleaned_url}")
+    if verbose:
+        print(f"Cleaned URL: {cleaned_url}")
 
     return cleaned_url
 
 def test_url(url):
-    try:
-        response = requests.head(url, allow_redirects=True, timeout=5)
-        return response.url, response.status_code
-    except requests.RequestException:
-        return url, None
+    ## (final url, status) as verify_pages() found it, or checked now if it was not in the batch
+    if url not in verified:
+        verified.update(verifier.check([url]))
+    return verified[url]
+
+def page_amp_urls(page):
+    ## every AMP URL the page's refs and cite templates hold, with its cleaned form,
+    ## found the same way find_and_replace_amp_links() will look for them
+    pairs = []
+    for _, _, url in url_spans(page.text):
+        if is_amp_url(url):
+            cleaned_url = clean_amp_url(url, verbose=False)
+            if cleaned_url != url:
+                pairs.append((url, cleaned_url))
+    return pairs
+
+def verify_pages(pages):
+    ## checks the original and the cleaned form of every AMP URL of the pages in one go:
+    ## all requests are in flight together, so a batch takes about as long as its slowest URL
+    urls = []
+    for page in pages:
+        try:
+            for url, cleaned_url in page_amp_urls(page):
+                urls.extend((url, cleaned_url))
+        except pywikibot.exceptions.Error as e:
+            # the page is reported when it gets processed
+            print(f"Could not read {page.title()}: {e}")
+    verified.clear()
+    start = time.time()
+    cached, probed = verifier.cached, verifier.probed
+    verified.update(verifier.check(urls))
+    print(f"Verified {len(verified)} URLs of {len(pages)} pages in {time.time() - start:.1f}s "
+          f"({verifier.cached - cached} from the cache, {verifier.probed - probed} requested)")
 
 def clean_amp_url_with_test(url, title):
     ## cleans AMP artifacts from the URL, then verifies if the cleaned URL works
@@ -126,9 +262,9 @@ def clean_amp_url_with_test(url, title):
     if cleaned_status in [301, 302] and cleaned_final_url != original_final_url:
     #if status_code in [301, 302] and final_url != cleaned_url:
         with open(skip_file, "a", encoding="utf-8") as f:
-            f.write(f"* {title}: Skipped (Redirect):\n url: {url}\nfinal url: {final_url}\n(Status: {status_code})\n\n")
+            f.write(f"* {title}: Skipped (Redirect):\n url: {url}\nfinal url: {cleaned_final_url}\n(Status: {cleaned_status})\n\n")
         with open(sink_file, "a", encoding="utf-8") as f:
-            f.write(f"* {title}: Skipped (Redirect):\n url: {url}\nfinal url: {final_url}\n(Status: {status_code})\n\n")
+            f.write(f"* {title}: Skipped (Redirect):\n url: {url}\nfinal url: {cleaned_final_url}\n(Status: {cleaned_status})\n\n")
         return url
 
     # case 4: cleaned URL works, proceed with replacement
@@ -136,54 +272,35 @@ def clean_amp_url_with_test(url, title):
         f.write(f"* {title}\nOld URL: {url}\nCleaned URL: {cleaned_url}\nResponse Status: {cleaned_status}\n\n")
     return cleaned_url
 
-def find_and_replace_amp_links_in_refs(text, title):
-    ref_pattern = re.compile(r'<ref[^>]*>(.*?)</ref>', re.DOTALL)
-    matches = ref_pattern.findall(text)
-
-    changes_made = False
-    updated_text = text
-
-    for ref in matches:
-        print(f"Processing reference")
-        urls_in_ref = re.findall(r'https?://[^\s|<]+', ref)
-        for url in urls_in_ref:
-            if is_amp_url(url):
-                print(f"AMP URL detected: {url}")
-                cleaned_url = clean_amp_url_with_test(url, title)
-                if cleaned_url != url:
-                    updated_ref = ref.replace(url, cleaned_url)
-                    updated_text = updated_text.replace(ref, updated_ref)
-                    print(f"Replaced AMP URL with Cleaned URL: {cleaned_url}")
-                    changes_made = True
-
-    return updated_text, changes_made
-
-def process_templates(page, text):
-    changes_made = False
-    templates = page.templatesWithParams()
-
-    for template, params in templates:
-        template_name = template.title().lower()
-        if template_name.startswith('cite'):
-            for i, param in enumerate(params):
-                if param.startswith('url=') or param.startswith('archive-url='):
-                    key, value = param.split('=', 1)
-                    url = value.strip()
-                    if is_amp_url(url):
-                        cleaned_url = clean_amp_url_with_test(url, page.title())
-                        if cleaned_url != url:
-                            params[i] = f"{key}={cleaned_url}"
-                            changes_made = True
-            updated_template = "{{" + template.title() + "|" + "|".join(params) + "}}"
-            text = text.replace(str(template), updated_template)
-
-    return text, changes_made
+def replace_amp_urls(text, title):
+    ## each URL is replaced where it was found, not wherever the same ref or template text
+    ## appears, and the page is put together once at the end, so a long page costs one pass
+    parts = []
+    last = 0
+    # a URL cited in several refs is checked and logged once
+    decided = {}
+
+    for start, end, url in url_spans(text):
+        if not is_amp_url(url):
+            continue
+        if url not in decided:
+            print(f"AMP URL detected: {url}")
+            decided[url] = clean_amp_url_with_test(url, title)
+        cleaned_url = decided[url]
+        if cleaned_url != url:
+            parts.append(text[last:start])
+            parts.append(cleaned_url)
+            last = end
+            print(f"Replaced AMP URL with Cleaned URL: {cleaned_url}")
+
+    if not parts:
+        return text, False
+    parts.append(text[last:])
+    return ''.join(parts), True
 
 def find_and_replace_amp_links(text, page):
-    updated_text, ref_changes_made = find_and_replace_amp_links_in_refs(text, page.title())
-    updated_text, template_changes_made = process_templates(page, updated_text)
-    changes_made = ref_changes_made or template_changes_made
-    return updated_text, changes_made
+    # refs and cite templates in the same pass, edited in place
+    return replace_amp_urls(text, page.title())
 
 def process_page(page, edit_counter):
 #def process_page(page):
@@ -215,7 +332,7 @@ def process_page(page, edit_counter):
 
 
 def main():
-    global edit_counter
+    global edit_counter, verifier
 
     # path to the file containing article titles (modify this as needed)
     input_file = os.path.join(os.path.expanduser("~"), "enwiki", "amp", "input_file.txt")
@@ -230,22 +347,46 @@ def main():
         print(f"error: no article titles found in {input_file}.")
         return
 
-    # iterate over each article title and process the corresponding page
-    for title in article_titles:
-        if edit_counter >= max_edits:  # check if max_edits has been reached
-            print(f"Reached the maximum limit of {max_edits} edits. Exiting.")
-            with open(log_file, 'a', encoding='utf-8') as f:
-                f.write(f"Reached the maximum limit of {max_edits} edits. Exiting.\n")
-            break  # stop further processing
-
-        try:
-            page = pywikibot.Page(site, title)  # fetch the page by title
-            print(f"Processing page: {page.title()}")
-            edit_counter = process_page(page, edit_counter)  # pass both page and edit_counter
-        except Exception as e:
-            print(f"Error processing page {title}: {e}")
-            with open(log_file, 'a', encoding='utf-8') as f:
-                f.write(f"* Failed to process {title}: {e}\n")
+    # pages are fetched a batch at a time, and the URLs of the whole batch are verified at once
+    # verdicts are kept between runs; the same news sites are cited on thousands of pages
+    cache = VerdictCache()
+    cache.purge()
+    verifier = Verifier(cache=cache)
+    try:
+        for start in range(0, len(article_titles), batch_pages):
+            if edit_counter >= max_edits:
+                break
+            pages = []
+            for title in article_titles[start:start + batch_pages]:
+                # a bad title in the input file is logged and skipped, the rest of the batch goes on
+                try:
+                    pages.append(pywikibot.Page(site, title))
+                except Exception as e:
+                    print(f"Error processing page {title}: {e}")
+                    with open(log_file, 'a', encoding='utf-8') as f:
+                        f.write(f"* Failed to process {title}: {e}\n")
+            pages = list(pagegenerators.PreloadingGenerator(pages))
+            verify_pages(pages)
+
+            # iterate over each page of the batch
+            for page in pages:
+                if edit_counter >= max_edits:  # check if max_edits has been reached
+                    break  # stop further processing
+
+                try:
+                    print(f"Processing page: {page.title()}")
+                    edit_counter = process_page(page, edit_counter)  # pass both page and edit_counter
+                except Exception as e:
+                    print(f"Error processing page {page.title()}: {e}")
+                    with open(log_file, 'a', encoding='utf-8') as f:
+                        f.write(f"* Failed to process {page.title()}: {e}\n")
+    finally:
+        verifier.close()
+
+    if edit_counter >= max_edits:
+        print(f"Reached the maximum limit of {max_edits} edits. Exiting.")
+        with open(log_file, 'a', encoding='utf-8') as f:
+            f.write(f"Reached the maximum limit of {max_edits} edits. Exiting.\n")
 
     # final summary of changes
     print(f"Total pages updated: {edit_counter}")
@@ -0,0 +1,51 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from verify import VerdictCache, Verifier
+
+
+class Handler(BaseHTTPRequestHandler):
+    ## /amp/... redirects to the page without /amp, everything else is there
+    hits = []
+
+    def do_HEAD(self):
+        self.hits.append(self.path)
+        if self.path.startswith('/amp/'):
+            self.send_response(301)
+            self.send_header('Location', self.path[len('/amp'):])
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    Handler.hits = []
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_cleaned_url_is_answered_from_the_original(server, tmp_path):
+    original, cleaned = f"{server}/amp/story", f"{server}/story"
+    verifier = Verifier(cache=VerdictCache(str(tmp_path / 'cache.sqlite')))
+    try:
+        assert verifier.check([original]) == {original: (cleaned, 200)}
+        assert Handler.hits == ['/amp/story', '/story']
+        assert verifier.cache.chain(original) == [original]
+        assert verifier.cache.chain(cleaned) == []
+        # the cleaned url came at the end of the original's chain: no request for it
+        assert verifier.check([cleaned]) == {cleaned: (cleaned, 200)}
+        assert len(Handler.hits) == 2
+        assert (verifier.cached, verifier.probed) == (1, 1)
+    finally:
+        verifier.close()
@@ -0,0 +1,153 @@
+import asyncio
+import os
+import sqlite3
+import time
+
+import aiohttp
+
+cache_file = os.path.expanduser("~/enwiki/amp/url_cache.sqlite")
+
+# seconds to connect, and between bytes once connected (what requests' timeout=5 meant)
+TIMEOUT = 5
+# open connections in all, and to any one host; the rest wait for a free one
+MAX_CONNECTIONS = 32
+PER_HOST = 4
+USER_AGENT = "KiranBOT AMP link check (https://en.wikipedia.org/wiki/User:KiranBOT)"
+# seconds a verdict is reused: a working URL stays working for a while, a failed
+# one (error status or no answer) may be back tomorrow
+POSITIVE_TTL = 30 * 86400
+NEGATIVE_TTL = 86400
+# urls per sqlite query, under its limit on bound parameters
+CHUNK = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS verdicts (
+    url TEXT PRIMARY KEY,
+    final_url TEXT NOT NULL,
+    status INTEGER,
+    chain TEXT NOT NULL,
+    checked REAL NOT NULL
+);
+"""
+
+
+def positive(status):
+    return status is not None and status < 400
+
+
+class VerdictCache:
+    ## (final url, status, redirect chain) per url in sqlite, shared by every run and
+    ## by both urls of an original/cleaned pair; stale verdicts are ignored, then replaced
+
+    def __init__(self, path=cache_file, positive_ttl=POSITIVE_TTL, negative_ttl=NEGATIVE_TTL):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+
+    def close(self):
+        self.db.close()
+
+    def lookup(self, urls, now=None):
+        ## {url: (final url, status)} of the urls with a verdict that is still fresh
+        now = now or time.time()
+        found = {}
+        for start in range(0, len(urls), CHUNK):
+            chunk = urls[start:start + CHUNK]
+            rows = self.db.execute(f"SELECT url, final_url, status, checked FROM verdicts WHERE url IN "
+                                   f"({', '.join('?' * len(chunk))})", chunk)
+            for url, final_url, status, checked in rows:
+                ttl = self.positive_ttl if positive(status) else self.negative_ttl
+                if now - checked < ttl:
+                    found[url] = (final_url, status)
+        return found
+
+    def chain(self, url):
+        row = self.db.execute("SELECT chain FROM verdicts WHERE url = ?", (url,)).fetchone()
+        return row[0].split('\n') if row and row[0] else []
+
+    def store(self, results, now=None):
+        ## results: {url: (final url, status, [urls redirected through])}; every url of
+        ## a chain ends where the first one does, so each gets its verdict too, with
+        ## the chain probing it would have given: itself and the hops after it, and
+        ## none for the final url
+        now = now or time.time()
+        rows = {}
+        for url, (final_url, status, chain) in results.items():
+            rows[url] = (url, final_url, status, '\n'.join(chain), now)
+            hops = [url] + [hop for hop in chain if hop != url] if chain else []
+            for i, hop in enumerate(hops[1:], start=1):
+                if hop != final_url:
+                    rows.setdefault(hop, (hop, final_url, status, '\n'.join(hops[i:]), now))
+            rows.setdefault(final_url, (final_url, final_url, status, '', now))
+        self.db.executemany("INSERT OR REPLACE INTO verdicts (url, final_url, status, chain, checked) "
+                            "VALUES (?, ?, ?, ?, ?)", rows.values())
+        self.db.commit()
+
+    def purge(self, now=None):
+        now = now or time.time()
+        self.db.execute("DELETE FROM verdicts WHERE checked < ? OR (checked < ? AND (status IS NULL OR status >= 400))",
+                        (now - self.positive_ttl, now - self.negative_ttl))
+        self.db.commit()
+
+
+class Verifier:
+    ## HEAD requests for many URLs at once over one pooled session; connections
+    ## are kept alive between batches, so the next page reuses them, and with a
+    ## cache a URL verified lately costs no request at all
+
+    def __init__(self, max_connections=MAX_CONNECTIONS, per_host=PER_HOST, timeout=TIMEOUT, cache=None):
+        self.loop = asyncio.new_event_loop()
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.timeout = timeout
+        self.cache = cache
+        self.session = None
+        # urls answered from the cache and sent out, since the start
+        self.cached = 0
+        self.probed = 0
+
+    async def _open(self):
+        connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.per_host,
+                                         ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, headers={'User-Agent': USER_AGENT})
+
+    async def _probe(self, url):
+        try:
+            async with self.session.head(url, allow_redirects=True) as response:
+                return str(response.url), response.status, [str(hop.url) for hop in response.history]
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            return url, None, []
+
+    async def _probe_all(self, urls):
+        if self.session is None:
+            self.session = await self._open()
+        return await asyncio.gather(*(self._probe(url) for url in urls))
+
+    def check(self, urls):
+        ## {url: (final url, status)} like requests.head(url, allow_redirects=True),
+        ## status None when the request failed; all of them in flight together
+        urls = list(dict.fromkeys(urls))
+        found = self.cache.lookup(urls) if self.cache is not None else {}
+        missing = [url for url in urls if url not in found]
+        self.cached += len(found)
+        self.probed += len(missing)
+        if missing:
+            results = dict(zip(missing, self.loop.run_until_complete(self._probe_all(missing))))
+            if self.cache is not None:
+                self.cache.store(results)
+            for url, (final_url, status, _) in results.items():
+                found[url] = (final_url, status)
+        return found
+
+    def close(self):
+        if self.session is not None:
+            self.loop.run_until_complete(self.session.close())
+            self.session = None
+        self.loop.close()
+        if self.cache is not None:
+            self.cache.close()
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+
+from dump import iter_sample
+from fixengine import (FixEngine, apply_plain, compile_rules, fixes_file, handle_args, load_fixes,
+                       plain_tuples)
+
+baseline_file = os.path.expanduser("~/mrwiki/bench/baseline.json")
+
+# the synthetic corpus only depends on these and the fix file, so two runs on
+# the same machine measure the same work
+SEED = 20221005
+PAGES = 400
+# share of words replaced by a typo the fix set knows
+TYPO_RATE = 0.01
+REPEAT = 3
+# compiled pages/sec this much below the baseline fails the run
+TOLERANCE = 0.2
+
+WORDS = """
+आहे आणि हे ते या त्या एक होते होता होती म्हणून मध्ये येथे गाव शहर जिल्हा तालुका राज्य भारत
+महाराष्ट्र लोकसंख्या नदी पुणे मुंबई नागपूर इतिहास वर्ष साली जन्म मृत्यू चित्रपट लेखक कवी गायक
+खेळाडू संघ क्रिकेट भाषा मराठी हिंदी इंग्रजी शाळा महाविद्यालय विद्यापीठ सरकार मंत्री निवडणूक पक्ष
+कार्य प्रसिद्ध मोठे लहान नवीन जुने पहिले दुसरे काही सर्व अनेक प्रमुख स्थापना केली झाली झाले आले
+गेले दिले घेतले मिळाले पुरस्कार नाव नावाने ओळखले जाते जातो असून असलेला असलेल्या येथील वसलेले
+क्षेत्रफळ किमी उत्तर दक्षिण पूर्व पश्चिम दिशेला जवळ पासून पर्यंत साठी नंतर पूर्वी वेळी दरम्यान
+त्यांनी त्यांचे त्यांची त्यांच्या मंदिर किल्ला डोंगर समुद्र शेती पीक ऊस कापूस तांदूळ व्यापार उद्योग
+""".split()
+HEADINGS = ['इतिहास', 'भूगोल', 'लोकजीवन', 'कारकीर्द', 'संदर्भ', 'बाह्य दुवे']
+CATEGORIES = ['महाराष्ट्रातील गावे', 'मराठी लेखक', 'भारतीय क्रिकेट खेळाडू', 'मराठी चित्रपट']
+DIGITS = '०१२३४५६७८९'
+
+
+def _number(rnd, digits):
+    return ''.join(rnd.choice(DIGITS) for _ in range(digits))
+
+
+def synthetic_corpus(fixes, pages=PAGES, seed=SEED, typo_rate=TYPO_RATE):
+    ## [(title, text)] of wiki-looking Marathi pages with the fix set's own
+    ## typos sprinkled in; the same arguments always give the same pages
+    rnd = random.Random(seed)
+    typos = sorted({rule.literal for rule in compile_rules(fixes) if rule.literal is not None})
+    corpus = []
+    for number in range(pages):
+        title = f"{rnd.choice(WORDS)} {rnd.choice(WORDS)} {number}"
+        parts = [f"{{{{माहितीचौकट | नाव = {title} | वर्ष = {_number(rnd, 4)} }}}}\n"]
+        for section in range(rnd.randint(1, 5)):
+            if section:
+                parts.append(f"\n== {rnd.choice(HEADINGS)} ==\n")
+            for _ in range(rnd.randint(2, 12)):
+                sentence = []
+                for _ in range(rnd.randint(4, 18)):
+                    if rnd.random() < typo_rate and typos:
+                        # the spaces between words stand in for the padding
+                        sentence.append(rnd.choice(typos).strip(' '))
+                    elif rnd.random() < 0.06:
+                        word = rnd.choice(WORDS)
+                        sentence.append(f"[[{word}]]" if rnd.random() < 0.5 else f"[[{word}|{rnd.choice(WORDS)}]]")
+                    elif rnd.random() < 0.03:
+                        sentence.append(_number(rnd, rnd.randint(1, 4)))
+                    else:
+                        sentence.append(rnd.choice(WORDS))
+                text = ' '.join(sentence) + rnd.choice(['.', '.', '.', ',', '!'])
+                if rnd.random() < 0.1:
+                    text += (f"<ref>{{{{संकेतस्थळ स्रोत | url = https://example.org/{_number(rnd, 6)} "
+                             f"| title = {rnd.choice(WORDS)} }}}}</ref>")
+                parts.append(text + ' ')
+        parts.append(f"\n\n[[वर्ग:{rnd.choice(CATEGORIES)}]]\n")
+        corpus.append((title, ''.join(parts)))
+    return corpus
+
+
+def _best(function, repeat):
+    best = None
+    output = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output
+
+
+def run(fixes, lines, texts, groups=None, repeat=REPEAT):
+    ## {group: row} with pages/sec and MB/sec of both engines and the number of
+    ## pages whose output differs; the row for '*' runs all the groups in order
+    groups = groups or list(fixes)
+    megabytes = sum(len(text.encode('utf-8')) for text in texts) / 1e6
+    results = {}
+    for group in groups + ['*']:
+        rules = compile_rules(fixes, groups if group == '*' else [group], lines)
+        engine = FixEngine(rules, fixes)
+        # the reference, one replaceExcept pass per tuple; its patterns are compiled beforehand
+        tuples = plain_tuples(rules)
+        naive_time, naive = _best(lambda: [apply_plain(text, rules, tuples)[0] for text in texts], repeat)
+        compiled_time, compiled = _best(lambda: [engine.apply(text)[0] for text in texts], repeat)
+        results[group] = {
+            'tuples': len(rules),
+            'naive_pages': len(texts) / naive_time,
+            'naive_mb': megabytes / naive_time,
+            'compiled_pages': len(texts) / compiled_time,
+            'compiled_mb': megabytes / compiled_time,
+            'changed': sum(1 for before, after in zip(texts, compiled) if before != after),
+            'differ': sum(1 for a, b in zip(naive, compiled) if a != b),
+        }
+    return results
+
+
+def report(results, baseline=None, tolerance=TOLERANCE, out=sys.stdout):
+    ## prints the table; returns the groups that failed (output differs or got slower)
+    failed = []
+    out.write(f"{'group':<10} {'tuples':>6} {'naive p/s':>10} {'MB/s':>6} {'compiled p/s':>13} {'MB/s':>6} "
+              f"{'speedup':>7} {'changed':>7}  check\n")
+    for group, row in results.items():
+        notes = []
+        if row['differ']:
+            notes.append(f"{row['differ']} pages DIFFER")
+        old = (baseline or {}).get(group)
+        if old and row['compiled_pages'] < old['compiled_pages'] * (1 - tolerance):
+            notes.append(f"REGRESSION ({row['compiled_pages'] / old['compiled_pages'] - 1:+.0%} vs baseline)")
+        if notes:
+            failed.append(group)
+        out.write(f"{group:<10} {row['tuples']:6} {row['naive_pages']:10.1f} {row['naive_mb']:6.2f} "
+                  f"{row['compiled_pages']:13.1f} {row['compiled_mb']:6.2f} "
+                  f"{row['compiled_pages'] / row['naive_pages']:6.1f}x {row['changed']:7}  "
+                  f"{', '.join(notes) or 'ok'}\n")
+    return failed
+
+
+def main():
+    options, positional = handle_args(sys.argv[1:])
+    path = os.path.expanduser(options.get('fixes', fixes_file))
+    fixes, lines = load_fixes(path)
+    groups = options['fix'] or None
+    if positional:
+        # a dump or a directory of .txt pages instead of the synthetic corpus
+        limit = int(options.get('limit', PAGES))
+        texts = []
+        for page in iter_sample(positional[0]):
+            texts.append(page.text)
+            if len(texts) >= limit:
+                break
+        corpus_name = f"{positional[0]} ({len(texts)} pages)"
+    else:
+        corpus = synthetic_corpus(fixes, int(options.get('pages', PAGES)), int(options.get('seed', SEED)))
+        texts = [text for _, text in corpus]
+        digest = hashlib.sha256('\0'.join(texts).encode('utf-8')).hexdigest()[:12]
+        corpus_name = f"synthetic seed {options.get('seed', SEED)} ({len(texts)} pages, {digest})"
+    print(f"corpus: {corpus_name}, {sum(len(t.encode('utf-8')) for t in texts) / 1e6:.1f} MB")
+
+    results = run(fixes, lines, texts, groups, int(options.get('repeat', REPEAT)))
+
+    # baselines only make sense for the same corpus on the same machine
+    baseline_path = os.path.expanduser(options.get('baseline', baseline_file))
+    baseline = None
+    if os.path.exists(baseline_path) and 'save' not in options:
+        with open(baseline_path, encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved.get('corpus') == corpus_name:
+            baseline = saved['results']
+        else:
+            print(f"baseline {baseline_path} is for {saved.get('corpus')}, not compared")
+    failed = report(results, baseline, float(options.get('tolerance', TOLERANCE)))
+
+    if 'save' in options:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump({'corpus': corpus_name, 'saved': time.strftime('%Y-%m-%d %H:%M:%S'), 'results': results},
+                      f, ensure_ascii=False, indent=1)
+        print(f"baseline saved to {baseline_path}")
+    if failed:
+        print(f"FAILED: {' '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
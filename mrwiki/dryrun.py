@@ -0,0 +1,174 @@
+import difflib
+import json
+import os
+import sys
+import time
+
+from dump import iter_pages
+from fixcache import load_engine
+from fixengine import fixes_file, handle_args
+from parallelscan import run_parallel
+from wikimask import SEPARATOR, ProseView, prose_text, splice
+
+dump_file = os.path.expanduser("~/mrwiki/dump/mrwiki-latest-pages-articles.xml.bz2")
+dryrun_dir = os.path.expanduser("~/mrwiki/dryrun")
+
+# pages written out per rule; the rest are only counted
+CAP = 50
+# characters of context on each side of a snippet, and at most this many more to reach a space
+CONTEXT = 40
+SLACK = 20
+# snippets per rule and page
+SNIPPETS = 2
+
+
+def rule_name(rule):
+    return f"{rule.group}[{rule.position}]"
+
+
+def _occurrences(rule, text):
+    ## (start, end) of the first matches of the rule in the unchanged text;
+    ## tuples that only match what an earlier tuple wrote have none
+    found = []
+    if rule.literal is None:
+        for match in rule.compiled().finditer(text):
+            found.append(match.span())
+            if len(found) >= SNIPPETS:
+                break
+        return found
+    needle = rule.word if rule.word is not None else rule.literal
+    start = text.find(needle)
+    while start >= 0 and len(found) < SNIPPETS:
+        found.append((start, start + len(needle)))
+        start = text.find(needle, start + len(needle))
+    return found
+
+
+def _window(text, start, end):
+    left = max(0, start - CONTEXT)
+    space = text.rfind(' ', max(0, left - SLACK), left)
+    if space >= 0:
+        left = space + 1
+    right = min(len(text), end + CONTEXT)
+    space = text.find(' ', right, right + SLACK)
+    if space >= 0:
+        right = space
+    return left, right
+
+
+def dry_page(engine, text, groups=None, prose=False, diff=False):
+    ## what the fixes would do to one page: None, or {'counts': {index: n},
+    ## 'snippets': {index: [(before, after)]}, 'diff': text or None}
+    work, spans = prose_text(text) if prose else (text, None)
+    new_work, counts = engine.apply(work, groups, view=ProseView(text, spans) if prose else None)
+    if new_work == work:
+        return None
+    snippets = {}
+    for index in counts:
+        for start, end in _occurrences(engine.rules[index], work):
+            left, right = _window(work, start, end)
+            before = work[left:right]
+            after = engine.apply(before, groups)[0]
+            # where masked markup was cut out
+            snippets.setdefault(index, []).append(
+                (before.replace(SEPARATOR, '⟦…⟧'), after.replace(SEPARATOR, '⟦…⟧')))
+    unified = None
+    if diff:
+        new_text = splice(text, spans, new_work) if prose else new_work
+        unified = '\n'.join(difflib.unified_diff(text.splitlines(), new_text.splitlines(), 'old', 'new', n=0,
+                                                 lineterm=''))
+    return {'counts': counts, 'snippets': snippets, 'diff': unified}
+
+
+def dry_run(path, out, groups=None, cap=CAP, limit=None, workers=1, prose=False, diff=False):
+    engine = load_engine(fixes_file, groups)
+    rules = engine.rules
+    # per rule: pages, replacements, pages written out
+    totals = {}
+    pages = changed = written = 0
+    start = time.perf_counter()
+
+    def dump_pages():
+        for number, page in enumerate(iter_pages(path), start=1):
+            yield page
+            if limit and number >= limit:
+                break
+
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        for page, found in run_parallel(engine, dump_pages(), dry_page, (groups, prose, diff), workers):
+            pages += 1
+            if pages % 10000 == 0:
+                print(f"{pages} pages, {changed} would change, {written} written "
+                      f"({pages / (time.perf_counter() - start):.0f} pages/sec)")
+            if found is None:
+                continue
+            changed += 1
+            shown = []
+            for index, count in sorted(found['counts'].items()):
+                row = totals.setdefault(index, [0, 0, 0])
+                row[0] += 1
+                row[1] += count
+                if row[2] < cap:
+                    row[2] += 1
+                    shown.append(index)
+            if not shown:
+                # every rule on this page already has its share of examples
+                continue
+            record = {
+                'title': page.title,
+                'revid': page.revid,
+                'rules': [{'rule': rule_name(rules[index]), 'old': rules[index].old, 'new': rules[index].new,
+                           'count': count} for index, count in sorted(found['counts'].items())],
+                'snippets': [{'rule': rule_name(rules[index]), 'before': before, 'after': after}
+                             for index in shown for before, after in found['snippets'].get(index, [])],
+            }
+            if found['diff'] is not None:
+                record['diff'] = found['diff']
+            f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+            written += 1
+
+    elapsed = time.perf_counter() - start
+    # one line per rule that fired, in fix file order, for a quick look at the whole run
+    with open(os.path.splitext(out)[0] + '.rules.tsv', 'w', encoding='utf-8') as f:
+        f.write("rule\tline\told\tnew\tpages\treplacements\twritten\n")
+        for index in sorted(totals):
+            rule = rules[index]
+            f.write(f"{rule_name(rule)}\t{rule.lineno or ''}\t{rule.old}\t{rule.new}\t"
+                    f"{totals[index][0]}\t{totals[index][1]}\t{totals[index][2]}\n")
+    per_group = {}
+    for index, (_, replacements, _) in totals.items():
+        row = per_group.setdefault(rules[index].group, [0, 0])
+        row[0] += 1
+        row[1] += replacements
+    for group in dict.fromkeys(rule.group for rule in rules):
+        if group in per_group:
+            print(f"{group}: {per_group[group][0]} rules fired, {per_group[group][1]} replacements")
+    capped = sum(1 for row in totals.values() if row[0] > cap)
+    print(f"{pages} pages in {elapsed:.0f}s, {changed} would change, {written} records in {out}"
+          f" ({capped} rules hit the cap of {cap})")
+    return totals
+
+
+def main():
+    options, positional = handle_args(sys.argv[1:])
+    path = positional[0] if positional else dump_file
+    if not os.path.exists(path):
+        print(f"error: dump not found: {path}")
+        return
+    groups = options['fix'] or None
+    out = options.get('out') or os.path.join(dryrun_dir, f"{'-'.join(groups) if groups else 'all'}.jsonl")
+    dry_run(
+        path,
+        os.path.expanduser(out),
+        groups=groups,
+        cap=int(options.get('cap', CAP)),
+        limit=int(options['limit']) if 'limit' in options else None,
+        workers=int(options.get('workers', 1)),
+        prose='prose' in options,
+        diff='diff' in options,
+    )
+
+
+if __name__ == "__main__":
+    main()
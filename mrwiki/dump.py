@@ -0,0 +1,68 @@
+import bz2
+import os
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+
+DumpPage = namedtuple('DumpPage', ['title', 'ns', 'pageid', 'revid', 'timestamp', 'text'])
+
+
+def _local(tag):
+    # strip the export-0.xx namespace from the tag name
+    return tag.rsplit('}', 1)[-1]
+
+
+def open_dump(path):
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def iter_pages(path, namespaces=(0,), redirects=False):
+    ## streams pages from a pages-articles dump (.xml or .xml.bz2), one page in memory at a time
+    with open_dump(path) as f:
+        context = ET.iterparse(f, events=('start', 'end'))
+        _, root = next(context)
+        for event, elem in context:
+            if event != 'end' or _local(elem.tag) != 'page':
+                continue
+            fields = {}
+            is_redirect = False
+            for child in elem:
+                name = _local(child.tag)
+                if name == 'redirect':
+                    is_redirect = True
+                elif name == 'revision':
+                    for rev_child in child:
+                        rev_name = _local(rev_child.tag)
+                        if rev_name in ('id', 'timestamp', 'text'):
+                            fields['rev_' + rev_name] = rev_child.text
+                else:
+                    fields[name] = child.text
+            # clear the finished page so memory stays flat over the whole dump
+            root.clear()
+            ns = int(fields.get('ns') or 0)
+            if namespaces is not None and ns not in namespaces:
+                continue
+            if is_redirect and not redirects:
+                continue
+            yield DumpPage(
+                title=fields.get('title') or '',
+                ns=ns,
+                pageid=int(fields.get('id') or 0),
+                revid=int(fields.get('rev_id') or 0),
+                timestamp=fields.get('rev_timestamp') or '',
+                text=fields.get('rev_text') or '',
+            )
+
+
+def iter_sample(path, namespaces=(0,)):
+    ## a sample is either a dump file or a directory of plain .txt pages (file name = title)
+    if not os.path.isdir(path):
+        yield from iter_pages(path, namespaces=namespaces)
+        return
+    for number, name in enumerate(sorted(os.listdir(path)), start=1):
+        if not name.endswith('.txt'):
+            continue
+        with open(os.path.join(path, name), encoding='utf-8') as f:
+            text = f.read()
+        yield DumpPage(title=name[:-4], ns=0, pageid=number, revid=0, timestamp='', text=text)
@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+
+from dump import iter_pages
+from fixcache import load_engine
+from fixengine import fixes_file, handle_args
+from parallelscan import run_parallel
+from wikimask import prose_view
+
+dump_file = os.path.expanduser("~/mrwiki/dump/mrwiki-latest-pages-articles.xml.bz2")
+candidates_dir = os.path.expanduser("~/mrwiki/candidates")
+
+
+def scan_page(engine, text, groups, prose=False):
+    ## {group: number of replacements} for every group that would change the page,
+    ## each group evaluated on its own as a separate `-fix:` run would; with
+    ## `prose` only the text outside templates, refs, links' targets etc. counts
+    view = None
+    if prose:
+        text, view = prose_view(text)
+    hits = engine.detect(text)
+    hit_groups = {engine.rules[index].group for index in hits}
+    hit_groups.update(engine.rules[index].group for index in engine.ungated)
+    hit_groups.update(engine.rules[index].group for index in engine.passes)
+    result = {}
+    for group in groups:
+        if group not in hit_groups:
+            continue
+        new_text, counts = engine.apply(text, groups=[group], hits=hits, view=view)
+        if new_text != text:
+            result[group] = sum(counts.values())
+    return result
+
+
+def scan_dump(path, groups=None, out_dir=candidates_dir, limit=None, workers=1, prose=False):
+    engine = load_engine(fixes_file, groups)
+    if groups is None:
+        groups = list(dict.fromkeys(rule.group for rule in engine.rules))
+    os.makedirs(out_dir, exist_ok=True)
+
+    # one list per group, [[title]] lines so pywikibot's -file: can read them as they are
+    outputs = {group: open(os.path.join(out_dir, f"{group}.txt"), "w", encoding="utf-8") for group in groups}
+    totals = {group: [0, 0] for group in groups}
+    pages = 0
+    start = time.perf_counter()
+
+    def dump_pages():
+        for number, page in enumerate(iter_pages(path), start=1):
+            yield page
+            if limit and number >= limit:
+                break
+
+    try:
+        # results come back in dump order whatever the number of workers
+        for page, found in run_parallel(engine, dump_pages(), scan_page, (groups, prose), workers):
+            pages += 1
+            for group, count in found.items():
+                outputs[group].write(f"[[{page.title}]]\t{count}\n")
+                totals[group][0] += 1
+                totals[group][1] += count
+            if pages % 10000 == 0:
+                print(f"{pages} pages scanned ({pages / (time.perf_counter() - start):.0f} pages/sec)")
+    finally:
+        for f in outputs.values():
+            f.close()
+
+    elapsed = time.perf_counter() - start
+    with open(os.path.join(out_dir, "scan_log.txt"), "a", encoding="utf-8") as f:
+        f.write(f"* {time.strftime('%Y-%m-%d %H:%M:%S')} scanned {pages} pages of {path} in {elapsed:.0f}s"
+                f" with {workers} workers{', prose only' if prose else ''}\n")
+        for group in groups:
+            f.write(f"** {group}: {totals[group][0]} pages, {totals[group][1]} replacements\n")
+    for group in groups:
+        print(f"{group}: {totals[group][0]} pages, {totals[group][1]} replacements")
+    print(f"{pages} pages in {elapsed:.0f}s, lists written to {out_dir}")
+    return totals
+
+
+def main():
+    options, positional = handle_args(sys.argv[1:])
+    path = positional[0] if positional else dump_file
+    if not os.path.exists(path):
+        print(f"error: dump not found: {path}")
+        return
+    scan_dump(
+        path,
+        groups=options['fix'] or None,
+        out_dir=os.path.expanduser(options.get('out', candidates_dir)),
+        limit=int(options['limit']) if 'limit' in options else None,
+        workers=int(options.get('workers', 1)),
+        prose='prose' in options,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import math
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+
+from dump import iter_pages
+from dumpscan import dump_file, scan_page
+from fixcache import load_engine
+from fixengine import fixes_file, handle_args
+from parallelscan import run_parallel
+
+queue_file = os.path.expanduser("~/mrwiki/queue/edits.sqlite")
+
+# value = log(1 + corrections) * (1 + log(1 + views)) * (1 + RECENCY * 0.5 ** (age / HALF_LIFE)):
+# corrections decide, views multiply, and a page edited lately gets up to RECENCY more
+RECENCY = 1.0
+HALF_LIFE_DAYS = 30
+# pages handed to a bot run that never came back (crash, kill) are pending again after this
+TAKEN_TIMEOUT = 3600
+# a page that failed to save this many times is given up on
+MAX_ATTEMPTS = 3
+# project codes of mrwiki in the pageviews dumps (desktop and mobile)
+PAGEVIEW_PROJECTS = {'mr', 'mr.m', 'mr.wikipedia', 'mr.m.wikipedia'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue (
+    title TEXT PRIMARY KEY,
+    revid INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    corrections INTEGER NOT NULL,
+    groups TEXT NOT NULL,
+    views INTEGER NOT NULL DEFAULT 0,
+    score REAL NOT NULL DEFAULT 0,
+    state TEXT NOT NULL DEFAULT 'pending',
+    taken REAL,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS queue_state_score ON queue (state, score);
+"""
+
+
+def page_value(corrections, views, timestamp, now=None):
+    now = now or time.time()
+    try:
+        edited = datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc).timestamp()
+        age = max(0.0, (now - edited) / 86400)
+        recency = 0.5 ** (age / HALF_LIFE_DAYS)
+    except ValueError:
+        recency = 0.0
+    return math.log1p(corrections) * (1 + math.log1p(views)) * (1 + RECENCY * recency)
+
+
+class EditQueue:
+    ## candidate pages ranked by value, kept in sqlite so a cron run can take
+    ## the next few and the rest waits for the next run, across restarts
+
+    def __init__(self, path=queue_file):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        now = time.time()
+        self.db.create_function('page_value', 3, lambda c, v, t: page_value(c, v, t, now))
+        # whatever an interrupted run had taken goes back in line
+        self.db.execute("UPDATE queue SET state = 'pending', taken = NULL WHERE state = 'taken' AND taken < ?",
+                        (now - TAKEN_TIMEOUT,))
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    def rescore(self):
+        ## recency moves with the clock, so every fill and views update scores everything again
+        self.db.execute("UPDATE queue SET score = page_value(corrections, views, timestamp)")
+        self.db.commit()
+
+    def fill(self, pages, complete=True, groups=None):
+        ## pages: (title, revid, timestamp, corrections, groups) of every page the
+        ## fixes would change; with `complete` pending pages missing from it are
+        ## dropped (fixed by hand since); returns (added, updated, dropped).
+        ## `groups` says the scan only ran those groups: what other groups
+        ## found stays, and a missing page only loses the groups scanned
+        refilled = set(groups or ())
+        known = {title: (revid, state, stored.split()) for title, revid, state, stored in
+                 self.db.execute("SELECT title, revid, state, groups FROM queue")}
+        seen = set()
+        added = updated = 0
+        for title, revid, timestamp, corrections, found in pages:
+            seen.add(title)
+            old = known.get(title)
+            if old is not None and refilled:
+                found = list(dict.fromkeys([group for group in old[2] if group not in refilled] + list(found)))
+            if old is None:
+                self.db.execute("INSERT INTO queue (title, revid, timestamp, corrections, groups) VALUES (?, ?, ?, ?, ?)",
+                                (title, revid, timestamp, corrections, ' '.join(found)))
+                added += 1
+            elif old[0] != revid:
+                # a new revision: whatever happened to the old one, look again
+                self.db.execute("UPDATE queue SET revid = ?, timestamp = ?, corrections = ?, groups = ?, "
+                                "state = 'pending', taken = NULL, attempts = 0 WHERE title = ?",
+                                (revid, timestamp, corrections, ' '.join(found), title))
+                updated += 1
+            else:
+                # same revision, maybe another fix set
+                self.db.execute("UPDATE queue SET corrections = ?, groups = ? WHERE title = ?",
+                                (corrections, ' '.join(found), title))
+        dropped = 0
+        if complete:
+            for title, (_, state, stored) in known.items():
+                if title in seen or state != 'pending':
+                    continue
+                left = [group for group in stored if group not in refilled] if refilled else []
+                if left:
+                    self.db.execute("UPDATE queue SET groups = ? WHERE title = ?", (' '.join(left), title))
+                else:
+                    self.db.execute("DELETE FROM queue WHERE title = ?", (title,))
+                    dropped += 1
+        self.rescore()
+        return added, updated, dropped
+
+    def update_views(self, path):
+        ## pageviews from a dump file ("mr.wikipedia Title 12 0" lines, hourly or
+        ## daily) or a plain "title<TAB>views" file; only queued titles are kept
+        titles = {row[0] for row in self.db.execute("SELECT title FROM queue")}
+        views = {}
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if '\t' in line:
+                    title, _, count = line.rstrip('\n').rpartition('\t')
+                else:
+                    parts = line.split(' ')
+                    if len(parts) < 3 or parts[0] not in PAGEVIEW_PROJECTS:
+                        continue
+                    title, count = parts[1].replace('_', ' '), parts[2]
+                if title in titles and count.strip().isdigit():
+                    views[title] = views.get(title, 0) + int(count)
+        self.db.executemany("UPDATE queue SET views = ? WHERE title = ?", ((count, title) for title, count in views.items()))
+        self.rescore()
+        return len(views)
+
+    def take(self, batch=50):
+        ## yields titles, best first, marking each as taken; finish() settles it
+        while True:
+            rows = self.db.execute("SELECT title FROM queue WHERE state = 'pending' ORDER BY score DESC LIMIT ?",
+                                   (batch,)).fetchall()
+            if not rows:
+                return
+            now = time.time()
+            self.db.executemany("UPDATE queue SET state = 'taken', taken = ? WHERE title = ?",
+                                ((now, title) for title, in rows))
+            self.db.commit()
+            for title, in rows:
+                yield title
+
+    def finish(self, title, state):
+        ## 'done' (saved), 'skipped' (nothing left to fix) or 'failed' (tried again
+        ## later, up to MAX_ATTEMPTS times)
+        if state == 'failed':
+            self.db.execute("UPDATE queue SET attempts = attempts + 1, taken = NULL, "
+                            "state = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END WHERE title = ?",
+                            (MAX_ATTEMPTS, title))
+        else:
+            self.db.execute("UPDATE queue SET state = ?, taken = NULL WHERE title = ?", (state, title))
+        self.db.commit()
+
+    def release(self):
+        ## taken but never finished in this run (the bot stopped early)
+        self.db.execute("UPDATE queue SET state = 'pending', taken = NULL WHERE state = 'taken'")
+        self.db.commit()
+
+    def counts(self):
+        return dict(self.db.execute("SELECT state, COUNT(*) FROM queue GROUP BY state"))
+
+    def top(self, n=20):
+        return self.db.execute("SELECT title, score, corrections, views, timestamp, groups FROM queue "
+                               "WHERE state = 'pending' ORDER BY score DESC LIMIT ?", (n,)).fetchall()
+
+
+def scan_candidates(path, groups=None, limit=None, workers=1, prose=False):
+    ## (title, revid, timestamp, corrections, groups) of every page of the dump the fixes would change
+    engine = load_engine(fixes_file, groups)
+    if groups is None:
+        groups = list(dict.fromkeys(rule.group for rule in engine.rules))
+
+    def dump_pages():
+        for number, page in enumerate(iter_pages(path), start=1):
+            yield page
+            if limit and number >= limit:
+                break
+
+    for page, found in run_parallel(engine, dump_pages(), scan_page, (groups, prose), workers):
+        if found:
+            yield page.title, page.revid, page.timestamp, sum(found.values()), list(found)
+
+
+def main():
+    options, positional = handle_args(sys.argv[1:])
+    queue = EditQueue(os.path.expanduser(options.get('queue', queue_file)))
+    try:
+        if 'fill' in options:
+            path = positional[0] if positional else dump_file
+            limit = int(options['limit']) if 'limit' in options else None
+            start = time.perf_counter()
+            added, updated, dropped = queue.fill(
+                scan_candidates(path, options['fix'] or None, limit, int(options.get('workers', 1)), 'prose' in options),
+                complete=limit is None, groups=options['fix'] or None)
+            print(f"{added} pages added, {updated} new revisions, {dropped} dropped "
+                  f"in {time.perf_counter() - start:.0f}s")
+        if 'views' in options:
+            print(f"views for {queue.update_views(os.path.expanduser(options['views']))} queued pages")
+        for title, score, corrections, views, timestamp, groups in queue.top(int(options.get('show', 20))):
+            print(f"{score:7.2f}  [[{title}]]  {corrections} corrections, {views} views, {timestamp[:10]}, {groups}")
+        print(', '.join(f"{count} {state}" for state, count in sorted(queue.counts().items())) or "queue is empty")
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import os
+import sys
+import time
+
+import pywikibot
+from pywikibot import pagegenerators
+
+from dumpscan import candidates_dir
+from editqueue import EditQueue, queue_file
+from fixcache import load_engine
+from fixengine import fixes_file
+from wikimask import apply_prose
+
+log_file = os.path.expanduser("~/mrwiki/fixbot_log.txt")
+
+# edit summaries longer than this are cut by mediawiki, so whole group messages are dropped instead
+SUMMARY_LIMIT = 500
+# the shutoff page is read again after this many saves
+CHECK_EVERY = 25
+
+
+def merged_summary(summaries, limit=SUMMARY_LIMIT):
+    ## one summary from the `msg` of every group that changed the page, in fix
+    ## file order; groups that do not fit are left out rather than cut in half
+    parts = []
+    for group, msg in summaries:
+        msg = msg or group
+        if msg in parts:
+            continue
+        if len('; '.join(parts + [msg])) > limit:
+            break
+        parts.append(msg)
+    return '; '.join(parts)
+
+
+def candidate_titles(groups, directory=candidates_dir):
+    ## titles from the <group>.txt lists dumpscan.py writes, each title once,
+    ## so a page listed by several groups is still edited once
+    seen = set()
+    for group in groups:
+        path = os.path.join(directory, f"{group}.txt")
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                title = line.split('\t', 1)[0].strip()
+                if title.startswith('[[') and title.endswith(']]'):
+                    title = title[2:-2]
+                if title and title not in seen:
+                    seen.add(title)
+                    yield title
+
+
+def should_run(site):
+    control_page = pywikibot.Page(site, "सदस्य:KiranBOT II/shutoff/typos")
+    return "* run" in control_page.text.lower()
+
+
+def log(message):
+    with open(log_file, "a", encoding='utf-8') as f:
+        f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {message}\n")
+
+
+def fix_page(page, engine, groups, masked=True, show=False):
+    ## fetches nothing itself (the generator preloads); returns 'done', 'skipped' or 'failed'
+    if not page.exists() or page.isRedirectPage():
+        return 'skipped'
+    text = page.text
+    if masked:
+        new_text, counts = apply_prose(engine, text, groups)
+    else:
+        new_text, counts = engine.apply(text, groups)
+    if new_text == text:
+        return 'skipped'
+    summary = merged_summary(engine.summaries(counts))
+    if show:
+        pywikibot.output(f"\n>>> {page.title()} <<<")
+        pywikibot.showDiff(text, new_text)
+        pywikibot.output(f"summary: {summary}")
+    page.text = new_text
+    try:
+        page.save(summary, minor=True, botflag=True)
+    except pywikibot.exceptions.EditConflictError:
+        # someone got there first; the next scan will list it again if needed
+        log(f"edit conflict on [[{page.title()}]]")
+        return 'failed'
+    except pywikibot.exceptions.PageSaveRelatedError as e:
+        log(f"not saved [[{page.title()}]]: {e}")
+        return 'failed'
+    log(f"saved [[{page.title()}]]: {', '.join(engine.groups_hit(counts))}, {sum(counts.values())} replacements")
+    return 'done'
+
+
+def fix_pages(site, pages, engine, groups, budget=None, masked=True, show=False, queue=None):
+    ## saves at most `budget` pages; returns (saved, skipped). The fixes stay out of
+    ## templates, refs, file names and links unless `masked` is off
+    saved = skipped = 0
+    try:
+        for page in pages:
+            state = fix_page(page, engine, groups, masked, show)
+            if queue:
+                queue.finish(page.title(), state)
+            if state == 'skipped':
+                skipped += 1
+            if state != 'done':
+                continue
+            saved += 1
+            if budget and saved >= budget:
+                break
+            if saved % CHECK_EVERY == 0 and not should_run(site):
+                log("stopped from the shutoff page")
+                break
+    finally:
+        if queue:
+            # preloaded but not reached
+            queue.release()
+    return saved, skipped
+
+
+def main():
+    local_args = pywikibot.handle_args(sys.argv[1:])
+    gen_factory = pagegenerators.GeneratorFactory()
+    groups = []
+    options = {}
+    for arg in local_args:
+        if gen_factory.handle_arg(arg):
+            continue
+        name, _, value = arg[1:].partition(':')
+        if name == 'fix':
+            groups.append(value)
+        else:
+            options[name] = value or True
+
+    site = pywikibot.Site("mr", "wikipedia")
+    engine = load_engine(os.path.expanduser(options.get('fixes', fixes_file)), groups or None)
+    if not groups:
+        groups = list(dict.fromkeys(rule.group for rule in engine.rules))
+
+    generator = gen_factory.getCombinedGenerator()
+    queue = None
+    if 'queue' in options:
+        # best pages first; run from cron with -budget: as the number of saves of one run
+        queue = EditQueue(os.path.expanduser(queue_file if options['queue'] is True else options['queue']))
+        generator = (pywikibot.Page(site, title) for title in queue.take())
+    elif generator is None:
+        # no -page:/-file:/-cat: given: every page the scan lists for one of the groups
+        directory = os.path.expanduser(options.get('candidates', candidates_dir))
+        generator = (pywikibot.Page(site, title) for title in candidate_titles(groups, directory))
+    # pages are fetched in batches, and each of them only once for all the groups
+    generator = pagegenerators.PreloadingGenerator(generator)
+
+    if not should_run(site):
+        print("shutoff page says stop")
+        if queue:
+            queue.close()
+        return
+
+    # -limit: belongs to the page generators, the number of saves of one run is -budget:
+    budget = int(options['budget']) if 'budget' in options else None
+    try:
+        saved, skipped = fix_pages(site, generator, engine, groups, budget,
+                                   masked='nomask' not in options, show='show' in options, queue=queue)
+    finally:
+        if queue:
+            queue.close()
+    print(f"{saved} pages saved, {skipped} already fine")
+
+
+if __name__ == "__main__":
+    main()
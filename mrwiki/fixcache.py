@@ -0,0 +1,88 @@
+import hashlib
+import os
+import pickle
+import sys
+import time
+
+from fixengine import build_engine, fixes_file, handle_args
+
+cache_dir = os.path.expanduser("~/mrwiki/cache")
+
+# bump whenever FixEngine's pickled state changes shape
+ENGINE_VERSION = 9
+
+
+def _digest(*parts):
+    return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+def artifact_path(path=fixes_file, groups=None, directory=cache_dir):
+    ## <fix file>-<groups>-<content hash>.pickle; the content hash covers the
+    ## fix file bytes, the engine version and the python version
+    with open(path, 'rb') as f:
+        source = f.read()
+    content = hashlib.sha256(source)
+    content.update(f"{ENGINE_VERSION}:{sys.version_info[:2]}".encode('ascii'))
+    selection = _digest(*(groups or ['*']))
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(directory, f"{name}-{selection}-{content.hexdigest()[:16]}.pickle")
+
+
+def _remove_stale(artifact):
+    # older artifacts for the same fix file and group selection
+    directory, name = os.path.split(artifact)
+    prefix = name.rsplit('-', 1)[0] + '-'
+    for other in os.listdir(directory):
+        if other.startswith(prefix) and other.endswith('.pickle') and other != name:
+            try:
+                os.remove(os.path.join(directory, other))
+            except OSError:
+                pass
+
+
+def build_artifact(path=fixes_file, groups=None, directory=cache_dir):
+    engine = build_engine(path, groups)
+    artifact = artifact_path(path, groups, directory)
+    os.makedirs(directory, exist_ok=True)
+    # write then rename, so a cron run starting meanwhile never sees half a file
+    temporary = f"{artifact}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as f:
+        pickle.dump(engine, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, artifact)
+    _remove_stale(artifact)
+    return engine, artifact
+
+
+def load_engine(path=fixes_file, groups=None, directory=cache_dir):
+    ## the compiled engine for `groups` of `path`, rebuilt only when the fix file changed
+    artifact = artifact_path(path, groups, directory)
+    try:
+        with open(artifact, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError):
+        # missing, cut short, or pickled by code that has changed since (a class
+        # or module renamed, moved, or taking other arguments): built again
+        pass
+    engine, _ = build_artifact(path, groups, directory)
+    return engine
+
+
+def main():
+    options, positional = handle_args(sys.argv[1:])
+    path = os.path.expanduser(positional[0]) if positional else fixes_file
+    groups = options['fix'] or None
+    directory = os.path.expanduser(options.get('cache', cache_dir))
+    artifact = artifact_path(path, groups, directory)
+    if os.path.exists(artifact) and 'force' not in options:
+        print(f"up to date: {artifact}")
+    else:
+        start = time.perf_counter()
+        _, artifact = build_artifact(path, groups, directory)
+        print(f"built {artifact} in {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    load_engine(path, groups, directory)
+    print(f"loads in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
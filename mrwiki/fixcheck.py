@@ -0,0 +1,281 @@
+import os
+import sys
+import unicodedata
+
+from fixengine import compile_rules, fixes_file, handle_args, literal_index, load_fixes, overlapping, replace_except
+from normalize import nfc_index, normalize_passes, to_nfc
+from regexlits import required_literals
+from vocab import Vocab, risky
+
+
+def representative(rule):
+    ## a string the rule matches: the entry itself, or for a real regex the
+    ## longest literal it requires (good enough to build witnesses from)
+    if rule.literal is not None:
+        return rule.literal
+    condition = required_literals(rule.compiled())
+    strings = [s for alternative in condition for s in alternative]
+    return max(strings, key=len) if strings else None
+
+
+def apply_rule(rule, text):
+    if rule.literal is not None:
+        return text.replace(rule.literal, rule.replacement)
+    return replace_except(text, rule.compiled(), rule.new)[0]
+
+
+def matches(rule, text):
+    if rule.literal is not None:
+        return text.count(rule.literal)
+    return replace_except(text, rule.compiled(), rule.new)[1]
+
+
+def _is_letter(ch):
+    return unicodedata.category(ch)[0] in 'LM'
+
+
+def alignments(new, target):
+    ## (left, right) contexts that make `target` run across an inserted `new`;
+    ## a partial overlap that only shares letters would glue two words into one
+    ## that does not exist, so only overlaps across a space or punctuation count
+    n, m = len(new), len(target)
+    for p in range(-m + 1, n if n else 1):
+        # target occupies [p, p + m) counted from the start of new
+        shared = range(max(p, 0), min(p + m, n))
+        if any(new[i] != target[i - p] for i in shared):
+            continue
+        contained = (p >= 0 and p + m <= n) or (p <= 0 and p + m >= n)
+        if not contained and all(_is_letter(new[i]) for i in shared):
+            continue
+        left = target[:max(-p, 0)]
+        right = target[max(n - p, 0):] if p + m > n else ''
+        yield left, right
+
+
+def chain_edges(rules):
+    ## {(a, b): witness}: applying rule a to the witness creates a new match of rule b
+    reps = {rule.index: representative(rule) for rule in rules}
+    words = {}
+    for rule in rules:
+        if reps[rule.index]:
+            words.setdefault(reps[rule.index], []).append(rule)
+    index = literal_index(words)
+    edges = {}
+    for a in rules:
+        # only rules that insert fixed text can be followed; group references cannot
+        new = a.replacement
+        if new is None or not reps[a.index]:
+            continue
+        for word in overlapping(new, words, index):
+            for b in words[word]:
+                for left, right in alignments(new, word):
+                    before = left + reps[a.index] + right
+                    after = apply_rule(a, before)
+                    if matches(b, after) > matches(b, before):
+                        edges[a.index, b.index] = before
+                        break
+    return edges
+
+
+def order_conflicts(rules):
+    ## [(a, b, witness)]: rules of different groups whose matches overlap and
+    ## whose result depends on which group runs first
+    words = {}
+    for rule in rules:
+        if rule.literal is not None:
+            words.setdefault(rule.literal, []).append(rule)
+    index = literal_index(words)
+    conflicts = []
+    seen = set()
+    for a in rules:
+        if a.literal is None:
+            continue
+        for word in overlapping(a.literal, words, index):
+            for b in words[word]:
+                if b.group == a.group or (b.index, a.index) in seen or (a.index, b.index) in seen:
+                    continue
+                for left, right in alignments(a.literal, b.literal):
+                    witness = left + a.literal + right
+                    if apply_rule(b, apply_rule(a, witness)) != apply_rule(a, apply_rule(b, witness)):
+                        seen.add((a.index, b.index))
+                        conflicts.append((a, b, witness))
+                        break
+    return conflicts
+
+
+def strongly_connected(nodes, edges):
+    ## Tarjan, iteratively; returns the components with more than one node or a self-loop
+    successors = {node: [] for node in nodes}
+    for a, b in edges:
+        successors[a].append(b)
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    components = []
+    counter = 0
+    for root in nodes:
+        if root in index:
+            continue
+        work = [(root, iter(successors[root]))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            advanced = False
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(successors[child])))
+                    advanced = True
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                low[work[-1][0]] = min(low[work[-1][0]], low[node])
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                if len(component) > 1 or (node, node) in edges:
+                    components.append(sorted(component))
+    return components
+
+
+def group_order(rules, edges, cyclic):
+    ## groups ordered so that a group feeding another runs first; ties keep file order
+    groups = list(dict.fromkeys(rule.group for rule in rules))
+    group_of = {rule.index: rule.group for rule in rules}
+    after = {group: set() for group in groups}
+    for a, b in edges:
+        if a in cyclic and b in cyclic:
+            continue
+        if group_of[a] != group_of[b]:
+            after[group_of[a]].add(group_of[b])
+    incoming = {group: 0 for group in groups}
+    for group in groups:
+        for other in after[group]:
+            incoming[other] += 1
+    order = []
+    ready = [group for group in groups if incoming[group] == 0]
+    while ready:
+        group = ready.pop(0)
+        order.append(group)
+        for other in sorted(after[group], key=groups.index):
+            incoming[other] -= 1
+            if incoming[other] == 0:
+                ready.append(other)
+        ready.sort(key=groups.index)
+    # whatever is left sits on a cycle between groups
+    return order + [group for group in groups if group not in order]
+
+
+def shadowed(rules):
+    ## [(rule, normalized)] for the literal tuples of later groups that a
+    ## normalize group rewrites before they get to run; they never match again
+    found = []
+    nfc = nfc_index(rules)
+    for first, normalize_pass in normalize_passes(rules).items():
+        for rule in rules:
+            if rule.index < first or rule.normalize or rule.literal is None:
+                continue
+            text = to_nfc(rule.literal)[0] if first == nfc else rule.literal
+            text = normalize_pass.apply(text)[0]
+            if text != rule.literal:
+                found.append((rule, text))
+    return found
+
+
+def check(fixes, lines=None, groups=None, out=sys.stdout, vocab=None, strict=False):
+    ## prints the analysis; returns True when the fix set can be applied in one pass
+    ## (and, with `strict`, no tuple looks risky against the `vocab` word counts)
+    errors = []
+    rules = compile_rules(fixes, groups, lines, errors)
+    by_index = {rule.index: rule for rule in rules}
+
+    def name(rule):
+        line = f", line {rule.lineno}" if rule.lineno else ""
+        return f"{rule.group}[{rule.position}] {rule.old!r} -> {rule.new!r}{line}"
+
+    for error in errors:
+        out.write(f"malformed: {error}\n")
+
+    edges = chain_edges(rules)
+    components = strongly_connected([rule.index for rule in rules], set(edges))
+    cyclic = {index for component in components for index in component}
+    for component in components:
+        out.write("cycle (each run undoes/redoes the other):\n")
+        for index in component:
+            out.write(f"    {name(by_index[index])}\n")
+        for a in component:
+            for b in component:
+                if (a, b) in edges:
+                    out.write(f"    {by_index[a].group}[{by_index[a].position}] feeds "
+                              f"{by_index[b].group}[{by_index[b].position}] on {edges[a, b]!r}\n")
+
+    # one block per pair of groups; space-padded tuples make these come in dozens
+    pairs = {}
+    for a, b, witness in order_conflicts(rules):
+        pairs.setdefault((a.group, b.group), []).append((a, b, witness))
+    for (first, second), conflicts in pairs.items():
+        a, b, witness = conflicts[0]
+        out.write(f"order-dependent: {first} and {second}, {len(conflicts)} tuple pairs, e.g.\n"
+                  f"    {name(a)}\n    {name(b)}\n    differ on {witness!r}\n")
+
+    order = group_order(rules, edges, cyclic)
+    position = {}
+    for group in order:
+        for rule in rules:
+            if rule.group == group:
+                position[rule.index] = len(position)
+    late = [(a, b) for (a, b) in edges if not (a in cyclic and b in cyclic) and position[a] > position[b]]
+    for a, b in sorted(late):
+        out.write(f"runs too early: {name(by_index[b])}\n"
+                  f"                is fed by the later {name(by_index[a])} on {edges[a, b]!r}\n")
+    dead = shadowed(rules)
+    for rule, normalized in dead:
+        out.write(f"shadowed by normalize: {name(rule)}\n"
+                  f"                       the page already reads {normalized!r} when it runs\n")
+    flagged = risky(rules, vocab) if vocab is not None else []
+    for rule, standalone, inside, new_count, reasons in flagged:
+        out.write(f"risky: {name(rule)}\n"
+                  f"       {', '.join(reasons)}: {standalone} on its own, {inside} inside longer words, "
+                  f"{new_count} of the new form\n")
+    chains = [(a, b) for (a, b) in edges if by_index[a].group != by_index[b].group and a not in cyclic]
+    out.write(f"\n{len(rules)} tuples, {len(errors)} malformed, {len(components)} cycles, "
+              f"{len(chains)} cross-group chains, {len(dead)} shadowed, {len(flagged)} risky\n")
+    out.write("order: " + ' '.join(f"-fix:{group}" for group in order) + "\n")
+    single_pass = not errors and not components and not late
+    out.write("one pass reaches a fixed point\n" if single_pass else "one pass does NOT reach a fixed point\n")
+    if strict and flagged:
+        out.write(f"refused: {len(flagged)} risky tuples\n")
+        return False
+    return single_pass
+
+
+def main():
+    options, positional = handle_args(sys.argv[1:])
+    path = os.path.expanduser(positional[0]) if positional else fixes_file
+    fixes, lines = load_fixes(path)
+    # -vocab: checks every word tuple against the counts vocab.py built from a dump; -strict refuses risky ones
+    vocab = Vocab(os.path.expanduser(options['vocab'])) if 'vocab' in options else None
+    ok = check(fixes, lines, options['fix'] or None, vocab=vocab, strict='strict' in options)
+    if vocab is not None:
+        vocab.close()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import glob
+import os
+import sys
+import time
+
+from dump import iter_sample
+from dumpscan import dump_file
+from fixengine import FixEngine, compile_rules, fixes_file, handle_args, load_fixes
+from parallelscan import run_parallel
+from wikimask import prose_view
+
+old_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "old")
+fixdiff_dir = os.path.expanduser("~/mrwiki/fixdiff")
+
+# titles kept per version and per rule as examples
+EXAMPLES = 10
+
+
+class Version:
+    ## one fix file, compiled; tuples are compared across versions by (old, new),
+    ## since groups get renamed and split between versions
+    __slots__ = ('name', 'path', 'engine', 'keys', 'malformed')
+
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        fixes, lines = load_fixes(path)
+        # the faulty versions are kept as they were, so their broken entries are skipped and counted
+        self.malformed = []
+        rules = compile_rules(fixes, None, lines, self.malformed)
+        self.engine = FixEngine(rules, fixes)
+        self.keys = [(rule.old, rule.new) for rule in rules]
+
+
+def diff_page(engines, text, prose=False):
+    ## run with all versions on one page: (changed, differences) where changed[i]
+    ## says whether version i edits the page and differences maps i to
+    ## {(old, new): replacements in version i minus in the first version}
+    ## for every version whose result differs from the first one's
+    view = None
+    if prose:
+        text, view = prose_view(text)
+    results = []
+    for engine, keys in engines:
+        new_text, counts = engine.apply(text, view=view)
+        by_key = {}
+        for index, count in counts.items():
+            by_key[keys[index]] = by_key.get(keys[index], 0) + count
+        results.append((new_text, by_key))
+    base_text, base_counts = results[0]
+    changed = [new_text != text for new_text, _ in results]
+    differences = {}
+    for number, (new_text, counts) in enumerate(results[1:], start=1):
+        if new_text == base_text:
+            continue
+        delta = {}
+        for key in counts.keys() | base_counts.keys():
+            change = counts.get(key, 0) - base_counts.get(key, 0)
+            if change:
+                delta[key] = change
+        differences[number] = delta
+    return changed, differences
+
+
+def compare(paths, sample, limit=None, workers=1, prose=False):
+    versions = [Version(path) for path in paths]
+    for version in versions:
+        print(f"{version.name}: {len(version.keys)} tuples, {len(version.malformed)} malformed entries skipped")
+    engines = [(version.engine, version.keys) for version in versions]
+
+    def pages():
+        for number, page in enumerate(iter_sample(sample), start=1):
+            yield page
+            if limit and number >= limit:
+                break
+
+    # per version: pages it edits, pages where it differs from the first, examples;
+    # per version and (old, new): [pages, replacements gained or lost, examples]
+    edited = [0] * len(versions)
+    differing = [0] * len(versions)
+    examples = [[] for _ in versions]
+    by_rule = [{} for _ in versions]
+    scanned = 0
+    start = time.perf_counter()
+    # each page is read (and masked) once, for all the versions
+    for page, (changed, differences) in run_parallel(engines, pages(), diff_page, (prose,), workers):
+        scanned += 1
+        for number, flag in enumerate(changed):
+            edited[number] += flag
+        for number, delta in differences.items():
+            differing[number] += 1
+            if len(examples[number]) < EXAMPLES:
+                examples[number].append(page.title)
+            for key, change in delta.items():
+                row = by_rule[number].setdefault(key, [0, 0, []])
+                row[0] += 1
+                row[1] += change
+                if len(row[2]) < EXAMPLES:
+                    row[2].append(page.title)
+        if scanned % 10000 == 0:
+            print(f"{scanned} pages ({scanned / (time.perf_counter() - start):.0f} pages/sec)")
+    elapsed = time.perf_counter() - start
+    return versions, scanned, elapsed, edited, differing, examples, by_rule
+
+
+def write_report(out, versions, scanned, edited, differing, examples, by_rule):
+    base = versions[0]
+    base_keys = set(base.keys)
+    with open(out, 'w', encoding='utf-8') as f:
+        f.write(f"{scanned} pages, compared with {base.name} ({edited[0]} pages edited)\n")
+        for number, version in enumerate(versions[1:], start=1):
+            f.write(f"\n== {version.name}: {edited[number]} pages edited, {differing[number]} differ from {base.name}\n")
+            if examples[number]:
+                f.write("e.g. " + ', '.join(f"[[{title}]]" for title in examples[number]) + "\n")
+            # the tuples behind most of the difference first
+            rows = sorted(by_rule[number].items(), key=lambda item: (-item[1][0], item[0]))
+            keys = set(version.keys)
+            for (old, new), (pages, change, titles) in rows:
+                side = 'only here' if (old, new) not in base_keys else (
+                    'only in ' + base.name if (old, new) not in keys else 'both')
+                f.write(f"{old!r} -> {new!r}\t{side}\t{pages} pages\t{change:+d} replacements\t"
+                        f"{', '.join(titles[:3])}\n")
+
+
+def main():
+    options, positional = handle_args(sys.argv[1:])
+    sample = options.get('sample', dump_file)
+    # the current fix file first, everything is compared with it; then old/ unless files are given
+    paths = [os.path.expanduser(path) for path in positional] or (
+        [fixes_file] + sorted(glob.glob(os.path.join(old_dir, '*.py'))))
+    if 'base' in options:
+        base = os.path.expanduser(options['base'])
+        paths = [base] + [path for path in paths if path != base]
+    if len(paths) < 2:
+        print("usage: python fixdiff.py [-sample:dump|dir] [-base:file] [fixes.py ...]")
+        return
+    versions, scanned, elapsed, edited, differing, examples, by_rule = compare(
+        paths, os.path.expanduser(sample), int(options['limit']) if 'limit' in options else None,
+        int(options.get('workers', 1)), 'prose' in options)
+    out = os.path.expanduser(options.get('out', os.path.join(fixdiff_dir, "report.txt")))
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    write_report(out, versions, scanned, edited, differing, examples, by_rule)
+    for number, version in enumerate(versions):
+        note = '' if number == 0 else f", {differing[number]} differ, {len(by_rule[number])} tuples involved"
+        print(f"{version.name}: {edited[number]} pages edited{note}")
+    print(f"{scanned} pages, {len(versions)} versions in {elapsed:.0f}s, report in {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,633 @@
+import ast
+import heapq
+import os
+import re
+import sys
+import time
+from functools import partial
+
+from dump import iter_sample
+from normalize import chained, nfc_index, normalize_passes, to_nfc
+from regexlits import ANYTHING, required_literals
+from suffixfix import suffix_passes
+from wordfix import word_entry, word_passes, word_pattern
+
+fixes_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "replacebot.py")
+
+# characters that make a 'regex': True entry something more than a plain string
+REGEX_META = set('.^$*+?{}[]|()')
+# group references that pywikibot expands in the replacement string (see textlib.replaceExcept)
+GROUP_REF = re.compile(r'\\(\d+)|\\g<(.+?)>')
+# a regex tuple waits for its required literals only when the one put into the shared
+# scan is at least this long; a '.' would stop the scan about as often as the regex runs
+MIN_TRIGGER = 2
+
+
+class Rule:
+    # one (old, new) tuple of a fix group, in the order pywikibot applies it
+    __slots__ = ('index', 'group', 'position', 'old', 'new', 'regex', 'nocase', 'lineno',
+                 'literal', 'replacement', 'word', 'word_new', 'normalize', 'chained', 'suffix', 'pattern')
+
+    def __init__(self, index, group, position, old, new, regex=True, nocase=False, lineno=None):
+        self.index = index
+        self.group = group
+        self.position = position
+        self.old = old
+        self.new = new
+        self.regex = regex
+        self.nocase = nocase
+        self.lineno = lineno
+        # literal/replacement are set when the entry is really a plain string
+        # and can go through the shared multi-pattern scan instead of re
+        self.literal = literal_text(old, regex, nocase)
+        self.replacement = literal_replacement(new)
+        if self.replacement is None:
+            self.literal = None
+        # set by compile_rules for the whole-word tuples of a 'words': True group
+        self.word = None
+        self.word_new = None
+        # set by compile_rules for the literal tuples of a 'normalize': True group
+        self.normalize = False
+        # and for those of them that have to run in order (see normalize.chained)
+        self.chained = False
+        # (stem, old suffix, new suffix) for the tuples a 'suffixes' entry expands to
+        self.suffix = None
+        self.pattern = None
+
+    def compiled(self):
+        if self.pattern is None:
+            source = self.old if self.regex else re.escape(self.old)
+            self.pattern = re.compile(source, re.UNICODE | (re.IGNORECASE if self.nocase else 0))
+        return self.pattern
+
+    def __getstate__(self):
+        # compiled patterns are rebuilt lazily instead of being pickled
+        return {name: getattr(self, name) for name in self.__slots__ if name != 'pattern'}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.pattern = None
+
+    def __repr__(self):
+        return f"Rule({self.group}[{self.position}], {self.old!r} -> {self.new!r})"
+
+    @property
+    def in_pass(self):
+        # applied as part of a word, normalize or suffix pass, not on its own
+        return self.word is not None or self.normalize or self.suffix is not None
+
+
+def _fixes_node(source):
+    # replacebot.py assigns `fixes = {...}`; the files in old/ are bare group
+    # entries without the surrounding braces, so fall back to wrapping them
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return ast.parse('{' + source + '}', mode='eval').body
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == 'fixes' for t in node.targets):
+            return node.value
+    raise ValueError("no `fixes` dictionary found")
+
+
+def parse_fixes(source):
+    ## returns (fixes, lines); lines[group] holds the source line of every replacement entry
+    node = _fixes_node(source)
+    fixes = ast.literal_eval(node)
+    lines = {}
+    for key, value in zip(node.keys, node.values):
+        if not isinstance(value, ast.Dict):
+            continue
+        for sub_key, sub_value in zip(value.keys, value.values):
+            if getattr(sub_key, 'value', None) == 'replacements' and isinstance(sub_value, (ast.List, ast.Tuple)):
+                lines.setdefault(key.value, [])[:0] = [elt.lineno for elt in sub_value.elts]
+            elif getattr(sub_key, 'value', None) == 'suffixes' and isinstance(sub_value, (ast.List, ast.Tuple)):
+                # every stem is a tuple of its own, after the group's replacements
+                for entry in sub_value.elts:
+                    stems = entry.elts[2] if isinstance(entry, ast.Tuple) and len(entry.elts) == 3 else None
+                    if isinstance(stems, (ast.List, ast.Tuple)):
+                        lines.setdefault(key.value, []).extend(elt.lineno for elt in stems.elts)
+    return fixes, lines
+
+
+def load_fixes(path=fixes_file):
+    with open(path, encoding='utf-8') as f:
+        return parse_fixes(f.read())
+
+
+def literal_text(old, regex=True, nocase=False):
+    ## the plain string an entry matches, or None when it needs the regex engine
+    if not regex:
+        text = old
+    else:
+        chars = []
+        escaped = False
+        for ch in old:
+            if escaped:
+                # \d, \w, \b ... are classes/anchors, \. \, \  are plain characters
+                if ch.isalnum() or ch == '_':
+                    return None
+                chars.append(ch)
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch in REGEX_META:
+                return None
+            else:
+                chars.append(ch)
+        if escaped:
+            return None
+        text = ''.join(chars)
+    if not text:
+        return None
+    # Devanagari has no case, so nocase only matters for entries with cased letters
+    if nocase and (text.lower() != text or text.upper() != text):
+        return None
+    return text
+
+
+def literal_replacement(new):
+    if GROUP_REF.search(new):
+        return None
+    return new.replace('\\n', '\n')
+
+
+def expand_replacement(new, match):
+    # same expansion as pywikibot: only \n, \N and \g<name>, other escapes stay verbatim
+    new = new.replace('\\n', '\n')
+    replacement = ''
+    last = 0
+    for group_match in GROUP_REF.finditer(new):
+        group_id = group_match.group(1) or group_match.group(2)
+        if group_id.isdigit():
+            group_id = int(group_id)
+        replacement += new[last:group_match.start()]
+        replacement += match.group(group_id) or ''
+        last = group_match.end()
+    return replacement + new[last:]
+
+
+def replace_except(text, pattern, new):
+    ## textlib.replaceExcept without exceptions: returns (text, number of replacements)
+    count = 0
+    index = 0
+    while index <= len(text):
+        match = pattern.search(text, index)
+        if not match:
+            break
+        replacement = expand_replacement(new, match)
+        text = text[:match.start()] + replacement + text[match.end():]
+        index = match.start() + len(replacement)
+        if not match.group():
+            # empty match, move on by one character
+            index += 1
+        count += 1
+    return text, count
+
+
+def compile_rules(fixes, groups=None, lines=None, errors=None):
+    ## flattens the selected groups into Rule objects, in application order;
+    ## malformed entries raise ValueError unless an `errors` list collects them
+    if groups is None:
+        groups = list(fixes)
+    rules = []
+    for group in groups:
+        if group not in fixes:
+            raise KeyError(f"unknown fix group: {group}")
+        fix = fixes[group]
+        regex = fix.get('regex', False)
+        nocase = fix.get('nocase', False)
+        # ' X ' -> ' Y ' tuples of such a group match X as a whole word, also
+        # next to punctuation and line ends (see wordfix.py); pywikibot ignores the key
+        words = fix.get('words', False)
+        # the literal tuples of such groups run as one pass ahead of the others (see normalize.py)
+        normalize = fix.get('normalize', False)
+        group_lines = (lines or {}).get(group, [])
+        first = len(rules)
+        for position, entry in enumerate(fix.get('replacements', [])):
+            lineno = group_lines[position] if position < len(group_lines) else None
+            # pywikibot accepts (old, new) and (old, new, summary)
+            if not isinstance(entry, (tuple, list)) or len(entry) not in (2, 3) \
+                    or not all(isinstance(part, str) for part in entry[:2]):
+                where = f" (line {lineno})" if lineno else ""
+                message = f"{group}: malformed replacement {entry!r}{where}"
+                if errors is None:
+                    raise ValueError(message)
+                errors.append(message)
+                continue
+            rule = Rule(len(rules), group, position, entry[0], entry[1], regex, nocase, lineno)
+            if normalize:
+                rule.normalize = rule.literal is not None
+            elif words:
+                rule.word, rule.word_new = word_entry(rule.literal, rule.replacement) or (None, None)
+            rules.append(rule)
+        if normalize:
+            ordered = chained([rule for rule in rules[first:] if rule.normalize])
+            for rule in rules[first:]:
+                rule.chained = rule.index in ordered
+        # (old suffix, new suffix, [stems]) stands for a (stem + old, stem + new)
+        # tuple per stem; replacebot.py expands them the same way for pywikibot
+        position = len(fix.get('replacements', []))
+        for entry in fix.get('suffixes', []):
+            if not isinstance(entry, (tuple, list)) or len(entry) != 3 \
+                    or not all(isinstance(part, str) and part for part in entry[:2]) \
+                    or not isinstance(entry[2], (tuple, list)) \
+                    or not all(isinstance(stem, str) and stem for stem in entry[2]):
+                message = f"{group}: malformed suffix entry {str(entry)[:80]}"
+                if errors is None:
+                    raise ValueError(message)
+                errors.append(message)
+                if isinstance(entry, (tuple, list)) and len(entry) == 3 and isinstance(entry[2], (tuple, list)):
+                    position += len(entry[2])
+                continue
+            old, new, stems = entry
+            for stem in stems:
+                lineno = group_lines[position] if position < len(group_lines) else None
+                rule = Rule(len(rules), group, position, stem + old, stem + new, regex, nocase, lineno)
+                if rule.literal is not None and rule.replacement is not None:
+                    rule.suffix = (stem, old, new)
+                rules.append(rule)
+                position += 1
+    return rules
+
+
+def group_summary(fix, lang='mr'):
+    msg = fix.get('msg', '')
+    if isinstance(msg, dict):
+        return msg.get(lang) or next(iter(msg.values()), '')
+    return msg
+
+
+def plain_tuples(rules):
+    ## [(index, pattern, new)]: every tuple on its own, in order, for apply_plain;
+    ## a whole-word tuple gets the pattern of its own word rule
+    tuples = []
+    for rule in rules:
+        if rule.word is None:
+            tuples.append((rule.index, rule.compiled(), rule.new))
+        else:
+            tuples.append((rule.index,) + word_pattern(rule.word, rule.word_new))
+    return tuples
+
+
+def apply_plain(text, rules, tuples=None):
+    ## the pywikibot way: one replaceExcept pass over the page per tuple, nothing
+    ## shared; the reference the engine and its passes are checked against.
+    ## `tuples` is plain_tuples(rules), built once when many pages are run
+    counts = {}
+    first = nfc_index(rules)
+    if first is not None:
+        text, changed = to_nfc(text)
+        if changed:
+            counts[first] = 1
+    for index, pattern, new in tuples or plain_tuples(rules):
+        text, count = replace_except(text, pattern, new)
+        if count:
+            counts[index] = count
+    return text, counts
+
+
+def apply_sequential(text, rules):
+    ## one tuple after the other like pywikibot, but the word, normalize and suffix
+    ## tuples of a group run as their pass, so it shares the passes' semantics
+    counts = {}
+    first = nfc_index(rules)
+    if first is not None:
+        text, changed = to_nfc(text)
+        if changed:
+            counts[first] = 1
+    passes = rule_passes(rules)
+    for rule in rules:
+        if rule.in_pass:
+            if rule.index in passes:
+                text, found = passes[rule.index].apply(text)
+                for index, count in found.items():
+                    counts[index] = counts.get(index, 0) + count
+            continue
+        text, count = replace_except(text, rule.compiled(), rule.new)
+        if count:
+            counts[rule.index] = count
+    return text, counts
+
+
+def rule_passes(rules):
+    ## {index: pass} for the tuples that run together; a pass runs in the
+    ## place of its first tuple and returns (text, counts) like apply()
+    passes = word_passes(rules)
+    passes.update(normalize_passes(rules))
+    passes.update(suffix_passes(rules))
+    return passes
+
+
+def trie_regex(words):
+    ## one alternation shaped like a trie, so re walks all words in a single pass
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+    return _trie_source(trie)
+
+
+def _trie_source(node):
+    branches = [re.escape(ch) + _trie_source(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ''
+    if len(branches) == 1:
+        body = branches[0]
+        if '' in node:
+            body = '(?:' + body + ')?'
+        return body
+    # greedy optional group: the longest word at a position wins
+    return '(?:' + '|'.join(branches) + ')' + ('?' if '' in node else '')
+
+
+def literal_index(words):
+    ## (substrings, prefixes, suffixes): each maps a string to the words that
+    ## contain it / start with it / end with it (proper prefixes and suffixes only)
+    substrings = {}
+    prefixes = {}
+    suffixes = {}
+    for word in words:
+        for i in range(len(word)):
+            for j in range(i + 1, len(word) + 1):
+                substrings.setdefault(word[i:j], set()).add(word)
+        for k in range(1, len(word)):
+            prefixes.setdefault(word[:k], set()).add(word)
+            suffixes.setdefault(word[k:], set()).add(word)
+    return substrings, prefixes, suffixes
+
+
+def overlapping(new, words, index):
+    ## words that could newly appear around an inserted `new`; anything that
+    ## did not occur before has to overlap the inserted text
+    if not new:
+        return set(words)
+    substrings, prefixes, suffixes = index
+    found = set()
+    for i in range(len(new)):
+        for j in range(i + 1, len(new) + 1):
+            if new[i:j] in words:
+                found.add(new[i:j])
+    found.update(substrings.get(new, ()))
+    for k in range(1, len(new)):
+        # a suffix of new starting a word, or a prefix of new ending one
+        found.update(prefixes.get(new[k:], ()))
+        found.update(suffixes.get(new[:k], ()))
+    return found
+
+
+class FixEngine:
+    ## all literal entries of the selected groups share one scan; a page only
+    ## pays for the tuples that actually occur in it
+
+    def __init__(self, rules, fixes=None):
+        self.rules = rules
+        self.fixes = fixes or {}
+        # a pass scans for its own strings, and suffixes like च or त would
+        # stop the shared scan at nearly every word, so passes always run
+        self.passes = rule_passes(rules)
+        # where NFC is counted: the first normalize tuple of the NFC_GROUP, if it is compiled
+        self.nfc = nfc_index(rules)
+        self.by_literal = {}
+        for rule in rules:
+            if rule.literal is not None and not rule.in_pass:
+                self.by_literal.setdefault(rule.literal, []).append(rule.index)
+        self.regex_rules = [rule.index for rule in rules if rule.literal is None]
+        # regex tuples run only once the strings every match contains are on the
+        # page: they join the shared scan and detect() checks the rest of the
+        # alternative with `in`; the others (ungated) run on every page
+        self.conditions = {}
+        self.triggers = {}
+        for index in self.regex_rules:
+            condition = required_literals(rules[index].compiled())
+            if condition == ANYTHING or any(len(max(alternative, key=len)) < MIN_TRIGGER for alternative in condition):
+                continue
+            self.conditions[index] = condition
+            for word in set().union(*condition):
+                if len(word) >= MIN_TRIGGER:
+                    self.triggers.setdefault(word, []).append(index)
+        self.ungated = [index for index in self.regex_rules if index not in self.conditions]
+        self._build()
+
+    def _build(self):
+        literals = {word: list(indices) for word, indices in self.by_literal.items()}
+        for word, indices in self.triggers.items():
+            literals.setdefault(word, []).extend(indices)
+        index = literal_index(literals)
+        prefixes = index[1]
+
+        # every literal inside a matched word also occurs, and a literal that
+        # starts inside it but runs past its end has to be checked by hand
+        self.contained = {}
+        self.straddling = {}
+        for word in literals:
+            inside = set()
+            for i in range(len(word)):
+                for j in range(i + 1, len(word) + 1):
+                    if word[i:j] in literals:
+                        inside.update(literals[word[i:j]])
+            self.contained[word] = inside
+            self.straddling[word] = [k for k in range(1, len(word)) if word[k:] in prefixes]
+
+        # tuples that an earlier tuple's replacement could bring into existence
+        self.creates = {}
+        for rule in self.rules:
+            if rule.in_pass:
+                if rule.index not in self.passes:
+                    continue
+                inserted = self.passes[rule.index].inserted
+                joined = self.passes[rule.index].joined
+            elif rule.replacement is None:
+                # group references: the inserted text is only known per match
+                continue
+            else:
+                inserted = [rule.replacement]
+                joined = []
+            later = set()
+            found = {word for new in inserted for word in overlapping(new, literals, index)}
+            for suffix in joined:
+                # gluing `suffix` onto the word before it: a new occurrence runs
+                # from that word, across the dropped space, into the suffix
+                found.update(word for word in literals for k in range(1, len(word))
+                             if word[k - 1] != ' ' and (suffix.startswith(word[k:]) or word[k:].startswith(suffix)))
+            for word in found:
+                later.update(index for index in literals[word] if index > rule.index)
+            # a one character string of a gate is not in the scan, it can only be written whole
+            later.update(index for index, condition in self.conditions.items() if index > rule.index
+                         and any(len(word) < MIN_TRIGGER and word in new
+                                 for alternative in condition for word in alternative for new in inserted))
+            self.creates[rule.index] = later
+
+        self.scanner_source = trie_regex(literals) if literals else None
+        self._scanner = None
+
+    @property
+    def scanner(self):
+        if self._scanner is None and self.scanner_source is not None:
+            self._scanner = re.compile(self.scanner_source)
+        return self._scanner
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['_scanner'] = None
+        return state
+
+    def detect(self, text):
+        ## indices of literal rules whose string occurs in the page, and of gated
+        ## regex rules whose required strings all do, from one scan
+        hits = set()
+        scanner = self.scanner
+        if scanner is None:
+            return hits
+        for match in scanner.finditer(text):
+            word = match.group()
+            hits.update(self.contained[word])
+            start = match.start()
+            for offset in self.straddling[word]:
+                # longest literal starting inside this match; its own substrings come along
+                tail = scanner.match(text, start + offset)
+                if tail:
+                    hits.update(self.contained[tail.group()])
+        for index in hits & self.conditions.keys():
+            if not any(all(word in text for word in alternative) for alternative in self.conditions[index]):
+                hits.discard(index)
+        return hits
+
+    def apply(self, text, groups=None, hits=None, view=None):
+        ## returns (new_text, counts) where counts maps rule index -> replacements;
+        ## `groups` applies only those groups as if nothing else were compiled,
+        ## `hits` reuses an earlier detect() of the same text, `view` is the
+        ## wikimask.ProseView of the page when `text` is its joined prose
+        selected = None if groups is None else set(groups)
+        counts = {}
+        first = self.nfc
+        if first is not None and (selected is None or self.rules[first].group in selected):
+            text, changed = to_nfc(text)
+            if changed:
+                counts[first] = 1
+                # what was found before is off now
+                hits = None
+        if hits is None:
+            hits = self.detect(text)
+        pending = [index for index in hits if selected is None or self.rules[index].group in selected]
+        pending.extend(index for index in self.ungated + list(self.passes)
+                       if selected is None or self.rules[index].group in selected)
+        heapq.heapify(pending)
+        done = set()
+        while pending:
+            index = heapq.heappop(pending)
+            if index in done:
+                continue
+            done.add(index)
+            rule = self.rules[index]
+            if index in self.passes:
+                if view is not None and rule.word is not None:
+                    # whole words end where the page's markup begins
+                    text, found = self.passes[index].apply(text, view)
+                else:
+                    text, found = self.passes[index].apply(text)
+            elif rule.literal is None:
+                if view is None:
+                    text, count = replace_except(text, rule.compiled(), rule.new)
+                else:
+                    text, count = view.sub(text, rule.compiled(), partial(expand_replacement, rule.new))
+                found = {index: count} if count else {}
+            else:
+                count = text.count(rule.literal)
+                if count:
+                    text = text.replace(rule.literal, rule.replacement)
+                found = {index: count} if count else {}
+            if not found:
+                continue
+            for later, count in found.items():
+                counts[later] = counts.get(later, 0) + count
+            if index in self.creates:
+                created = self.creates[index]
+            else:
+                # group references can insert anything, look again for what is left
+                created = [hit for hit in self.detect(text) if hit > index]
+            for later in created:
+                if later not in done and (selected is None or self.rules[later].group in selected):
+                    heapq.heappush(pending, later)
+        return text, counts
+
+    def groups_hit(self, counts):
+        groups = []
+        for index in sorted(counts):
+            group = self.rules[index].group
+            if group not in groups:
+                groups.append(group)
+        return groups
+
+    def summaries(self, counts, lang='mr'):
+        ## per-group edit summaries (the `msg` of each group that changed something)
+        return [(group, group_summary(self.fixes.get(group, {}), lang)) for group in self.groups_hit(counts)]
+
+
+def build_engine(path=fixes_file, groups=None):
+    fixes, lines = load_fixes(path)
+    return FixEngine(compile_rules(fixes, groups, lines), fixes)
+
+
+def handle_args(args):
+    ## pywikibot-style `-name:value` options; -fix: may be given more than once
+    options = {'fix': []}
+    positional = []
+    for arg in args:
+        if arg.startswith('-'):
+            name, _, value = arg[1:].partition(':')
+            if name == 'fix':
+                options['fix'].append(value)
+            else:
+                options[name] = value or True
+        else:
+            positional.append(arg)
+    return options, positional
+
+
+def main():
+    options, positional = handle_args(sys.argv[1:])
+    groups = options['fix']
+    limit = int(options['limit']) if 'limit' in options else None
+    if not positional:
+        print("usage: python fixengine.py [-fix:group ...] [-limit:N] <dump.xml[.bz2] | directory of .txt pages>")
+        return
+    sample = positional[0]
+
+    start = time.perf_counter()
+    engine = build_engine(fixes_file, groups or None)
+    compile_time = time.perf_counter() - start
+    print(f"{len(engine.rules)} rules, {len(engine.by_literal)} literal strings, "
+          f"{len(engine.regex_rules)} regex rules ({len(engine.conditions)} gated on literals), "
+          f"compiled in {compile_time:.2f}s")
+
+    pages = []
+    for page in iter_sample(sample):
+        pages.append(page.text)
+        if limit and len(pages) >= limit:
+            break
+    if not pages:
+        print(f"error: no pages found in {sample}.")
+        return
+
+    start = time.perf_counter()
+    tuples = plain_tuples(engine.rules)
+    sequential = [apply_plain(text, engine.rules, tuples)[0] for text in pages]
+    sequential_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = [engine.apply(text)[0] for text in pages]
+    compiled_time = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(sequential, compiled) if a != b)
+    changed = sum(1 for a, b in zip(pages, compiled) if a != b)
+    print(f"{len(pages)} pages, {changed} would change, {mismatches} differ between engines")
+    print(f"sequential: {len(pages) / sequential_time:.1f} pages/sec")
+    print(f"compiled:   {len(pages) / compiled_time:.1f} pages/sec ({sequential_time / compiled_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
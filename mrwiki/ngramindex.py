@@ -0,0 +1,228 @@
+import os
+import re
+import sqlite3
+import sys
+import time
+import zlib
+from array import array
+
+from dump import iter_pages
+from fixengine import handle_args
+from regexlits import required_literals
+
+index_file = os.path.expanduser("~/mrwiki/index/ngrams.sqlite")
+dump_file = os.path.expanduser("~/mrwiki/dump/mrwiki-latest-pages-articles.xml.bz2")
+
+# code point trigrams; a Devanagari akshara such as क्ष is already three of them
+GRAM = 3
+# pages buffered in memory before their postings are written out as a new chunk
+BATCH_PAGES = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    docid INTEGER PRIMARY KEY,
+    pageid INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    revid INTEGER NOT NULL,
+    live INTEGER NOT NULL DEFAULT 1,
+    text BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS docs_pageid ON docs (pageid);
+CREATE TABLE IF NOT EXISTS postings (
+    gram TEXT NOT NULL,
+    chunk INTEGER NOT NULL,
+    docids BLOB NOT NULL,
+    PRIMARY KEY (gram, chunk)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def grams(text):
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class NgramIndex:
+    ## docids only ever grow: a changed page gets a new docid and its old one is
+    ## marked dead, so an update appends postings chunks instead of rewriting them
+
+    def __init__(self, path=index_file):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        self._dead = None
+
+    def close(self):
+        self.db.close()
+
+    def _meta(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key, value):
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _flush(self, buffer):
+        chunk = int(self._meta('next_chunk', 0))
+        self.db.executemany(
+            "INSERT INTO postings (gram, chunk, docids) VALUES (?, ?, ?)",
+            ((gram, chunk, docids.tobytes()) for gram, docids in buffer.items()),
+        )
+        self._set_meta('next_chunk', chunk + 1)
+        self.db.commit()
+        buffer.clear()
+
+    def update(self, dump_path, prune=True):
+        ## indexes a dump; on an existing index only new and changed revisions are
+        ## indexed again, and with `prune` pages missing from the dump are dropped
+        live = {pageid: (docid, revid) for docid, pageid, revid in
+                self.db.execute("SELECT docid, pageid, revid FROM docs WHERE live = 1")}
+        next_docid = (self.db.execute("SELECT MAX(docid) FROM docs").fetchone()[0] or 0) + 1
+        seen = set()
+        buffer = {}
+        buffered = 0
+        added = unchanged = 0
+        for page in iter_pages(dump_path):
+            seen.add(page.pageid)
+            old = live.get(page.pageid)
+            if old is not None and old[1] == page.revid:
+                unchanged += 1
+                continue
+            if old is not None:
+                self.db.execute("UPDATE docs SET live = 0 WHERE docid = ?", (old[0],))
+            self.db.execute(
+                "INSERT INTO docs (docid, pageid, title, revid, text) VALUES (?, ?, ?, ?, ?)",
+                (next_docid, page.pageid, page.title, page.revid, zlib.compress(page.text.encode('utf-8'))),
+            )
+            for gram in grams(page.text):
+                buffer.setdefault(gram, array('I')).append(next_docid)
+            next_docid += 1
+            added += 1
+            buffered += 1
+            if buffered >= BATCH_PAGES:
+                self._flush(buffer)
+                buffered = 0
+                print(f"{added} pages indexed, {unchanged} unchanged")
+        if buffer:
+            self._flush(buffer)
+        removed = 0
+        if prune:
+            gone = [docid for pageid, (docid, _) in live.items() if pageid not in seen]
+            self.db.executemany("UPDATE docs SET live = 0 WHERE docid = ?", ((docid,) for docid in gone))
+            removed = len(gone)
+        self._set_meta('dump', os.path.basename(dump_path))
+        self.db.commit()
+        self._dead = None
+        return added, unchanged, removed
+
+    def compact(self):
+        ## drops dead documents and merges each gram's chunks into one
+        dead = self.dead()
+        grams_seen = [row[0] for row in self.db.execute("SELECT DISTINCT gram FROM postings")]
+        for gram in grams_seen:
+            docids = array('I', (docid for docid in self._postings(gram) if docid not in dead))
+            self.db.execute("DELETE FROM postings WHERE gram = ?", (gram,))
+            if docids:
+                self.db.execute("INSERT INTO postings (gram, chunk, docids) VALUES (?, 0, ?)", (gram, docids.tobytes()))
+        self.db.execute("DELETE FROM docs WHERE live = 0")
+        self._set_meta('next_chunk', 1)
+        self.db.commit()
+        self.db.execute("VACUUM")
+        self._dead = set()
+
+    def dead(self):
+        if self._dead is None:
+            self._dead = {row[0] for row in self.db.execute("SELECT docid FROM docs WHERE live = 0")}
+        return self._dead
+
+    def _postings(self, gram):
+        docids = array('I')
+        for (blob,) in self.db.execute("SELECT docids FROM postings WHERE gram = ? ORDER BY chunk", (gram,)):
+            docids.frombytes(blob)
+        return docids
+
+    def candidates(self, literals):
+        ## live docids that contain every trigram of every literal, or None when
+        ## the literals are too short to narrow anything down
+        needed = set()
+        for literal in literals:
+            needed |= grams(literal)
+        if not needed:
+            return None
+        # rarest gram first keeps the working set small
+        postings = sorted((self._postings(gram) for gram in needed), key=len)
+        result = set(postings[0])
+        for docids in postings[1:]:
+            result.intersection_update(docids)
+            if not result:
+                break
+        return result - self.dead()
+
+    def live(self):
+        ## [(docid, pageid, revid, title)] of every live document, in docid order
+        return self.db.execute("SELECT docid, pageid, revid, title FROM docs WHERE live = 1 ORDER BY docid").fetchall()
+
+    def text(self, docid):
+        blob = self.db.execute("SELECT text FROM docs WHERE docid = ?", (docid,)).fetchone()[0]
+        return zlib.decompress(blob).decode('utf-8')
+
+    def _texts(self, docids):
+        if docids is None:
+            query = self.db.execute("SELECT title, text FROM docs WHERE live = 1 ORDER BY docid")
+        else:
+            query = (self.db.execute("SELECT title, text FROM docs WHERE docid = ?", (docid,)).fetchone()
+                     for docid in sorted(docids))
+        for title, blob in query:
+            yield title, zlib.decompress(blob).decode('utf-8')
+
+    def search_literal(self, literal):
+        return [title for title, text in self._texts(self.candidates([literal])) if literal in text]
+
+    def search_regex(self, pattern, flags=0):
+        regex = re.compile(pattern, flags)
+        docids = set()
+        for alternative in required_literals(regex):
+            found = self.candidates(alternative)
+            if found is None:
+                docids = None
+                break
+            docids |= found
+        return [title for title, text in self._texts(docids) if regex.search(text)]
+
+
+def main():
+    options, positional = handle_args(sys.argv[1:])
+    index = NgramIndex(os.path.expanduser(options.get('index', index_file)))
+    try:
+        if 'build' in options:
+            path = positional[0] if positional else dump_file
+            start = time.perf_counter()
+            added, unchanged, removed = index.update(path, prune='noprune' not in options)
+            print(f"{added} pages indexed, {unchanged} unchanged, {removed} removed in {time.perf_counter() - start:.0f}s")
+        elif 'compact' in options:
+            index.compact()
+        elif 'literal' in options or 'regex' in options:
+            start = time.perf_counter()
+            if 'literal' in options:
+                titles = index.search_literal(options['literal'])
+            else:
+                titles = index.search_regex(options['regex'], re.IGNORECASE if 'nocase' in options else 0)
+            elapsed = time.perf_counter() - start
+            show = int(options.get('show', 20))
+            for title in titles[:show]:
+                print(f"* [[{title}]]")
+            print(f"{len(titles)} pages in {elapsed * 1000:.0f} ms")
+        else:
+            print("usage: python ngramindex.py -build [dump] | -compact | -literal:X | -regex:R [-nocase] [-show:N] [-index:path]")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
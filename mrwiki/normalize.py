@@ -0,0 +1,109 @@
+import re
+import unicodedata
+
+# the group whose summary an NFC-only change is saved under; the other normalize
+# groups (visarg, colon) are spelling fixes and leave the encoding alone
+NFC_GROUP = 'normalize'
+
+
+class NormalizePass:
+    ## the literal tuples of a 'normalize': True group (encoding variants: ZWJ
+    ## forms, eyelash ra, chandrabindu, doubled signs, colon/visarga) as one pass;
+    ## a tuple's output is often another tuple's input ('अाा' -> 'आा' -> 'आ'), so
+    ## those (rule.chained, see chained()) run one after the other like pywikibot
+    ## does, each as a str.replace; the others cannot meet any tuple and go first,
+    ## a str.translate for the single characters and one re.sub for the rest.
+    ## A page with none of them costs one scan
+
+    def __init__(self, rules):
+        self.tuples = [(rule.index, rule.literal, rule.replacement) for rule in rules if rule.chained]
+        free = [rule for rule in rules if not rule.chained]
+        self.singles = [(rule.index, rule.literal) for rule in free if len(rule.literal) == 1]
+        self.table = {ord(rule.literal): rule.replacement for rule in free if len(rule.literal) == 1}
+        # old -> (index, new) of the longer free tuples
+        self.free = {rule.literal: (rule.index, rule.replacement) for rule in free if len(rule.literal) > 1}
+        self.batch = re.compile('|'.join(re.escape(old) for old in self.free)) if self.free else None
+        self.inserted = [rule.replacement for rule in rules]
+        # same meaning as in WordPass; nothing is glued here
+        self.joined = []
+        alternatives = '|'.join(re.escape(old) for old in sorted({rule.literal for rule in rules},
+                                                                  key=len, reverse=True))
+        self.scanner = re.compile(alternatives)
+
+    def occurring(self, text):
+        found = {index for index, old, _ in self.tuples if old in text}
+        found.update(index for index, old in self.singles if old in text)
+        found.update(index for old, (index, _) in self.free.items() if old in text)
+        return found
+
+    def apply(self, text):
+        ## returns (new_text, counts) like FixEngine.apply
+        counts = {}
+        # the first tuple to match has to be on the page already
+        if not self.scanner.search(text):
+            return text, counts
+        if self.table:
+            for index, old in self.singles:
+                count = text.count(old)
+                if count:
+                    counts[index] = count
+            if counts:
+                text = text.translate(self.table)
+        if self.batch is not None:
+
+            def replace(match):
+                index, new = self.free[match.group()]
+                counts[index] = counts.get(index, 0) + 1
+                return new
+
+            text = self.batch.sub(replace, text)
+        for index, old, new in self.tuples:
+            count = text.count(old)
+            if count:
+                text = text.replace(old, new)
+                counts[index] = counts.get(index, 0) + count
+        return text, counts
+
+
+def _overlap(a, b):
+    ## whether an occurrence of `a` and one of `b` can share characters
+    if a in b or b in a:
+        return True
+    return any(a.endswith(b[:size]) or b.endswith(a[:size]) for size in range(1, min(len(a), len(b))))
+
+
+def chained(rules):
+    ## indices of the literal tuples of one normalize group that have to run in
+    ## their order: those whose matches can overlap another tuple's, or whose
+    ## output can make or take away a match of another (an empty one joins its
+    ## neighbours into anything); compile_rules marks them
+    found = set()
+    for position, rule in enumerate(rules):
+        for other in rules[position + 1:]:
+            if _overlap(rule.literal, other.literal) or _overlap(rule.replacement, other.literal) \
+                    or _overlap(other.replacement, rule.literal):
+                found.update((rule.index, other.index))
+    return found
+
+
+def to_nfc(text):
+    ## (text, changed); mediawiki saves NFC, so this is for pasted or bot-made text
+    if unicodedata.is_normalized('NFC', text):
+        return text, False
+    return unicodedata.normalize('NFC', text), True
+
+
+def nfc_index(rules):
+    ## the tuple NFC is counted against, None when the NFC_GROUP is not selected;
+    ## NFC itself runs before any tuple, and under that group's summary only
+    return next((rule.index for rule in rules if rule.normalize and rule.group == NFC_GROUP), None)
+
+
+def normalize_passes(rules):
+    ## {index of a group's first normalize tuple: NormalizePass}, like word_passes
+    groups = {}
+    for rule in rules:
+        if rule.normalize:
+            groups.setdefault(rule.group, []).append(rule)
+    return {members[0].index: NormalizePass(members) for members in groups.values()}
+
@@ -0,0 +1,112 @@
+import multiprocessing
+import os
+import pickle
+import queue
+import traceback
+
+# pages per task; large enough that queue traffic stays small next to the regex work
+BATCH_PAGES = 64
+# batches handed out but not yet written, per worker; bounds both queues and the reorder buffer
+IN_FLIGHT = 4
+# seconds to wait for a result before checking that the workers are still there
+POLL = 5
+
+_engine = None
+_work = None
+_args = ()
+
+
+def _worker(engine_bytes, work, args, tasks, results):
+    ## unpickles the compiled engine once, then runs `work(engine, text, *args)`
+    ## over every batch until it gets None
+    global _engine, _work, _args
+    _engine = pickle.loads(engine_bytes)
+    _work = work
+    _args = args
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        number, texts = task
+        try:
+            results.put((number, [_work(_engine, text, *_args) for text in texts], None))
+        except Exception:
+            results.put((number, None, traceback.format_exc()))
+
+
+def _batches(pages, size):
+    batch = []
+    for page in pages:
+        batch.append(page)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_parallel(engine, pages, work, args=(), workers=None, batch_pages=BATCH_PAGES):
+    ## yields (page, work(engine, page.text, *args)) in the order of `pages`;
+    ## `work` has to be a module level function so it can be sent to the workers
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        for page in pages:
+            yield page, work(engine, page.text, *args)
+        return
+
+    window = IN_FLIGHT * workers
+    tasks = multiprocessing.Queue(maxsize=window)
+    results = multiprocessing.Queue(maxsize=window)
+    engine_bytes = pickle.dumps(engine, protocol=pickle.HIGHEST_PROTOCOL)
+    processes = [multiprocessing.Process(target=_worker, args=(engine_bytes, work, args, tasks, results), daemon=True)
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+
+    # the dump is read here, in one process; pages waiting for their batch's
+    # result stay here too, only the texts travel to the workers
+    pending = {}
+    done = {}
+    next_out = 0
+    submitted = 0
+    try:
+        for batch in _batches(pages, batch_pages):
+            # never more than `window` batches out, so neither put below can block for good
+            while submitted - next_out >= window:
+                next_out = yield from _collect(results, processes, pending, done, next_out)
+            pending[submitted] = batch
+            tasks.put((submitted, [page.text for page in batch]))
+            submitted += 1
+        while next_out < submitted:
+            next_out = yield from _collect(results, processes, pending, done, next_out)
+        for _ in processes:
+            tasks.put(None)
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+
+def _collect(results, processes, pending, done, next_out):
+    ## waits for one result, then yields every page that is now next in line; a
+    ## worker that died (killed for memory, a crash in C) would leave its batch
+    ## out for good, so that ends the run instead of waiting forever
+    while True:
+        try:
+            number, output, error = results.get(timeout=POLL)
+            break
+        except queue.Empty:
+            for process in processes:
+                if not process.is_alive():
+                    raise RuntimeError(f"worker {process.pid} exited with code {process.exitcode}, "
+                                       f"{len(pending)} batches were still out")
+    if error is not None:
+        raise RuntimeError(f"worker failed on batch {number}:\n{error}")
+    done[number] = output
+    while next_out in done:
+        for page, result in zip(pending.pop(next_out), done.pop(next_out)):
+            yield page, result
+        next_out += 1
+    return next_out
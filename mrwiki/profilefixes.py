@@ -0,0 +1,153 @@
+import os
+import statistics
+import sys
+import time
+
+from dump import iter_sample
+from fixengine import compile_rules, fixes_file, handle_args, load_fixes, replace_except
+from regexlits import REPEATS, required_literals, sre_constants, sre_parse
+
+dump_file = os.path.expanduser("~/mrwiki/dump/mrwiki-latest-pages-articles.xml.bz2")
+
+# a lookaround with more branches than this is checked at every candidate position
+LARGE_ALTERNATION = 20
+# cpu time per MB this many times the median marks a tuple as slow
+SLOW_FACTOR = 5
+
+
+class RuleStats:
+    __slots__ = ('rule', 'matches', 'pages', 'cpu_ns', 'flags')
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.matches = 0
+        self.pages = 0
+        self.cpu_ns = 0
+        self.flags = []
+
+
+def _walk(items):
+    for op, av in items:
+        yield op, av
+        if op is sre_constants.BRANCH:
+            for branch in av[1]:
+                yield from _walk(branch)
+        elif op is sre_constants.SUBPATTERN:
+            yield from _walk(av[3])
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            yield from _walk(av[1])
+        elif op in REPEATS:
+            yield from _walk(av[2])
+
+
+def static_flags(rules):
+    ## flags that follow from the fix set alone: {rule index: [flag, ...]}
+    flags = {rule.index: [] for rule in rules}
+    seen = {}
+    for rule in rules:
+        if rule.old == rule.new or (rule.literal is not None and rule.literal == rule.replacement):
+            flags[rule.index].append('no-op')
+        key = (rule.group, rule.old, rule.new)
+        if key in seen:
+            flags[rule.index].append(f'duplicate of {rule.group}[{seen[key]}]')
+        else:
+            seen[key] = rule.position
+        if rule.literal is not None:
+            continue
+        nodes = list(_walk(sre_parse.parse(rule.compiled().pattern, rule.compiled().flags)))
+        if max((len(av[1]) for op, av in nodes if op is sre_constants.BRANCH), default=0) > LARGE_ALTERNATION:
+            flags[rule.index].append('large alternation')
+        if any(op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT) for op, av in nodes):
+            flags[rule.index].append('lookaround')
+        # the regex engine starts a match attempt at every occurrence of its
+        # required text; one character (or none) means nearly everywhere
+        condition = required_literals(rule.compiled())
+        if max((len(s) for alternative in condition for s in alternative), default=0) <= 1:
+            flags[rule.index].append('no selective literal')
+    return flags
+
+
+def profile(rules, pages):
+    ## runs every tuple the pywikibot way and times each one
+    stats = [RuleStats(rule) for rule in rules]
+    patterns = [rule.compiled() for rule in rules]
+    total_bytes = 0
+    page_count = 0
+    for text in pages:
+        page_count += 1
+        total_bytes += len(text.encode('utf-8'))
+        for rule, pattern, stat in zip(rules, patterns, stats):
+            start = time.process_time_ns()
+            text, count = replace_except(text, pattern, rule.new)
+            stat.cpu_ns += time.process_time_ns() - start
+            if count:
+                stat.matches += count
+                stat.pages += 1
+    return stats, page_count, total_bytes
+
+
+def flag_stats(stats, total_bytes):
+    flags = static_flags([stat.rule for stat in stats])
+    megabytes = max(total_bytes / 1e6, 1e-9)
+    per_mb = [stat.cpu_ns / megabytes for stat in stats]
+    median = statistics.median(per_mb) if per_mb else 0
+    for stat, cost in zip(stats, per_mb):
+        stat.flags = list(flags[stat.rule.index])
+        if stat.matches == 0:
+            stat.flags.append('never fired')
+        if median and cost > SLOW_FACTOR * median:
+            stat.flags.append(f'slow ({cost / median:.0f}x median)')
+    return stats
+
+
+def report(stats, page_count, total_bytes, out=sys.stdout):
+    out.write(f"{page_count} pages, {total_bytes / 1e6:.1f} MB\n\n")
+    groups = {}
+    for stat in stats:
+        group = groups.setdefault(stat.rule.group, [0, 0, 0, 0])
+        group[0] += stat.cpu_ns
+        group[1] += stat.matches
+        group[2] += 1
+        group[3] += 1 if stat.matches == 0 else 0
+    out.write(f"{'cpu ms':>9} {'matches':>8} {'tuples':>6} {'dead':>5}  group\n")
+    for name, (cpu_ns, matches, tuples, dead) in sorted(groups.items(), key=lambda item: -item[1][0]):
+        out.write(f"{cpu_ns / 1e6:9.1f} {matches:8} {tuples:6} {dead:5}  {name}\n")
+    out.write(f"\n{'cpu ms':>9} {'matches':>8} {'pages':>6}  {'tuple':<14} {'line':>5}  entry / flags\n")
+    for stat in sorted(stats, key=lambda stat: -stat.cpu_ns):
+        rule = stat.rule
+        where = f"{rule.group}[{rule.position}]"
+        out.write(f"{stat.cpu_ns / 1e6:9.1f} {stat.matches:8} {stat.pages:6}  {where:<14} {rule.lineno or '':>5}  "
+                  f"{rule.old!r} -> {rule.new!r}")
+        if stat.flags:
+            out.write(f"  [{', '.join(stat.flags)}]")
+        out.write("\n")
+
+
+def main():
+    options, positional = handle_args(sys.argv[1:])
+    path = os.path.expanduser(options.get('fixes', fixes_file))
+    fixes, lines = load_fixes(path)
+    errors = []
+    rules = compile_rules(fixes, options['fix'] or None, lines, errors)
+    for error in errors:
+        print(f"skipped {error}")
+    corpus = positional[0] if positional else dump_file
+    limit = int(options['limit']) if 'limit' in options else None
+
+    def texts():
+        for number, page in enumerate(iter_sample(corpus), start=1):
+            yield page.text
+            if limit and number >= limit:
+                break
+
+    stats, page_count, total_bytes = profile(rules, texts())
+    flag_stats(stats, total_bytes)
+    if 'out' in options:
+        with open(os.path.expanduser(options['out']), "w", encoding="utf-8") as f:
+            report(stats, page_count, total_bytes, f)
+    else:
+        report(stats, page_count, total_bytes)
+
+
+if __name__ == "__main__":
+    main()
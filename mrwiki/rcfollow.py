@@ -0,0 +1,232 @@
+import heapq
+import json
+import os
+import re
+import sys
+import time
+
+import pywikibot
+from pywikibot import pagegenerators
+
+from fixbot import CHECK_EVERY, fix_page, log, should_run
+from fixcache import artifact_path, cache_dir, load_engine
+from fixengine import fixes_file
+from wikimask import apply_prose
+
+state_file = os.path.expanduser("~/mrwiki/rcfollow_state.txt")
+
+SERVER = 'mr.wikipedia.org'
+# a page is fixed this long after its last edit, so a user saving section by section is not edited in between
+DEBOUNCE = 300
+# how often (seconds) the fix file is hashed again; a changed hash loads the new fix set
+RELOAD_EVERY = 60
+
+
+class Debouncer:
+    ## titles waiting for their edits to settle; an edit to a waiting title
+    ## pushes it back, so a page is fixed once after a burst of edits
+
+    def __init__(self, delay=DEBOUNCE):
+        self.delay = delay
+        # title -> (due, time of the first edit waited for)
+        self.waiting = {}
+        # (due, title), stale entries are skipped when popped
+        self.heap = []
+
+    def __len__(self):
+        return len(self.waiting)
+
+    def add(self, title, when):
+        due = when + self.delay
+        first = self.waiting[title][1] if title in self.waiting else when
+        self.waiting[title] = (due, first)
+        heapq.heappush(self.heap, (due, title))
+
+    def due(self, now):
+        ## titles whose last edit is at least `delay` old, oldest first
+        titles = []
+        while self.heap and self.heap[0][0] <= now:
+            due, title = heapq.heappop(self.heap)
+            if title in self.waiting and self.waiting[title][0] == due:
+                del self.waiting[title]
+                titles.append(title)
+        return titles
+
+    def everything(self):
+        titles = [title for _, title in sorted((due, title) for title, (due, _) in self.waiting.items())]
+        self.waiting = {}
+        self.heap = []
+        return titles
+
+    def oldest(self):
+        ## time of the earliest edit still waited for, where a restart has to pick up from
+        return min((first for _, first in self.waiting.values()), default=None)
+
+
+def wanted(event, own_user=None):
+    ## edits and creations of articles, not the bot's own
+    return (event.get('server_name') == SERVER and event.get('namespace') == 0
+            and event.get('type') in ('edit', 'new') and event.get('user') != own_user)
+
+
+def live_events(since=None):
+    from pywikibot.comms.eventstreams import EventStreams
+    if since is not None:
+        since = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(since))
+    # not filtered here: the other wikis' events keep the loop (and the debounce) ticking
+    # when mrwiki is quiet; wanted() picks ours
+    return iter(EventStreams(streams='recentchange', since=since))
+
+
+def replay_events(path):
+    ## recentchange events, one json object per line, as saved from the stream
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+class FixSet:
+    ## the compiled engine, kept in memory; reload() swaps in a new one when
+    ## the fix file's hash has changed, and keeps the old one if the new file is broken
+
+    def __init__(self, path=fixes_file, groups=None, directory=cache_dir):
+        self.path = path
+        self.groups = groups
+        self.directory = directory
+        self.artifact = artifact_path(path, groups, directory)
+        self.engine = load_engine(path, groups, directory)
+        self.checked = time.time()
+
+    def reload(self, force=False):
+        if not force and time.time() - self.checked < RELOAD_EVERY:
+            return False
+        self.checked = time.time()
+        try:
+            # the artifact name carries the content hash of the fix file
+            artifact = artifact_path(self.path, self.groups, self.directory)
+            if artifact == self.artifact:
+                return False
+            # a broken version is tried once, not every minute until it is fixed
+            self.artifact = artifact
+            engine = load_engine(self.path, self.groups, self.directory)
+        # a file that does not parse, a tuple that does not compile, a -fix group taken out
+        except (OSError, SyntaxError, ValueError, re.error, KeyError) as e:
+            log(f"fix file not reloaded, keeping the old fix set: {e}")
+            return False
+        self.engine = engine
+        log(f"fix set reloaded: {len(engine.rules)} rules")
+        return True
+
+    def group_names(self):
+        return self.groups or list(dict.fromkeys(rule.group for rule in self.engine.rules))
+
+
+def save_state(when, path=state_file):
+    if when is None:
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"{int(when)}\n")
+
+
+def load_state(path=state_file):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def follow(site, events, fix_set, debouncer, clock, masked=True, show=False, dry=False, limit=None, checkpoint=None):
+    ## fixes pages as their edits settle; `clock(event)` is the current time
+    ## (the wall clock live, the event's own timestamp when replaying); the
+    ## time to resume from is written to `checkpoint` when it stops
+    own_user = site.username()
+    totals = {'done': 0, 'skipped': 0, 'failed': 0}
+    last = None
+
+    def run(titles):
+        if not titles:
+            return True
+        fix_set.reload()
+        engine = fix_set.engine
+        groups = fix_set.group_names()
+        pages = pagegenerators.PreloadingGenerator(pywikibot.Page(site, title) for title in titles)
+        for page in pages:
+            if dry:
+                counts = {}
+                if page.exists() and not page.isRedirectPage():
+                    text = page.text
+                    new_text, counts = apply_prose(engine, text, groups) if masked else engine.apply(text, groups)
+                    counts = counts if new_text != text else {}
+                state = 'done' if counts else 'skipped'
+                if counts:
+                    print(f"[[{page.title()}]]: {', '.join(engine.groups_hit(counts))}")
+            else:
+                state = fix_page(page, engine, groups, masked, show)
+            totals[state] += 1
+            if state != 'done':
+                continue
+            if limit and totals['done'] >= limit:
+                return False
+            if not dry and totals['done'] % CHECK_EVERY == 0 and not should_run(site):
+                log("stopped from the shutoff page")
+                return False
+        return True
+
+    try:
+        for event in events:
+            now = clock(event)
+            if wanted(event, own_user):
+                debouncer.add(event['title'], event.get('timestamp', now))
+                last = event.get('timestamp', last)
+            if not run(debouncer.due(now)):
+                break
+        else:
+            # a replay ran out: nothing more will come for what is still waiting
+            run(debouncer.everything())
+    finally:
+        if checkpoint:
+            save_state(debouncer.oldest() or last, checkpoint)
+    return totals
+
+
+def main():
+    local_args = pywikibot.handle_args(sys.argv[1:])
+    groups = []
+    options = {}
+    for arg in local_args:
+        name, _, value = arg[1:].partition(':')
+        if name == 'fix':
+            groups.append(value)
+        else:
+            options[name] = value or True
+
+    site = pywikibot.Site("mr", "wikipedia")
+    dry = 'dry' in options
+    if not dry and not should_run(site):
+        print("shutoff page says stop")
+        return
+    fix_set = FixSet(os.path.expanduser(options.get('fixes', fixes_file)), groups or None)
+    debouncer = Debouncer(int(options.get('debounce', DEBOUNCE)))
+    checkpoint = None
+    if 'replay' in options:
+        events = replay_events(os.path.expanduser(options['replay']))
+        clock = lambda event: event.get('timestamp', 0)
+    else:
+        checkpoint = state_file
+        # after a restart, from the oldest edit that was still waiting
+        since = int(options['since']) if 'since' in options else load_state()
+        events = live_events(since)
+        clock = lambda event: time.time()
+    print(f"following {SERVER} with {len(fix_set.engine.rules)} rules, {debouncer.delay}s debounce")
+    totals = follow(site, events, fix_set, debouncer, clock, masked='nomask' not in options,
+                    show='show' in options, dry=dry, limit=int(options['limit']) if 'limit' in options else None,
+                    checkpoint=checkpoint)
+    print(f"{totals['done']} pages {'would change' if dry else 'saved'}, {totals['skipped']} already fine, "
+          f"{totals['failed']} failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import re
+
+try:
+    import re._parser as sre_parse
+    import re._constants as sre_constants
+except ImportError:  # python < 3.11
+    import sre_parse
+    import sre_constants
+
+REPEATS = tuple(getattr(sre_constants, name) for name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT')
+                if hasattr(sre_constants, name))
+
+# more alternatives than this and a clause is not worth keeping
+MAX_ALTERNATIVES = 16
+
+# a condition is in disjunctive form: a list of alternatives, each a frozenset
+# of strings that must all occur in the text; [frozenset()] means "no condition"
+ANYTHING = [frozenset()]
+
+
+def _simplify(alternatives):
+    result = []
+    for alternative in alternatives:
+        # a string inside another required string adds nothing
+        kept = frozenset(s for s in alternative if not any(s != other and s in other for other in alternative))
+        if not kept:
+            return ANYTHING
+        if kept not in result:
+            result.append(kept)
+    # an alternative that is a superset of another one is implied by it
+    return [a for a in result if not any(b < a for b in result)]
+
+
+def _and(left, right):
+    if left == ANYTHING:
+        return right
+    if right == ANYTHING:
+        return left
+    product = [a | b for a in left for b in right]
+    if len(product) > MAX_ALTERNATIVES:
+        # keeping one side is weaker but still true for every match
+        return left if len(left) <= len(right) else right
+    return _simplify(product)
+
+
+def _or(left, right):
+    if left == ANYTHING or right == ANYTHING:
+        return ANYTHING
+    combined = _simplify(left + right)
+    if len(combined) > MAX_ALTERNATIVES:
+        return ANYTHING
+    return combined
+
+
+def _from_exact(strings):
+    if '' in strings:
+        return ANYTHING
+    return _simplify([frozenset([s]) for s in strings])
+
+
+def _cross(left, right):
+    product = {a + b for a in left for b in right}
+    return product if len(product) <= MAX_ALTERNATIVES else None
+
+
+def _analyse(items):
+    ## returns (exact, condition): exact is the set of strings the items can
+    ## match when that is small and known, condition is the DNF every match satisfies
+    condition = ANYTHING
+    current = {''}
+    is_exact = True
+    for op, av in items:
+        exact, inner = _analyse_item(op, av)
+        if exact is not None:
+            crossed = _cross(current, exact)
+            if crossed is not None:
+                current = crossed
+                continue
+            condition = _and(condition, _from_exact(current))
+            current = exact
+            is_exact = False
+            continue
+        condition = _and(condition, _from_exact(current))
+        condition = _and(condition, inner)
+        current = {''}
+        is_exact = False
+    if is_exact:
+        return current, _from_exact(current)
+    return None, _and(condition, _from_exact(current))
+
+
+def _analyse_item(op, av):
+    if op is sre_constants.LITERAL:
+        return {chr(av)}, None
+    if op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        # zero width: the text around it is adjacent in the match
+        return {''}, None
+    if op is sre_constants.SUBPATTERN:
+        _, add_flags, _, pattern = av
+        if add_flags & sre_constants.SRE_FLAG_IGNORECASE:
+            return None, ANYTHING
+        return _analyse(pattern)
+    if op is sre_constants.BRANCH:
+        exact = set()
+        condition = None
+        for branch in av[1]:
+            branch_exact, branch_condition = _analyse(branch)
+            if exact is not None and branch_exact is not None:
+                exact |= branch_exact
+            else:
+                exact = None
+            if branch_condition is None:
+                branch_condition = _from_exact(branch_exact)
+            condition = branch_condition if condition is None else _or(condition, branch_condition)
+        if exact is not None and len(exact) <= MAX_ALTERNATIVES:
+            return exact, None
+        return None, condition
+    if op in REPEATS:
+        low, high, pattern = av
+        if low == 0:
+            return None, ANYTHING
+        exact, condition = _analyse(pattern)
+        if exact is not None and low == high and low <= 4:
+            repeated = {''}
+            for _ in range(low):
+                repeated = _cross(repeated, exact)
+                if repeated is None:
+                    break
+            if repeated is not None:
+                return repeated, None
+        return None, condition if exact is None else _from_exact(exact)
+    # character classes, '.', backreferences ...: no literal to rely on
+    return None, ANYTHING
+
+
+def required_literals(pattern, flags=0):
+    ## DNF of literal strings a match of `pattern` must contain, e.g.
+    ## r'\{\{ *PAGENAME *\}\}' -> [{'{{', 'PAGENAME', '}}'}]
+    if isinstance(pattern, re.Pattern):
+        flags |= pattern.flags
+        pattern = pattern.pattern
+    parsed = sre_parse.parse(pattern, flags)
+    # picks up inline (?i) as well
+    flags |= parsed.state.flags
+    exact, condition = _analyse(parsed)
+    if exact is not None:
+        condition = _from_exact(exact)
+    if flags & re.IGNORECASE:
+        # only caseless strings (Devanagari, digits, punctuation) can be looked up as they are
+        condition = [frozenset(s for s in alternative if s.lower() == s == s.upper()) for alternative in condition]
+        condition = ANYTHING if any(not alternative for alternative in condition) else _simplify(condition)
+    return condition
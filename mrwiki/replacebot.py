@@ -1,4 +1,45 @@
 fixes = {
+	'normalize': {
+		'regex': True,
+		'normalize': True,
+		'msg': {'mr': 'युनिकोड सामान्यीकरण ([[सदस्य:KiranBOT II/typos#युनिकोड सामान्यीकरण|अधिक माहिती]])'},
+		'replacements': [
+# 33 entries; zero width joiners written as \u200d
+			('र्\u200d', 'ऱ्'),
+			('ा्', 'ा'),
+			('ाै', 'ौ'),
+			('ाे', 'ो'),
+			('ि्', 'ि'),
+			('ी्', 'ी'),
+			('ु्', 'ु'),
+			('ू्', 'ू'),
+			('ृ्', 'ृ'),
+			('े्', 'े'),
+			('ै्', 'ै'),
+			('ो्', 'ो'),
+			('ौ्', 'ौ'),
+			('ाा', 'ा'),
+			('िि', 'ि'),
+			('ीी', 'ी'),
+			('ुु', 'ु'),
+			('ूू', 'ू'),
+			('ृृ', 'ृ'),
+			('ेे', 'े'),
+			('ैै', 'ै'),
+			('ोो', 'ो'),
+			('ौौ', 'ौ'),
+			('अॅं', 'अँ'),
+			('ॲं', 'अँ'),
+			('ॉं', 'ाँ'),
+			('ॅं', 'ँ'),
+			('अॅ', 'अ\u200dॅ'),
+			('अा', 'आ'),
+			('अॉ', 'ऑ'),
+			('अो', 'ओ'),
+			('अौ', 'औ'),
+			('एे', 'ऐ'),
+	],
+    },
 	'name1': {
 		'regex': True,
 		'nocase': True,
@@ -12,23 +53,23 @@ fixes = {
 		'msg': {'mr': 'शुद्धलेखन ([[सदस्य:KiranBOT II/typos#गट १|अधिक माहिती]])'},
 		'replacements': [
 # 29 entries, 28+1
-			('कृ्ष्ण', 'कृष्ण'),
+#			('कृ्ष्ण', 'कृष्ण'),
 			('मारुती चे', 'मारुतीचे'),
 			('फेब्रवारी', 'फेब्रुवारी'),
 			('आक्टोबर', 'ऑक्टोबर'),
-			('ळ्याात', 'ळ्यात'),
+#			('ळ्याात', 'ळ्यात'),
 			('सोअर्सफोर्ज', 'सोर्सफोर्ज'),
-			('अॅनिमेटेड', 'अ‍ॅनिमेटेड'),
-			('अॅनिमेशन', 'अ‍ॅनिमेशन'),
+#			('अॅनिमेटेड', 'अ‍ॅनिमेटेड'),
+#			('अॅनिमेशन', 'अ‍ॅनिमेशन'),
 			('अनिमेशन', 'अ‍ॅनिमेशन'),
-			('बॅंक', 'बँक'),
-			('अधिसू्चना', 'अधिसूचना'),
-			('जुलैै', 'जुलै'),
-			('पृृष्ठ', 'पृष्ठ'),
-			('नृृत्य', 'नृत्य'),
-			('तंटामु्क्त', 'तंटामुक्त'),
-			('अमरापूूर', 'अमरापूर'),
-			('गाैरव', 'गौरव'),
+#			('बॅंक', 'बँक'),
+#			('अधिसू्चना', 'अधिसूचना'),
+#			('जुलैै', 'जुलै'),
+#			('पृृष्ठ', 'पृष्ठ'),
+#			('नृृत्य', 'नृत्य'),
+#			('तंटामु्क्त', 'तंटामुक्त'),
+#			('अमरापूूर', 'अमरापूर'),
+#			('गाैरव', 'गौरव'),
 			('बद्दलुन', 'बदलून'),
 			('बदलुन', 'बदलून'),
 			('सांगकाम्याद्वारेसफाई', 'सांगकाम्याद्वारे सफाई'),
@@ -36,8 +77,8 @@ fixes = {
 			('व्दार', 'द्वार'),
 			('ध्द', 'द्ध'),
 			('उधृत', 'उद्धृत'),
-			('ॲंड', 'अँड'),
-			('कॉंग्रेस' , 'काँग्रेस'),
+#			('ॲंड', 'अँड'),
+#			('कॉंग्रेस' , 'काँग्रेस'),
 			('संशिप्त', 'संक्षिप्त'),
 			('==लवकर जीवन', '==प्रारंभिक जीवन'),
 			('== लवकर जीवन', '== प्रारंभिक जीवन'),
@@ -45,6 +86,7 @@ fixes = {
     },
 	'fix2': {
 		'regex': True,
+		'words': True,
 		'msg': {'mr': 'शुद्धलेखन ([[सदस्य:KiranBOT II/typos#गट २|अधिक माहिती]])'},
 		'replacements': [
 # 8-2 entries
@@ -78,6 +120,7 @@ fixes = {
     },
 	'fix4': {
 		'regex': True,
+		'words': True,
 		'msg': {'mr': 'शुद्धलेखन — योग्य उकार ([[सदस्य:KiranBOT II/typos#योग्य उकार|अधिक माहिती]])'},
 		'replacements': [
 # 10 entries, BOT1
@@ -143,6 +186,7 @@ fixes = {
     },
 	'fix6': {
 		'regex': True,
+		'words': True,
 		'msg': {'mr': 'शुद्धलेखन — ([[सदस्य:KiranBOT II/typos#नियम_५.२|शुद्धलेखनाचा नियम ५.२]])'},
 		'replacements': [
 # 11 entries
@@ -161,6 +205,7 @@ fixes = {
     },
 	'fix7': {
 		'regex': True,
+		'words': True,
 		'msg': {'mr': 'शुद्धलेखन — ([[सदस्य:KiranBOT II/typos#नियम_८.१|शुद्धलेखनाचा नियम ८.१]])'},
 		'replacements': [
 # 17-4 entries
@@ -182,6 +227,7 @@ fixes = {
     },
 	'fix8': {
 		'regex': True,
+		'words': True,
 		'msg': {'mr': 'शुद्धलेखन — ([[सदस्य:KiranBOT II/typos#नियम ८.६|शुद्धलेखनाचा नियम ८.६]])'},
 		'replacements': [
 # 35 entries
@@ -224,6 +270,7 @@ fixes = {
     },
 	'fix9': {
 		'regex': True,
+		'words': True,
 		'msg': {'mr': 'शुद्धलेखन — ([[सदस्य:KiranBOT II/typos#नियम ८.९|शुद्धलेखनाचा नियम ८.९]])'},
 		'replacements': [
 # 20 entries
@@ -251,6 +298,7 @@ fixes = {
     },
 	'fix10': {
 		'regex': True,
+		'words': True,
 		'msg': {'mr': 'शुद्धलेखन — ([[सदस्य:KiranBOT II/typos#नियम ११|शुद्धलेखनाचा नियम ११]])'},
 		'replacements': [
 # 5 entries
@@ -263,6 +311,7 @@ fixes = {
     },
 	'fix11': {
 		'regex': True,
+		'words': True,
 		'msg': {'mr': 'शुद्धलेखन — ([[सदस्य:KiranBOT II/typos#नियम १७|शुद्धलेखनाचा नियम १७]])'},
 		'replacements': [
 # 3 entries
@@ -273,6 +322,7 @@ fixes = {
     },
 	'fix12': {
 		'regex': True,
+		'words': True,
 		'msg': {'mr': 'दोन शब्दांमधील जागा काढली ([[सदस्य:KiranBOT II/typos#दोन शब्दांमधील जागा|अधिक माहिती]])'},
 		'replacements': [
 # 12-1 entries
@@ -295,7 +345,8 @@ fixes = {
 		'msg': {'mr': 'शुद्धलेखन — शहराचे अचूक नाव ([[सदस्य:KiranBOT II/typos#शहराचे अचूक नाव|अधिक माहिती]])'},
 		'replacements': [
 # 7 entries
-			('न्यू झीलॅंड', 'न्यू झीलंड'),
+#			('न्यू झीलॅंड', 'न्यू झीलंड'),
+			('न्यू झीलँड', 'न्यू झीलंड'),
 			('न्यूझीलंड', 'न्यू झीलंड'),
 			('न्यूयॉर्क', 'न्यू यॉर्क'),
 			('सोव्हियेत', 'सोव्हिएत'),
@@ -309,8 +360,8 @@ fixes = {
 		'msg': {'mr': 'शुद्धलेखन — योग्य रकार ([[सदस्य:KiranBOT II/typos#योग्य रकार|अधिक माहिती]])'},
 		'replacements': [
 # 41 entries
-			('र्‍य', 'ऱ्य'),
-			('र्‍ह', 'ऱ्ह'),
+#			('र्‍य', 'ऱ्य'),
+#			('र्‍ह', 'ऱ्ह'),
 			('किनार्याची', 'किनाऱ्याची'),
 			('तर्ह', 'तऱ्ह'),
 			('बर्हाणपूर', 'बऱ्हाणपूर'),
@@ -396,144 +447,151 @@ fixes = {
     },
 	'fix18': {
 		'regex': True,
+		'words': True,
 		'msg': {'mr': 'शुद्धलेखन — पररूप संधी - इक प्रत्यय ([[सदस्य:KiranBOT II/typos#पररूप संधी - इक प्रत्यय|अधिक माहिती]])'},
 		'replacements': [
-# 134-3 entries
+# 30-3 entries
 			('अंतरीक', 'आंतरिक'),
 			(' अधीक ', ' अधिक '),
-			('अधिकाधीक', 'अधिकाधिक'),
-			('अत्याधीक', 'अत्याधिक'),
 			('अध्यात्मिक', 'आध्यात्मिक'),
 			('अध्यात्मीक', 'आध्यात्मिक'),
-			('आध्यात्मीक', 'आध्यात्मिक'),
-			('अनामीक', 'अनामिक'),
-			('अनुनासीक', 'अनुनासिक'),
-			('अनौपचारीक', 'अनौपचारिक'),
-			('अलंकारीक', 'अलंकारिक'),
-			('आण्वीक', 'आण्विक'),
-			('आंतरीक', 'आंतरिक'),
-			('आधुनीक', 'आधुनिक'),
-			('आयुर्वेदीक', 'आयुर्वेदिक'),
-			('आर्थीक', 'आर्थिक'),
 			(' इस्लामीक ', ' इस्लामिक '),
-			('ऐच्छीक', 'ऐच्छिक'),
-			('ऐतिहासीक', 'ऐतिहासिक'),
 			('ऐतीहासीक', 'ऐतिहासिक'),
-			('ऐहीक', 'ऐहिक'),
-			('औद्योगीक', 'औद्योगिक'),
-			('औपचारीक', 'औपचारिक'),
-			('औष्णीक', 'औष्णिक'),
-			('कायीक', 'कायिक'),
-			('काल्पनीक', 'काल्पनिक'),
-			('कौटुंबीक', 'कौटुंबिक'),
 			('खर्चीक ', 'खर्चिक '),
-			('चमत्कारीक', 'चमत्कारिक'),
-			('जागतीक', 'जागतिक'),
-			('जैवीक', 'जैविक'),
-			('तात्कालीक', 'तात्कालिक'),
-			('तांत्रीक', 'तांत्रिक'),
 			('तात्वीक', 'तात्त्विक'),
-			('तार्कीक', 'तार्किक'),
-			('तौलनीक', 'तौलनिक'),
 			('दैवीक ', 'दैविक '),
-			('दैहीक', 'दैहिक'),
-			('धार्मीक', 'धार्मिक'),
-			('नागरीक', 'नागरिक'),
-			('नावीक', 'नाविक'),
-			('नैतीक', 'नैतिक'),
-			('नैसर्गीक', 'नैसर्गिक'),
-			('न्यायीक', 'न्यायिक'),
 			('परीवारीक', 'पारिवारिक'),
-			('पारंपरीक', 'पारंपरिक'),
-			('पारंपारीक', 'पारंपारिक'),
-			('पारितोषीक', 'पारितोषिक'),
-			('पारिवारीक', 'पारिवारिक'),
 			('पैराणीक', 'पौराणिक'),
-			('पौराणीक', 'पौराणिक'),
-			('पौष्टीक', 'पौष्टिक'),
 #			('प्रमाणीक', 'प्रामाणिक'),
-			('प्राकृतीक', 'प्राकृतिक'),
-			('प्रांतीक', 'प्रांतिक'),
-			('प्राथमीक', 'प्राथमिक'),
-			('प्रादेशीक', 'प्रादेशिक'),
 #			('प्रामाणीक', 'प्रामाणिक'),
-			('प्रायोगीक', 'प्रायोगिक'),
-			('प्रारंभीक', 'प्रारंभिक'),
-			('प्रासंगीक', 'प्रासंगिक'),
-			('बौद्धीक', 'बौद्धिक'),
-			('भावनीक', 'भावनिक'),
-			('भावीक', 'भाविक'),
-			('भाषीक', 'भाषिक'),
-			('भौगोलीक', 'भौगोलिक'),
-			('भौमितीक', 'भौमितिक'),
-			('माध्यमीक', 'माध्यमिक'),
-			('मानसीक', 'मानसिक'),
-			('मार्मीक', 'मार्मिक'),
-			('मासीक', 'मासिक'),
-			('मौखीक', 'मौखिक'),
-			('यांत्रीक', 'यांत्रिक'),
-			('यौगीक', 'यौगिक'),
 			('रसायनीक', 'रासायनिक'),
-			('राजसीक', 'राजसिक'),
-			('लिपीक', 'लिपिक'),
-			('लैंगीक', 'लैंगिक'),
-			('लौकीक', 'लौकिक'),
 			('वयैक्तीक', 'वैयक्तिक'),
 			('वय्यक्तीक', 'वैयक्तिक'),
-			('वार्षीक', 'वार्षिक'),
-			('वास्तवीक', 'वास्तविक'),
-			('वैकल्पीक', 'वैकल्पिक'),
-			('वैचारीक', 'वैचारिक'),
-			('वैज्ञानीक', 'वैज्ञानिक'),
-			('वैदीक', 'वैदिक'),
-			('वैधानीक', 'वैधानिक'),
-			('वैमानीक', 'वैमानिक'),
-			('वैयक्तीक', 'वैयक्तिक'),
-			('वैवाहीक', 'वैवाहिक'),
-			('वैश्वीक', 'वैश्विक'),
-			('व्याकरणीक', 'व्याकरणिक'),
 #			('व्यावसायीक', 'व्यावसायिक'),
-			('व्यावहारीक', 'व्यावहारिक'),
-			('शाब्दीक', 'शाब्दिक'),
 			('शारिरीक', 'शारीरिक'),
-			('शारीरीक', 'शारीरिक'),
-			('शैक्षणीक', 'शैक्षणिक'),
 			('शैक्षीणीक', 'शैक्षणिक'),
 			('संगीतीक', 'सांगीतिक'),
-			('सपत्नीक', 'सपत्निक'),
 			('समूदायीक', 'सामुदायिक'),
-			('सयुक्तीक', 'सयुक्तिक'),
-			('संयुक्तीक', 'संयुक्तिक'),
 			('सयूक्तीक', 'सयुक्तिक'),
-			('सर्वाधीक', 'सर्वाधिक'),
 			('संविधानीक', 'सांविधानिक'),
 			('संसारीक', 'सांसारिक'),
 			('संस्कृतीक', 'सांस्कृतिक'),
-			('संस्थानीक', 'संस्थानिक'),
-			('सांकेतीक', 'सांकेतिक'),
-			('सांख्यीक', 'सांख्यिक'),
 			('सांगितीक', 'सांगीतिक'),
-			('सांगीतीक', 'सांगीतिक'),
-			('सात्वीक', 'सात्विक'),
-			('साप्ताहीक', 'साप्ताहिक'),
-			('सामाजीक', 'सामाजिक'),
-			('सामायीक', 'सामायिक'),
-			('सामुदायीक', 'सामुदायिक'),
 			('सामुहीक', 'सामूहिक'),
-			('सामूहीक', 'सामूहिक'),
-			('सार्वजनीक', 'सार्वजनिक'),
-			('सार्वत्रीक', 'सार्वत्रिक'),
-			('सांसारीक', 'सांसारिक'),
 			('सांस्कृतीक ', 'सांस्कृतिक '),
-			('साहित्यीक', 'साहित्यिक'),
 			('सिद्धांतीक', 'सैद्धांतिक'),
-			('स्थानीक', 'स्थानिक'),
-			('स्थायीक', 'स्थायिक'),
-			('स्फटीक', 'स्फटिक'),
+# before the 'suffixes' stems now, so भाव + ीक no longer turns it into स्वभाविक first
 			('स्वभावीक', 'स्वाभाविक'),
-			('स्वाभावीक', 'स्वाभाविक'),
-			('स्वस्तीक', 'स्वस्तिक'),
-			('हार्दीक', 'हार्दिक'),
+	],
+		'suffixes': [
+# 105 stems
+			('ीक', 'िक', [
+				'अधिकाध',
+				'अत्याध',
+				'आध्यात्म',
+				'अनाम',
+				'अनुनास',
+				'अनौपचार',
+				'अलंकार',
+				'आण्व',
+				'आंतर',
+				'आधुन',
+				'आयुर्वेद',
+				'आर्थ',
+				'ऐच्छ',
+				'ऐतिहास',
+				'ऐह',
+				'औद्योग',
+				'औपचार',
+				'औष्ण',
+				'काय',
+				'काल्पन',
+				'कौटुंब',
+				'चमत्कार',
+				'जागत',
+				'जैव',
+				'तात्काल',
+				'तांत्र',
+				'तार्क',
+				'तौलन',
+				'दैह',
+				'धार्म',
+				'नागर',
+				'नाव',
+				'नैत',
+				'नैसर्ग',
+				'न्याय',
+				'पारंपर',
+				'पारंपार',
+				'पारितोष',
+				'पारिवार',
+				'पौराण',
+				'पौष्ट',
+				'प्राकृत',
+				'प्रांत',
+				'प्राथम',
+				'प्रादेश',
+				'प्रायोग',
+				'प्रारंभ',
+				'प्रासंग',
+				'बौद्ध',
+				'भावन',
+				'भाव',
+				'भाष',
+				'भौगोल',
+				'भौमित',
+				'माध्यम',
+				'मानस',
+				'मार्म',
+				'मास',
+				'मौख',
+				'यांत्र',
+				'यौग',
+				'राजस',
+				'लिप',
+				'लैंग',
+				'लौक',
+				'वार्ष',
+				'वास्तव',
+				'वैकल्प',
+				'वैचार',
+				'वैज्ञान',
+				'वैद',
+				'वैधान',
+				'वैमान',
+				'वैयक्त',
+				'वैवाह',
+				'वैश्व',
+				'व्याकरण',
+				'व्यावहार',
+				'शाब्द',
+				'शारीर',
+				'शैक्षण',
+				'सपत्न',
+				'सयुक्त',
+				'संयुक्त',
+				'सर्वाध',
+				'संस्थान',
+				'सांकेत',
+				'सांख्य',
+				'सांगीत',
+				'सात्व',
+				'साप्ताह',
+				'सामाज',
+				'सामाय',
+				'सामुदाय',
+				'सामूह',
+				'सार्वजन',
+				'सार्वत्र',
+				'सांसार',
+				'साहित्य',
+				'स्थान',
+				'स्थाय',
+				'स्फट',
+				'स्वाभाव',
+				'स्वस्त',
+				'हार्द',
+			]),
 	],
     },
 	'fix19': {
@@ -568,83 +626,88 @@ fixes = {
 		'nocase': True,
 		'msg': {'mr': 'शुद्धलेखन — योग्य दीर्घ वेलांटी ([[सदस्य:KiranBOT II/typos#योग्य दीर्घ वेलांटी|अधिक माहिती]])'},
 		'replacements': [
-# 76 entries
-			('आंतरराष्ट्रीयिकरण', 'आंतरराष्ट्रीयीकरण'),
+# 21 entries
 			('आधुनिकरण', 'आधुनिकीकरण'),
-			('आधुनिकिकरण', 'आधुनिकीकरण'),
-			('इस्लामिकरण', 'इस्लामीकरण'),
-			('उदारिकरण', 'उदारीकरण'),
-			('एकत्रिकरण', 'एकत्रीकरण'),
-			('एकात्मिकरण', 'एकात्मीकरण'),
-			('एकिकरण', 'एकीकरण'),
-			('उद्योगिकरण', 'उद्योगीकरण'),
 			('औद्योगिकरण', 'उद्योगीकरण'),
 			('औद्योगीकरण', 'उद्योगीकरण'),
 			('औद्योगिकिकरण', 'औद्यौगिकीकरण'),
-			('खच्चिकरण', 'खच्चीकरण'),
-			('खासगिकरण', 'खासगीकरण'),
-			('चित्रिकरण', 'चित्रीकरण'),
 			('जागतिकरण', 'जगतीकरण'),
-			('जागतिकिकरण', 'जागतिकीकरण'),
-			('द्रविकरण', 'द्रवीकरण'),
-			('ध्रुविकरण', 'ध्रुवीकरण'),
 			('नविनिकरण', 'नवीनीकरण'),
 			('नविनीकरण', 'नवीनीकरण'),
-			('नवीनिकरण', 'नवीनीकरण'),
-			('नगरिकरण', 'नगरीकरण'),
-			('नागरिकरण', 'नागरीकरण'),
-			('नागरिकिकरण', 'नागरिकीकरण'),
-			('निर्जंतुकिकरण', 'निर्जंतुकीकरण'),
 			('निर्बिजीकरण', 'निर्बीजीकरण'),
-			('निर्बीजिकरण', 'निर्बीजीकरण'),
-			('निश्चितिकरण', 'निश्चितीकरण'),
 			('निश्चीतीकरण', 'निश्चितीकरण'),
-			('निःसंदिग्धिकरण', 'निःसंदिग्धीकरण'),
 			('नुतनिकरण', 'नूतनीकरण'),
 			('नुतनीकरण', 'नूतनीकरण'),
-			('न्यायाधिकरण', 'न्यायाधीकरण'),
-			('प्रमाणिकरण', 'प्रमाणीकरण'),
-			('प्रस्तुतिकरण', 'प्रस्तुतीकरण'),
 			('प्रस्तूतीकरण', 'प्रस्तुतीकरण'),
 			('प्राधीकरण', 'प्राधिकरण'),
 			('प्रामाणिकरण', 'प्रमाणीकरण'),
-			('प्रामाणिकिकरण', 'प्रामाणिकीकरण'),
-			('बाष्पिकरण', 'बाष्पीकरण'),
-			('यांत्रिकिकरण', 'यांत्रिकीकरण'),
 			('राष्ट्रियीकरण', 'राष्ट्रीयीकरण'),
-			('राष्ट्रीयिकरण', 'राष्ट्रीयीकरण'),
-			('रुंदिकरण', 'रुंदीकरण'),
-			('लसिकरण', 'लसीकरण'),
 			('लासिकरण', 'लसीकरण'),
-			('वर्गिकरण', 'वर्गीकरण'),
 			('विकीकरण', 'विकिकरण'),
-			('विकेंद्रिकरण', 'विकेंद्रीकरण'),
-			('विद्युतिकरण', 'विद्युतीकरण'),
-			('विभक्तिकरण', 'विभक्तीकरण'),
-			('विलगिकरण', 'विलगीकरण'),
 			('विलिनिकरण', 'विलीनीकरण'),
 			('विलिनीकरण', 'विलीनीकरण'),
-			('विस्तारिकरण', 'विस्तारीकरण'),
-			('व्यवसायिकरण', 'व्यवसायीकरण'),
 			('व्यावसायिकरण', 'व्यवसायीकरण'),
-			('शुद्धिकरण', 'शुद्धीकरण'),
-			('सक्षमिकरण', 'सक्षमीकरण'),
-			('संदर्भिकरण', 'संदर्भीकरण'),
-			('सबलिकरण', 'सबलीकरण'),
-			('समानिकरण', 'समानीकरण'),
-			('समिकरण', 'समीकरण'),
-			('सर्वत्रिकरण', 'सर्वत्रीकरण'),
-			('सशक्तिकरण', 'सशक्तीकरण'),
-			('सादरिकरण', 'सादरीकरण'),
 			('सार्वत्रिकरण', 'सर्वत्रीकरण'),
-			('सार्वत्रिकिकरण', 'सार्वत्रिकीकरण'),
-			('सुलभिकरण', 'सुलभीकरण'),
-			('सुशोभिकरण', 'सुशोभीकरण'),
-			('सुसूत्रिकरण', 'सुसूत्रीकरण'),
-			('सैद्धांतिकरण', 'सैद्धांतीकरण'),
-			('स्थानिकिकरण', 'स्थानिकीकरण'),
-			('स्थिरिकरण', 'स्थिरीकरण'),
-			('स्पष्टिकरण', 'स्पष्टीकरण'),
+	],
+		'suffixes': [
+# 55 stems
+			('िकरण', 'ीकरण', [
+				'आंतरराष्ट्रीय',
+				'आधुनिक',
+				'इस्लाम',
+				'उदार',
+				'एकत्र',
+				'एकात्म',
+				'एक',
+				'उद्योग',
+				'खच्च',
+				'खासग',
+				'चित्र',
+				'जागतिक',
+				'द्रव',
+				'ध्रुव',
+				'नवीन',
+				'नगर',
+				'नागर',
+				'नागरिक',
+				'निर्जंतुक',
+				'निर्बीज',
+				'निश्चित',
+				'निःसंदिग्ध',
+				'न्यायाध',
+				'प्रमाण',
+				'प्रस्तुत',
+				'प्रामाणिक',
+				'बाष्प',
+				'यांत्रिक',
+				'राष्ट्रीय',
+				'रुंद',
+				'लस',
+				'वर्ग',
+				'विकेंद्र',
+				'विद्युत',
+				'विभक्त',
+				'विलग',
+				'विस्तार',
+				'व्यवसाय',
+				'शुद्ध',
+				'सक्षम',
+				'संदर्भ',
+				'सबल',
+				'समान',
+				'सम',
+				'सर्वत्र',
+				'सशक्त',
+				'सादर',
+				'सार्वत्रिक',
+				'सुलभ',
+				'सुशोभ',
+				'सुसूत्र',
+				'सैद्धांत',
+				'स्थानिक',
+				'स्थिर',
+				'स्पष्ट',
+			]),
 	],
     },
 
@@ -661,6 +724,7 @@ fixes = {
     },
 	'visarg': {
 		'regex': True,
+		'normalize': True,
 		'msg': {'mr': 'शुद्धलेखन — इंग्रजी colon चा मराठी विसर्ग ([[सदस्य:KiranBOT II/typos#इंग्रजी colon चा मराठी विसर्ग|अधिक माहिती]])'},
 		'replacements': [
 # 43-3 entries
@@ -711,6 +775,7 @@ fixes = {
     },
 	'colon': {
                 'regex': True,
+		'normalize': True,
 		'msg': {'mr': 'शुद्धलेखन — मराठी विसर्गाचा इंग्रजी colon ([[सदस्य:KiranBOT II/typos#मराठी विसर्गाचा इंग्रजी colon|अधिक माहिती]])'},
                 'replacements': [
 #21 entries
@@ -773,3 +838,9 @@ fixes = {
 	],
     },
 }
+
+# pywikibot only reads 'replacements'; spell the 'suffixes' entries out for it,
+# after the replacements, where compile_rules puts them too
+for fix in fixes.values():
+	for suffix, new_suffix, stems in fix.get('suffixes', []):
+		fix['replacements'] = fix['replacements'] + [(stem + suffix, stem + new_suffix) for stem in stems]
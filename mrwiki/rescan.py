@@ -0,0 +1,220 @@
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+
+from dumpscan import candidates_dir, scan_page
+from fixcache import ENGINE_VERSION, load_engine
+from fixengine import fixes_file, handle_args
+from ngramindex import NgramIndex, index_file
+from regexlits import required_literals
+
+store_file = os.path.expanduser("~/mrwiki/index/fingerprints.sqlite")
+
+# matches: per page revision, the rules whose matching side occurs in it (the
+# fingerprint); results: per group, the pages it would change and how often
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rules (
+    ruleid INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS pages (
+    pageid INTEGER PRIMARY KEY,
+    revid INTEGER NOT NULL,
+    title TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS matches (
+    ruleid INTEGER NOT NULL,
+    pageid INTEGER NOT NULL,
+    PRIMARY KEY (ruleid, pageid)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS matches_pageid ON matches (pageid);
+CREATE TABLE IF NOT EXISTS groups (
+    name TEXT PRIMARY KEY,
+    signature TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    name TEXT NOT NULL,
+    pageid INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (name, pageid)
+) WITHOUT ROWID;
+"""
+
+
+def rule_key(rule):
+    ## what decides whether a tuple matches a page; the replacement does not,
+    ## so editing only the right hand side never needs a new fingerprint
+    return hashlib.sha1(repr((rule.old, rule.regex, rule.nocase, rule.word)).encode('utf-8')).hexdigest()[:16]
+
+
+def group_signature(rules):
+    entries = [(rule.old, rule.new, rule.regex, rule.nocase, rule.word, rule.word_new, rule.normalize) for rule in rules]
+    return hashlib.sha1(repr((ENGINE_VERSION, entries)).encode('utf-8')).hexdigest()[:16]
+
+
+def occurs(rule, text):
+    if rule.word is not None:
+        return rule.word in text
+    if rule.literal is not None:
+        return rule.literal in text
+    return rule.compiled().search(text) is not None
+
+
+def fingerprint(engine, text):
+    ## indices of the rules that match the text as it is; a group can only
+    ## change a page if one of its rules is in here
+    found = engine.detect(text)
+    # a gated regex rule in there only has its literals on the page so far
+    regexes = (found & engine.conditions.keys()) | set(engine.ungated)
+    found -= regexes
+    for rule_pass in engine.passes.values():
+        found.update(rule_pass.occurring(text))
+    found.update(index for index in regexes if occurs(engine.rules[index], text))
+    return found
+
+
+def rule_candidates(index, rule):
+    ## docids that can contain a match of the rule, None for "any"
+    if rule.word is not None:
+        return index.candidates([rule.word])
+    if rule.literal is not None:
+        return index.candidates([rule.literal])
+    docids = set()
+    for alternative in required_literals(rule.compiled()):
+        found = index.candidates(alternative)
+        if found is None:
+            return None
+        docids |= found
+    return docids
+
+
+def rescan(index, db, path=fixes_file, out_dir=candidates_dir):
+    engine = load_engine(path)
+    rules = engine.rules
+    groups = list(dict.fromkeys(rule.group for rule in rules))
+    start = time.perf_counter()
+
+    # rule diff: the store only knows rules it has evaluated on every page
+    stored = dict(db.execute("SELECT key, ruleid FROM rules"))
+    keys = {rule.index: rule_key(rule) for rule in rules}
+    added = {}
+    for rule in rules:
+        key = keys[rule.index]
+        if key not in stored and key not in added:
+            added[key] = rule
+    for key in added:
+        stored[key] = db.execute("INSERT INTO rules (key) VALUES (?)", (key,)).lastrowid
+    current = set(keys.values())
+    removed = [ruleid for key, ruleid in stored.items() if key not in current]
+    db.executemany("DELETE FROM matches WHERE ruleid = ?", ((ruleid,) for ruleid in removed))
+    db.executemany("DELETE FROM rules WHERE ruleid = ?", ((ruleid,) for ruleid in removed))
+    ruleid = {index: stored[key] for index, key in keys.items()}
+
+    # page diff against the index
+    known = dict(db.execute("SELECT pageid, revid FROM pages"))
+    live = index.live()
+    docid_of = {pageid: docid for docid, pageid, _, _ in live}
+    changed = [(docid, pageid, revid, title) for docid, pageid, revid, title in live if known.get(pageid) != revid]
+    gone = [pageid for pageid in known if pageid not in docid_of]
+    for table in ('pages', 'matches', 'results'):
+        db.executemany(f"DELETE FROM {table} WHERE pageid = ?", ((pageid,) for pageid in gone))
+
+    # groups whose tuples (or their order) changed get their results rebuilt
+    old_signatures = dict(db.execute("SELECT name, signature FROM groups"))
+    signatures = {group: group_signature([rule for rule in rules if rule.group == group]) for group in groups}
+    stale = [group for group in groups if old_signatures.get(group) != signatures[group]]
+    db.executemany("DELETE FROM results WHERE name = ?",
+                   ((group,) for group in list(old_signatures) if group not in signatures or group in stale))
+
+    def store_results(pageid, text, names):
+        for group, count in scan_page(engine, text, names).items():
+            db.execute("INSERT OR REPLACE INTO results (name, pageid, count) VALUES (?, ?, ?)", (group, pageid, count))
+
+    # new revisions: every rule, every group
+    for docid, pageid, revid, title in changed:
+        text = index.text(docid)
+        found = fingerprint(engine, text)
+        db.execute("DELETE FROM matches WHERE pageid = ?", (pageid,))
+        db.execute("DELETE FROM results WHERE pageid = ?", (pageid,))
+        db.executemany("INSERT OR IGNORE INTO matches (ruleid, pageid) VALUES (?, ?)",
+                       ((ruleid[i], pageid) for i in found))
+        db.execute("INSERT OR REPLACE INTO pages (pageid, revid, title) VALUES (?, ?, ?)", (pageid, revid, title))
+        store_results(pageid, text, list(dict.fromkeys(rules[i].group for i in found)))
+
+    # unchanged revisions: only the added rules, only where the index says they can occur
+    changed_pages = {pageid for _, pageid, _, _ in changed}
+    unchanged = [docid for docid, pageid, _, _ in live if pageid not in changed_pages]
+    checked = 0
+    if added and unchanged:
+        wanted = {}
+        for rule in added.values():
+            found = rule_candidates(index, rule)
+            for docid in (unchanged if found is None else found):
+                wanted.setdefault(docid, []).append(rule)
+        page_of = {docid: pageid for docid, pageid, _, _ in live}
+        for docid in sorted(wanted):
+            if page_of.get(docid) in changed_pages or docid not in page_of:
+                continue
+            text = index.text(docid)
+            checked += 1
+            db.executemany("INSERT OR IGNORE INTO matches (ruleid, pageid) VALUES (?, ?)",
+                           ((stored[keys[rule.index]], page_of[docid]) for rule in wanted[docid] if occurs(rule, text)))
+
+    # stale groups: pages whose fingerprint has one of the group's rules
+    recomputed = 0
+    for group in stale:
+        ids = sorted({ruleid[rule.index] for rule in rules if rule.group == group})
+        placeholders = ','.join('?' * len(ids))
+        pageids = [row[0] for row in db.execute(
+            f"SELECT DISTINCT pageid FROM matches WHERE ruleid IN ({placeholders})", ids)]
+        for pageid in pageids:
+            if pageid in changed_pages or pageid not in docid_of:
+                continue
+            store_results(pageid, index.text(docid_of[pageid]), [group])
+            recomputed += 1
+        db.execute("INSERT OR REPLACE INTO groups (name, signature) VALUES (?, ?)", (group, signatures[group]))
+    db.execute(f"DELETE FROM groups WHERE name NOT IN ({','.join('?' * len(groups))})", groups)
+    db.commit()
+
+    write_lists(db, groups, out_dir)
+    elapsed = time.perf_counter() - start
+    print(f"{len(added)} rules added, {len(removed)} removed, {len(stale)} groups changed")
+    print(f"{len(changed)} new revisions, {len(gone)} pages gone, {checked} pages checked for added rules, "
+          f"{recomputed} group results recomputed in {elapsed:.1f}s")
+
+
+def write_lists(db, groups, out_dir):
+    ## the same <group>.txt lists dumpscan.py writes
+    os.makedirs(out_dir, exist_ok=True)
+    for group in groups:
+        rows = db.execute("SELECT title, count FROM results JOIN pages USING (pageid) "
+                          "WHERE name = ? ORDER BY pageid", (group,)).fetchall()
+        with open(os.path.join(out_dir, f"{group}.txt"), "w", encoding="utf-8") as f:
+            for title, count in rows:
+                f.write(f"[[{title}]]\t{count}\n")
+        print(f"{group}: {len(rows)} pages, {sum(count for _, count in rows)} replacements")
+
+
+def main():
+    options, positional = handle_args(sys.argv[1:])
+    if positional:
+        # the pages come from the index, a dump given here would be silently left out
+        print("usage: python rescan.py [-index:path] [-store:path] [-fixes:file] [-out:dir]")
+        return
+    index = NgramIndex(os.path.expanduser(options.get('index', index_file)))
+    store = os.path.expanduser(options.get('store', store_file))
+    os.makedirs(os.path.dirname(store), exist_ok=True)
+    db = sqlite3.connect(store)
+    db.executescript(SCHEMA)
+    try:
+        rescan(index, db, os.path.expanduser(options.get('fixes', fixes_file)),
+               os.path.expanduser(options.get('out', candidates_dir)))
+    finally:
+        db.close()
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
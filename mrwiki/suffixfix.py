@@ -0,0 +1,69 @@
+import re
+
+
+class SuffixPass:
+    ## the stem + suffix tuples of a group's 'suffixes' entries as one pass over
+    ## the page: find the suffix, then walk back through a trie of the reversed
+    ## stems; the work per match is the length of the stem, not the number of stems
+
+    def __init__(self, rules):
+        # old suffix -> reversed stem trie; a node's '' holds (index, new suffix)
+        self.tries = {}
+        for rule in rules:
+            stem, old, new = rule.suffix
+            node = self.tries.setdefault(old, {})
+            for ch in reversed(stem):
+                node = node.setdefault(ch, {})
+            # the earlier tuple wins, as it would have run first
+            node.setdefault('', (rule.index, new))
+        self.inserted = sorted({rule.suffix[2] for rule in rules})
+        self.joined = []
+        self.scanner = re.compile('|'.join(re.escape(old) for old in sorted(self.tries, key=len, reverse=True)))
+
+    def _stems(self, text, start, node):
+        ## (index, new suffix) of every stem that ends at `start`
+        position = start - 1
+        while True:
+            if '' in node:
+                yield node['']
+            if position < 0:
+                return
+            node = node.get(text[position])
+            if node is None:
+                return
+            position -= 1
+
+    def occurring(self, text):
+        found = set()
+        for match in self.scanner.finditer(text):
+            found.update(index for index, _ in self._stems(text, match.start(), self.tries[match.group()]))
+        return found
+
+    def apply(self, text):
+        ## returns (new_text, counts) like FixEngine.apply
+        counts = {}
+        parts = []
+        last = 0
+        for match in self.scanner.finditer(text):
+            stems = list(self._stems(text, match.start(), self.tries[match.group()]))
+            if not stems:
+                continue
+            # every stem keeps itself, so only which tuple gets the count differs
+            index, new = min(stems)
+            parts.append(text[last:match.start()])
+            parts.append(new)
+            last = match.end()
+            counts[index] = counts.get(index, 0) + 1
+        if not counts:
+            return text, counts
+        parts.append(text[last:])
+        return ''.join(parts), counts
+
+
+def suffix_passes(rules):
+    ## {index of a group's first suffix tuple: SuffixPass}, like word_passes
+    groups = {}
+    for rule in rules:
+        if rule.suffix is not None:
+            groups.setdefault(rule.group, []).append(rule)
+    return {members[0].index: SuffixPass(members) for members in groups.values()}
@@ -0,0 +1,21 @@
+from editqueue import EditQueue
+
+WHEN = '2026-01-01T00:00:00Z'
+
+
+def queued(queue):
+    return dict(queue.db.execute("SELECT title, groups FROM queue"))
+
+
+def test_fill_with_some_groups_keeps_the_others(tmp_path):
+    queue = EditQueue(str(tmp_path / 'edits.sqlite'))
+    queue.fill([('A', 1, WHEN, 3, ['fix1']), ('B', 1, WHEN, 2, ['fix2']), ('C', 1, WHEN, 2, ['fix1', 'fix2'])])
+    # fix2 finds nothing any more: B goes, C stays for fix1, A is not touched
+    assert queue.fill([], groups=['fix2']) == (0, 0, 1)
+    assert queued(queue) == {'A': 'fix1', 'C': 'fix1'}
+    assert queue.fill([('A', 1, WHEN, 1, ['fix2'])], groups=['fix2']) == (0, 0, 0)
+    assert queued(queue) == {'A': 'fix1 fix2', 'C': 'fix1'}
+    # a full fill still drops what nothing finds
+    assert queue.fill([('C', 1, WHEN, 2, ['fix1'])]) == (0, 0, 1)
+    assert queued(queue) == {'C': 'fix1'}
+    queue.close()
@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+pytest.importorskip('pywikibot')
+
+import fixbot  # noqa: E402
+from fixengine import FixEngine, compile_rules, fixes_file, load_fixes  # noqa: E402
+from wikimask import prose_spans  # noqa: E402
+
+FIXES, LINES = load_fixes(fixes_file)
+
+
+class Page:
+    def __init__(self, title):
+        self._title = title
+
+    def title(self):
+        return self._title
+
+
+class Queue:
+    def __init__(self):
+        self.finished = []
+        self.released = False
+
+    def finish(self, title, state):
+        self.finished.append((title, state))
+
+    def release(self):
+        self.released = True
+
+
+def test_stops_at_budget(monkeypatch):
+    reached = []
+
+    def fix_page(page, engine, groups, masked=True, show=False):
+        reached.append(page.title())
+        return 'skipped' if page.title().endswith('0') else 'done'
+
+    monkeypatch.setattr(fixbot, 'fix_page', fix_page)
+    monkeypatch.setattr(fixbot, 'should_run', lambda site: True)
+    queue = Queue()
+    pages = (Page(f"page {number}") for number in range(1, 100))
+    saved, skipped = fixbot.fix_pages(None, pages, None, [], budget=12, queue=queue)
+    # page 10 is skipped on the way, the 12th save ends the run
+    assert (saved, skipped) == (12, 1)
+    assert reached == [f"page {number}" for number in range(1, 14)]
+    assert [title for title, _ in queue.finished] == reached
+    assert queue.released
+
+
+class Saved:
+    ## a page that is there and keeps what is saved to it
+    def __init__(self, title, text):
+        self._title = title
+        self.text = text
+        self.saved = None
+
+    def title(self):
+        return self._title
+
+    def exists(self):
+        return True
+
+    def isRedirectPage(self):
+        return False
+
+    def save(self, summary, minor=True, botflag=True):
+        self.saved = (self.text, summary)
+
+
+def zone_free_pages(rules, count=200, seed=15):
+    # the tuples' own words between spaces and punctuation, nothing the mask would skip
+    pieces = sorted({rule.literal or rule.word for rule in rules if rule.literal or rule.word})
+    marks = [' ', ' ', '.', ', ', '. ', '\n']
+    rnd = random.Random(seed)
+    pages = []
+    while len(pages) < count:
+        text = ''.join(rnd.choice(pieces) + rnd.choice(marks) for _ in range(rnd.randint(1, 20)))
+        if prose_spans(text) == [(0, len(text))]:
+            pages.append(text)
+    return pages
+
+
+def test_masked_saves_what_unmasked_does_without_skip_zones(monkeypatch):
+    monkeypatch.setattr(fixbot, 'log', lambda message: None)
+    rules = compile_rules(FIXES, None, LINES)
+    engine = FixEngine(rules, FIXES)
+    changed = 0
+    for number, text in enumerate(zone_free_pages(rules)):
+        masked, plain = Saved(f"page {number}", text), Saved(f"page {number}", text)
+        state = fixbot.fix_page(masked, engine, None, masked=True)
+        assert state == fixbot.fix_page(plain, engine, None, masked=False)
+        assert masked.saved == plain.saved, text
+        changed += state == 'done'
+    assert changed
@@ -0,0 +1,36 @@
+import pickle
+
+import pytest
+
+from fixcache import artifact_path, load_engine
+from fixengine import FixEngine
+
+FIXES = """fixes = {
+\t'a': {'regex': False, 'msg': {'mr': 'a'}, 'replacements': [('क', 'ख')]},
+}
+"""
+
+
+class OldEngine:
+    # unpickles as a FixEngine called the way an older version was
+    def __reduce__(self):
+        return FixEngine, ()
+
+
+@pytest.mark.parametrize('stale', [
+    # the pickled class's module is gone (ModuleNotFoundError)
+    b'cno_such_module\nEngine\n(tR.',
+    # the class takes other arguments now (TypeError)
+    pickle.dumps(OldEngine()),
+], ids=['module', 'arguments'])
+def test_stale_artifact_is_rebuilt(tmp_path, stale):
+    path = tmp_path / 'fixes.py'
+    path.write_text(FIXES, encoding='utf-8')
+    directory = str(tmp_path / 'cache')
+    load_engine(str(path), None, directory)
+    with open(artifact_path(str(path), None, directory), 'wb') as f:
+        f.write(stale)
+    engine = load_engine(str(path), None, directory)
+    assert engine.apply('क')[0] == 'ख'
+    # and written out again
+    assert isinstance(load_engine(str(path), None, directory), FixEngine)
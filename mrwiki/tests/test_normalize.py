@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from fixengine import FixEngine, apply_plain, compile_rules, fixes_file, load_fixes
+
+FIXES, LINES = load_fixes(fixes_file)
+NORMALIZE_GROUPS = [group for group, fix in FIXES.items() if fix.get('normalize')]
+
+
+def engine_for(groups):
+    rules = compile_rules(FIXES, groups, LINES)
+    return FixEngine(rules, FIXES), rules
+
+
+def samples(rules, count=2000, seed=11):
+    # the tuples' own strings glued together, so one tuple's output runs into the next
+    pieces = sorted({part for rule in rules for part in (rule.literal, rule.replacement) if part})
+    pieces += [' ', '.', 'क', 'ा', '्', 'ौ', '‍']
+    rnd = random.Random(seed)
+    return [''.join(rnd.choice(pieces) for _ in range(rnd.randint(1, 8))) for _ in range(count)]
+
+
+@pytest.mark.parametrize('text, expected', [('अाा', 'आ'), ('कूलाै्.', 'कूलौ.')])
+def test_chained_tuples(text, expected):
+    engine, rules = engine_for(['normalize'])
+    assert engine.apply(text)[0] == expected == apply_plain(text, rules)[0]
+    # the next run leaves the page alone
+    assert engine.apply(expected) == (expected, {})
+
+
+@pytest.mark.parametrize('group', NORMALIZE_GROUPS)
+def test_pass_matches_tuple_by_tuple(group):
+    engine, rules = engine_for([group])
+    for text in samples(rules):
+        assert engine.apply(text) == apply_plain(text, rules), text
+
+
+def test_nfc_only_under_normalize_group():
+    # 'é' decomposed is not NFC; the tuple fixes the visarga only
+    text = 'é विशेषत:'
+    engine, rules = engine_for(['visarg'])
+    new_text, counts = engine.apply(text)
+    assert new_text == 'é विशेषतः'
+    assert engine.groups_hit(counts) == ['visarg']
+    assert engine.apply('é ') == ('é ', {})
+
+    engine, rules = engine_for(['normalize', 'visarg'])
+    new_text, counts = engine.apply(text)
+    assert new_text == 'é विशेषतः'
+    assert engine.groups_hit(counts) == ['normalize', 'visarg']
+
+
+def test_free_tuples_run_ahead_of_chained_ones():
+    # ऩ and ऱ single characters, त: and ह: free, the last three feed one another
+    fixes = {'mixed': {'normalize': True, 'replacements': [
+        ('ऩ', 'न'), ('त:', 'तः'), ('अा', 'आ'), ('ऱ', 'र'), ('आा', 'आ'), ('ह:', 'हः'), ('ाा', 'ा')]}}
+    rules = compile_rules(fixes)
+    assert [rule.chained for rule in rules] == [False, False, True, False, True, False, True]
+    engine = FixEngine(rules, fixes)
+    assert engine.passes[0].table == {ord('ऩ'): 'न', ord('ऱ'): 'र'}
+    for text in samples(rules, seed=12):
+        assert engine.apply(text) == apply_plain(text, rules), text
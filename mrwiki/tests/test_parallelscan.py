@@ -0,0 +1,32 @@
+import os
+from collections import namedtuple
+
+import pytest
+
+import parallelscan
+
+Page = namedtuple('Page', 'title text')
+
+
+def length(engine, text):
+    return len(text)
+
+
+def die_on_x(engine, text):
+    if text == 'x':
+        # as the kernel would for memory: no traceback, no result
+        os._exit(9)
+    return len(text)
+
+
+def test_results_in_page_order():
+    pages = [Page(str(number), 'क' * number) for number in range(50)]
+    found = list(parallelscan.run_parallel(None, iter(pages), length, workers=3, batch_pages=4))
+    assert found == [(page, len(page.text)) for page in pages]
+
+
+def test_dead_worker_ends_the_run(monkeypatch):
+    monkeypatch.setattr(parallelscan, 'POLL', 0.1)
+    pages = [Page(str(number), 'x' if number == 10 else 'क') for number in range(40)]
+    with pytest.raises(RuntimeError, match='exited with code 9'):
+        list(parallelscan.run_parallel(None, iter(pages), die_on_x, workers=2, batch_pages=4))
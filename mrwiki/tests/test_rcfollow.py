@@ -0,0 +1,120 @@
+import random
+
+import pytest
+
+pytest.importorskip('pywikibot')
+
+import fixbot  # noqa: E402
+import rcfollow  # noqa: E402
+from fixengine import FixEngine, compile_rules, fixes_file, load_fixes  # noqa: E402
+from wikimask import prose_spans  # noqa: E402
+
+FIXES, LINES = load_fixes(fixes_file)
+
+GOOD = """fixes = {
+\t'a': {'regex': True, 'msg': {'mr': 'a'}, 'replacements': [('क(?=ख)', 'ग')]},
+\t'b': {'regex': True, 'msg': {'mr': 'b'}, 'replacements': [('च', 'छ')]},
+}
+"""
+
+
+@pytest.mark.parametrize('broken', [
+    # a tuple that does not compile (re.error)
+    GOOD.replace('क(?=ख)', 'क(?=ख'),
+    # the followed group taken out of the file (KeyError)
+    GOOD.replace("\t'a': {'regex': True, 'msg': {'mr': 'a'}, 'replacements': [('क(?=ख)', 'ग')]},\n", ''),
+    # not python any more (SyntaxError)
+    GOOD[:-3],
+], ids=['regex', 'group', 'syntax'])
+def test_broken_fix_file_keeps_the_old_engine(tmp_path, monkeypatch, broken):
+    logged = []
+    monkeypatch.setattr(rcfollow, 'log', logged.append)
+    path = tmp_path / 'fixes.py'
+    path.write_text(GOOD, encoding='utf-8')
+    fix_set = rcfollow.FixSet(str(path), ['a'], str(tmp_path / 'cache'))
+    engine = fix_set.engine
+    path.write_text(broken, encoding='utf-8')
+    assert not fix_set.reload(force=True)
+    assert fix_set.engine is engine
+    assert fix_set.engine.apply('कख')[0] == 'गख'
+    assert logged and logged[0].startswith('fix file not reloaded')
+    # the broken version is not tried again, a fixed one is
+    assert not fix_set.reload(force=True)
+    assert len(logged) == 1
+    path.write_text(GOOD.replace("'ग'", "'घ'"), encoding='utf-8')
+    assert fix_set.reload(force=True)
+    assert fix_set.engine.apply('कख')[0] == 'घख'
+
+
+class Site:
+    def username(self):
+        return 'KiranBOT'
+
+
+class Page:
+    def __init__(self, title, text):
+        self._title = title
+        self.text = text
+        self.saved = None
+
+    def title(self):
+        return self._title
+
+    def exists(self):
+        return True
+
+    def isRedirectPage(self):
+        return False
+
+    def save(self, summary, minor=True, botflag=True):
+        self.saved = (self.text, summary)
+
+
+class Fixed:
+    ## a FixSet that never reloads
+    def __init__(self, engine):
+        self.engine = engine
+
+    def reload(self, force=False):
+        return False
+
+    def group_names(self):
+        return None
+
+
+def zone_free_pages(rules, count=100, seed=18):
+    pieces = sorted({rule.literal or rule.word for rule in rules if rule.literal or rule.word})
+    marks = [' ', ' ', '.', ', ', '. ', '\n']
+    rnd = random.Random(seed)
+    pages = {}
+    while len(pages) < count:
+        text = ''.join(rnd.choice(pieces) + rnd.choice(marks) for _ in range(rnd.randint(1, 20)))
+        if prose_spans(text) == [(0, len(text))]:
+            pages[f"page {len(pages)}"] = text
+    return pages
+
+
+@pytest.mark.parametrize('dry', [False, True], ids=['save', 'dry'])
+def test_masked_follows_like_unmasked_without_skip_zones(monkeypatch, capsys, dry):
+    monkeypatch.setattr(fixbot, 'log', lambda message: None)
+    monkeypatch.setattr(rcfollow, 'should_run', lambda site: True)
+    monkeypatch.setattr(rcfollow.pagegenerators, 'PreloadingGenerator', lambda pages: pages, raising=False)
+    rules = compile_rules(FIXES, None, LINES)
+    engine = FixEngine(rules, FIXES)
+    texts = zone_free_pages(rules)
+    events = [{'server_name': rcfollow.SERVER, 'namespace': 0, 'type': 'edit', 'user': 'someone',
+               'title': title, 'timestamp': number} for number, title in enumerate(texts)]
+    runs = []
+    for masked in (True, False):
+        pages = {}
+
+        def make_page(site, title):
+            pages[title] = Page(title, texts[title])
+            return pages[title]
+
+        monkeypatch.setattr(rcfollow.pywikibot, 'Page', make_page, raising=False)
+        totals = rcfollow.follow(Site(), iter(events), Fixed(engine), rcfollow.Debouncer(delay=0),
+                                 lambda event: event['timestamp'], masked=masked, dry=dry)
+        runs.append((totals, {title: page.saved for title, page in pages.items()}, capsys.readouterr().out))
+    assert runs[0] == runs[1]
+    assert runs[0][0]['done']
@@ -0,0 +1,35 @@
+import runpy
+import warnings
+
+import pytest
+
+from fixengine import FixEngine, apply_plain, compile_rules, fixes_file, load_fixes
+
+FIXES, LINES = load_fixes(fixes_file)
+SUFFIX_GROUPS = [group for group, fix in FIXES.items() if fix.get('suffixes')]
+
+
+def pywikibot_rules(group):
+    # the group as pywikibot gets it: replacebot.py run, its stems spelled out into 'replacements'
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        fix = dict(runpy.run_path(fixes_file)['fixes'][group])
+    del fix['suffixes']
+    return compile_rules({group: fix}, [group])
+
+
+@pytest.mark.parametrize('group', SUFFIX_GROUPS)
+def test_same_as_pywikibot(group):
+    rules = compile_rules(FIXES, [group], LINES)
+    engine = FixEngine(rules, FIXES)
+    flat = pywikibot_rules(group)
+    assert [(rule.old, rule.new) for rule in flat] == [(rule.old, rule.new) for rule in rules]
+    for rule in flat:
+        text = f"{rule.old.strip()} आणि {rule.old.strip()}च्या"
+        assert engine.apply(text)[0] == apply_plain(text, flat)[0], text
+
+
+def test_stem_changing_tuple_runs_before_the_stems():
+    # before the suffix entries, भावीक -> भाविक came first and left स्वभाविक
+    rules = compile_rules(FIXES, ['fix18'], LINES)
+    assert FixEngine(rules, FIXES).apply('स्वभावीक')[0] == 'स्वाभाविक'
@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+from vocab import Vocab, build_vocab
+
+PARTS = ['ला', 'कर', 'त', 'नाही']
+
+
+@pytest.fixture
+def vocab(tmp_path):
+    rnd = random.Random(20)
+    letters = 'कखगतनलमराीेही'
+    counts = {''.join(rnd.choice(letters) for _ in range(rnd.randint(1, 7))): rnd.randint(1, 50)
+              for _ in range(500)}
+    counts.update({part: 3 for part in PARTS})
+    path = tmp_path / 'words.vocab'
+    build_vocab(counts, str(path), PARTS[:2])
+    loaded = Vocab(str(path))
+    yield loaded, counts
+    loaded.close()
+
+
+def expected(counts, part):
+    return sum(count * word.count(part) for word, count in counts.items() if word != part)
+
+
+def test_inside_precomputed_and_scanned_agree(vocab):
+    vocab, counts = vocab
+    # the first two were taken at build time, the others are scanned for
+    assert vocab.parts == 2
+    for part in PARTS + ['म', 'खग', 'झ']:
+        assert vocab.inside(part) == expected(counts, part), part
+    assert [vocab.count(word) for word in counts] == list(counts.values())
+
+
+def test_built_parts_are_not_scanned(vocab, monkeypatch):
+    vocab, counts = vocab
+    monkeypatch.setattr('vocab._inside', lambda *args: pytest.fail('scanned'))
+    assert [vocab.inside(part) for part in PARTS[:2]] == [expected(counts, part) for part in PARTS[:2]]
@@ -0,0 +1,55 @@
+import random
+import re
+
+import pytest
+
+from fixengine import FixEngine, compile_rules, fixes_file, load_fixes
+from wikimask import apply_prose, prose_spans, prose_view, splice
+
+FIXES, LINES = load_fixes(fixes_file)
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return FixEngine(compile_rules(FIXES, None, LINES), FIXES)
+
+
+@pytest.mark.parametrize('text', [
+    'हे वाक्य.<ref>स्रोत</ref>',
+    'हे वाक्य.<!-- टीप -->',
+    'हे वाक्य.{{संदर्भ हवा}}',
+    'हे वाक्य.<br />पुढे',
+])
+def test_lookahead_sees_the_markup(text):
+    # exp2's '\.(?!(…|\<|…))' must not take a masked tag for the end of the text
+    rules = compile_rules(FIXES, ['exp2'], LINES)
+    engine = FixEngine(rules, FIXES)
+    assert apply_prose(engine, text) == engine.apply(text) == (text, {})
+
+
+def test_match_stays_out_of_skip_zones():
+    rules = compile_rules(FIXES, ['name1'], LINES)
+    engine = FixEngine(rules, FIXES)
+    text = 'हे {{ PAGENAME }} पान'
+    assert engine.apply(text)[0] == 'हे {{subst:PAGENAME}} पान'
+    assert apply_prose(engine, text) == (text, {})
+
+
+def test_view_replaces_inside_spans_only():
+    text = 'अब<ref>ब</ref>कब{{साचा|ब=ड}}इ'
+    prose, view = prose_view(text)
+    new_prose, count = view.sub(prose, re.compile('ब|क.*इ'), lambda match: 'भ')
+    # the ref's ब and the parameter name ब are masked, क…इ would run across a template
+    assert count == 2
+    assert splice(text, prose_spans(text), new_prose) == 'अभ<ref>ब</ref>कभ{{साचा|ब=ड}}इ'
+
+
+def test_masked_matches_unmasked_without_skip_zones(engine):
+    # nothing to mask: the prose is the page, and so must be the result
+    rnd = random.Random(13)
+    words = ['हे', 'वाक्य', 'गुरु', 'केनिया', 'अंथरुण', 'ला', 'च', 'गाव', 'राम', 'आहे', '१२']
+    marks = [' ', ' ', '.', ',', '.)', '?', '\n', '. ']
+    for _ in range(300):
+        text = ''.join(rnd.choice(words) + rnd.choice(marks) for _ in range(rnd.randint(1, 15)))
+        assert prose_spans(text) == [(0, len(text))]
+        assert apply_prose(engine, text) == engine.apply(text), text
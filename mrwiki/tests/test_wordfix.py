@@ -0,0 +1,31 @@
+import random
+
+import pytest
+
+from fixengine import FixEngine, apply_plain, compile_rules, fixes_file, load_fixes
+
+FIXES, LINES = load_fixes(fixes_file)
+WORD_GROUPS = [group for group, fix in FIXES.items() if fix.get('words')]
+
+
+def samples(rules, count=2000, seed=8):
+    # the tuples' words with spaces and punctuation between, so glued suffixes meet
+    pieces = sorted({part for rule in rules for part in (rule.word, rule.word_new) if part})
+    pieces += [' ', ' ', ' ', '.', ',', '\n', 'गाव', 'राम']
+    rnd = random.Random(seed)
+    return [''.join(rnd.choice(pieces) for _ in range(rnd.randint(1, 12))) for _ in range(count)]
+
+
+def test_glued_suffix_ends_the_word_before():
+    # च runs first, so ला is no longer a word of its own when its turn comes
+    rules = compile_rules(FIXES, ['fix12'], LINES)
+    engine = FixEngine(rules, FIXES)
+    assert engine.apply('गाव ला च एक')[0] == 'गाव लाच एक' == apply_plain('गाव ला च एक', rules)[0]
+
+
+@pytest.mark.parametrize('group', WORD_GROUPS)
+def test_pass_matches_tuple_by_tuple(group):
+    rules = compile_rules(FIXES, [group], LINES)
+    engine = FixEngine(rules, FIXES)
+    for text in samples(rules):
+        assert engine.apply(text) == apply_plain(text, rules), text
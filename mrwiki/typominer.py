@@ -0,0 +1,234 @@
+import math
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+from dump import iter_pages
+from dumpscan import dump_file
+from fixcache import load_engine
+from fixengine import fixes_file, handle_args
+from parallelscan import run_parallel
+from wikimask import prose_text
+
+miner_dir = os.path.expanduser("~/mrwiki/typominer")
+counts_file = os.path.join(miner_dir, "words.tsv")
+
+# a devanagari word, without danda, digits and the abbreviation sign
+WORD = re.compile(r'[ऀ-ॣॱ-ॿ‌‍]+')
+# one grapheme cluster: a conjunct (consonants joined by virama) with its signs, or any other letter with its signs
+_CONSONANT = '[क-हक़-य़ॸ-ॿ]'
+_SIGN = '[ऀ-ःऺ-़ा-ौॎॏ॑-ॗॢॣ‌‍]'
+CLUSTER = re.compile(rf'(?:{_CONSONANT}{_SIGN}*्[‌‍]?)*{_CONSONANT}{_SIGN}*(?:्[‌‍]?)?'
+                     rf'|.{_SIGN}*', re.DOTALL)
+
+# edits (in clusters) between a variant and its form
+MAX_DISTANCE = 2
+# deletes are made from this many leading clusters only; longer words are checked in full afterwards
+PREFIX = 7
+# a word is a form others are compared to from this many occurrences
+MIN_FORM = 50
+# a variant has at most this many occurrences, and its form this many times more
+MAX_VARIANT = 200
+MIN_RATIO = 20
+# shorter words (in clusters) are mostly other real words one edit apart
+MIN_CLUSTERS = 3
+# words shorter than this (in clusters) are looked up one edit away only; two
+# deletes of a short word leave keys that half the vocabulary shares
+TWO_EDITS = 5
+
+
+def clusters(word):
+    return tuple(CLUSTER.findall(word))
+
+
+def page_words(engine, text, prose=True):
+    ## Counter of the words of one page (run_parallel work function, the engine is unused)
+    if prose:
+        text = prose_text(text)[0]
+    return Counter(WORD.findall(text))
+
+
+def count_words(path, limit=None, workers=1, prose=True):
+    def dump_pages():
+        for number, page in enumerate(iter_pages(path), start=1):
+            yield page
+            if limit and number >= limit:
+                break
+
+    total = Counter()
+    pages = 0
+    start = time.perf_counter()
+    for _, found in run_parallel(None, dump_pages(), page_words, (prose,), workers):
+        total.update(found)
+        pages += 1
+        if pages % 10000 == 0:
+            print(f"{pages} pages, {len(total)} words ({pages / (time.perf_counter() - start):.0f} pages/sec)")
+    return total, pages
+
+
+def save_counts(counts, path=counts_file):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        for word, count in counts.most_common():
+            f.write(f"{word}\t{count}\n")
+
+
+def load_counts(path=counts_file):
+    counts = Counter()
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            word, _, count = line.rstrip('\n').rpartition('\t')
+            if word:
+                counts[word] = int(count)
+    return counts
+
+
+def reach(units, max_distance=MAX_DISTANCE):
+    return min(max_distance, 1 if len(units) < TWO_EDITS else 2)
+
+
+def deletes(units, distance=MAX_DISTANCE):
+    ## every tuple left after removing up to `distance` units, the tuple itself included
+    found = {units}
+    edge = {units}
+    for _ in range(distance):
+        edge = {item[:i] + item[i + 1:] for item in edge for i in range(len(item))} - found
+        found |= edge
+    return found
+
+
+def distance(a, b, limit=MAX_DISTANCE):
+    ## optimal string alignment distance over clusters, or limit + 1 once it is above limit
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    # only the middle where they differ needs the table
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and end < len(b) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a = a[start:len(a) - end]
+    b = b[start:len(b) - end]
+    if not a or not b:
+        return min(len(a) + len(b), limit + 1)
+    if len(a) == len(b) == 1 or (len(a) == len(b) == 2 and a == b[::-1]):
+        return 1
+    if limit == 1:
+        return 2
+    # only the band |i - j| <= limit can stay within limit
+    over = limit + 1
+    previous2 = None
+    previous = [min(j, over) for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [min(i, over)] + [over] * len(b)
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return over
+        previous2, previous = previous, current
+    return min(previous[-1], over)
+
+
+class DeleteIndex:
+    ## symmetric delete index (as in SymSpell) over grapheme clusters: every form
+    ## is stored under the deletes of its first PREFIX clusters, a variant looks
+    ## up its own deletes, so a lookup costs the variant's deletes, not the vocabulary
+
+    def __init__(self, forms, max_distance=MAX_DISTANCE, prefix=PREFIX):
+        self.max_distance = max_distance
+        self.prefix = prefix
+        self.forms = {}
+        self.index = {}
+        for word in forms:
+            units = clusters(word)
+            self.forms[word] = units
+            for key in deletes(units[:prefix], reach(units, max_distance)):
+                self.index.setdefault(key, []).append(word)
+
+    def lookup(self, word):
+        ## [(distance, form)] of the forms within max_distance of `word`
+        units = clusters(word)
+        limit = reach(units, self.max_distance)
+        seen = {word}
+        found = []
+        for key in deletes(units[:self.prefix], limit):
+            for form in self.index.get(key, ()):
+                if form in seen:
+                    continue
+                seen.add(form)
+                edits = distance(units, self.forms[form], limit)
+                if edits <= limit:
+                    found.append((edits, form))
+        return found
+
+
+def already_fixed(engine, word):
+    padded = f" {word} "
+    return engine.apply(padded)[0] != padded
+
+
+def mine(counts, engine=None, min_form=MIN_FORM, max_variant=MAX_VARIANT, min_ratio=MIN_RATIO):
+    ## [(score, variant, form, variant count, form count, distance)], best first:
+    ## rare words close to a much more frequent one, not yet handled by the fix set
+    forms = [word for word, count in counts.items() if count >= min_form and len(clusters(word)) >= MIN_CLUSTERS]
+    index = DeleteIndex(forms)
+    candidates = []
+    for word, count in counts.items():
+        if count > max_variant or len(clusters(word)) < MIN_CLUSTERS:
+            continue
+        matches = [(edits, -counts[form], form) for edits, form in index.lookup(word)
+                   if counts[form] >= min_ratio * count]
+        if not matches:
+            continue
+        # the closest form, the commonest of those
+        edits, _, form = min(matches)
+        if engine is not None and already_fixed(engine, word):
+            continue
+        # what a tuple would fix, weighted by how sure the form is and down for two edits
+        score = count * math.log10(counts[form] / count) / edits
+        candidates.append((score, word, form, count, counts[form], edits))
+    candidates.sort(reverse=True)
+    return candidates, len(forms)
+
+
+def main():
+    options, positional = handle_args(sys.argv[1:])
+    counts_path = os.path.expanduser(options.get('counts', counts_file))
+    start = time.perf_counter()
+    if 'count' in options or not os.path.exists(counts_path):
+        path = positional[0] if positional else dump_file
+        if not os.path.exists(path):
+            print(f"error: dump not found: {path}")
+            return
+        counts, pages = count_words(path, int(options['limit']) if 'limit' in options else None,
+                                    int(options.get('workers', 1)), 'nomask' not in options)
+        save_counts(counts, counts_path)
+        print(f"{pages} pages, {len(counts)} words, {sum(counts.values())} tokens "
+              f"counted in {time.perf_counter() - start:.0f}s, written to {counts_path}")
+    else:
+        counts = load_counts(counts_path)
+
+    start = time.perf_counter()
+    # words the fix set already changes are not proposed again
+    engine = None if 'all' in options else load_engine(fixes_file)
+    candidates, forms = mine(counts, engine, int(options.get('minform', MIN_FORM)),
+                             int(options.get('maxvariant', MAX_VARIANT)), int(options.get('ratio', MIN_RATIO)))
+    out = os.path.expanduser(options.get('out', os.path.join(miner_dir, "candidates.txt")))
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        # ready to paste into a group's 'replacements' after a look at each
+        for score, word, form, count, form_count, edits in candidates[:int(options.get('top', 1000))]:
+            f.write(f"\t\t\t('{word}', '{form}'),\t# {count} vs {form_count}, {edits} edit{'s' if edits > 1 else ''}, "
+                    f"score {score:.1f}\n")
+    print(f"{len(candidates)} candidates from {len(counts)} words ({forms} forms) "
+          f"in {time.perf_counter() - start:.1f}s, written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from bisect import bisect_right
+
+from dumpscan import dump_file
+from fixengine import compile_rules, fixes_file, handle_args, load_fixes
+from typominer import WORD, count_words, counts_file, load_counts
+
+vocab_file = os.path.expanduser("~/mrwiki/vocab/words.vocab")
+
+# magic, words, hash slots, bytes of words, parts, bytes of parts; then the slots (uint32,
+# entry + 1, 0 = empty), the word offsets (uint64, one more than words), the counts (uint64)
+# and the utf-8 words, each word followed by a newline and padded to 8 bytes; then the same
+# for the sorted parts, the old words of the fix set's tuples, with their inside() counts
+# taken at build time; arrays are in the byte order of the machine that built it
+HEADER = struct.Struct('<8sQQQQQ')
+MAGIC = b'MRVOCAB2'
+
+# fewer occurrences than this, on either side, is no evidence either way
+MIN_EVIDENCE = 20
+# a tuple that is not whole-word is risky when the old text occurs inside longer words
+# this many times more than on its own
+INSIDE_RATIO = 1.0
+# and the old text is a word of its own when it is at least this share of the new one
+REAL_RATIO = 0.2
+
+
+def _slot(word_bytes, slots):
+    return zlib.crc32(word_bytes) & (slots - 1)
+
+
+def _inside(data, start, offsets, counts, size, encoded):
+    ## occurrences of `encoded` inside the longer of `size` words stored from
+    ## `start` of `data`, each word weighted by its count; mmap.find over all the
+    ## words, a bisect per hit
+    end = start + offsets[size]
+    total = 0
+    position = data.find(encoded, start, end)
+    while position >= 0:
+        entry = bisect_right(offsets, position - start) - 1
+        if offsets[entry + 1] - offsets[entry] - 1 != len(encoded):
+            total += counts[entry]
+        position = data.find(encoded, position + 1, end)
+    return total
+
+
+def _padding(size):
+    return bytes(-size % 8)
+
+
+def build_vocab(counts, path=vocab_file, parts=()):
+    ## writes {word: count} as an open addressing hash table over a sorted word list,
+    ## with inside() of every one of `parts` worked out once here
+    words = sorted(counts)
+    slots = 2
+    while slots < 2 * len(words):
+        slots *= 2
+    table = array('I', bytes(4 * slots))
+    offsets = array('Q', [0])
+    numbers = array('Q')
+    blob = bytearray()
+    for entry, word in enumerate(words):
+        encoded = word.encode('utf-8')
+        slot = _slot(encoded, slots)
+        while table[slot]:
+            slot = (slot + 1) & (slots - 1)
+        table[slot] = entry + 1
+        blob += encoded + b'\n'
+        offsets.append(len(blob))
+        numbers.append(counts[word])
+    # utf-8 sorts like the strings it encodes, Vocab bisects the parts as bytes
+    parts = sorted(parts)
+    part_offsets = array('Q', [0])
+    inside = array('Q')
+    part_blob = bytearray()
+    for part in parts:
+        encoded = part.encode('utf-8')
+        inside.append(_inside(blob, 0, offsets, numbers, len(words), encoded))
+        part_blob += encoded + b'\n'
+        part_offsets.append(len(part_blob))
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(words), slots, len(blob), len(parts), len(part_blob)))
+        table.tofile(f)
+        offsets.tofile(f)
+        numbers.tofile(f)
+        f.write(blob + _padding(len(blob)))
+        part_offsets.tofile(f)
+        inside.tofile(f)
+        f.write(part_blob)
+    os.replace(temporary, path)
+    return len(words)
+
+
+class Vocab:
+    ## the word counts of a dump, memory mapped: nothing is read at load time and
+    ## count() is one hash probe or a few; inside() is a bisect for the fix set's
+    ## words it was built with, and reads all the words once for any other
+
+    def __init__(self, path=vocab_file):
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.size, self.slots, blob_size, self.parts, _ = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ValueError(f"not a vocabulary file of this version (build it again): {path}")
+        self.view = view = memoryview(self.data)
+        start = HEADER.size
+        self.table = view[start:start + 4 * self.slots].cast('I')
+        start += 4 * self.slots
+        self.offsets = view[start:start + 8 * (self.size + 1)].cast('Q')
+        start += 8 * (self.size + 1)
+        self.counts = view[start:start + 8 * self.size].cast('Q')
+        self.blob_start = start + 8 * self.size
+        start = self.blob_start + blob_size + len(_padding(blob_size))
+        self.part_offsets = view[start:start + 8 * (self.parts + 1)].cast('Q')
+        start += 8 * (self.parts + 1)
+        self.inside_counts = view[start:start + 8 * self.parts].cast('Q')
+        self.parts_start = start + 8 * self.parts
+
+    def close(self):
+        for view in (self.table, self.offsets, self.counts, self.part_offsets, self.inside_counts, self.view):
+            view.release()
+        self.data.close()
+        self.file.close()
+
+    def __len__(self):
+        return self.size
+
+    def _entry(self, encoded):
+        slot = _slot(encoded, self.slots)
+        while True:
+            entry = self.table[slot]
+            if not entry:
+                return None
+            entry -= 1
+            start = self.blob_start + self.offsets[entry]
+            end = self.blob_start + self.offsets[entry + 1] - 1
+            if end - start == len(encoded) and self.data[start:end] == encoded:
+                return entry
+            slot = (slot + 1) & (self.slots - 1)
+
+    def count(self, word):
+        entry = self._entry(word.encode('utf-8'))
+        return 0 if entry is None else self.counts[entry]
+
+    def __contains__(self, word):
+        return self._entry(word.encode('utf-8')) is not None
+
+    def word(self, entry):
+        start = self.blob_start + self.offsets[entry]
+        return self.data[start:self.blob_start + self.offsets[entry + 1] - 1].decode('utf-8')
+
+    def _part(self, encoded):
+        low, high = 0, self.parts
+        while low < high:
+            middle = (low + high) // 2
+            start = self.parts_start + self.part_offsets[middle]
+            if self.data[start:self.parts_start + self.part_offsets[middle + 1] - 1] < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.parts:
+            start = self.parts_start + self.part_offsets[low]
+            if self.data[start:self.parts_start + self.part_offsets[low + 1] - 1] == encoded:
+                return low
+        return None
+
+    def inside(self, part):
+        ## occurrences of `part` inside longer words, each word weighted by its count;
+        ## taken at build time for the fix set's words, a tuple added since costs
+        ## a pass over the vocabulary
+        encoded = part.encode('utf-8')
+        entry = self._part(encoded)
+        if entry is not None:
+            return self.inside_counts[entry]
+        return _inside(self.data, self.blob_start, self.offsets, self.counts, self.size, encoded)
+
+
+def rule_words(rule):
+    ## (old word, new word) of a literal tuple that turns one word into another, else None
+    if rule.literal is None or rule.normalize:
+        return None
+    if rule.word is not None:
+        # a detached suffix glued back (word_new None) is not a word for a word
+        old, new = rule.word, rule.word_new or ''
+    else:
+        old, new = rule.literal.strip(), rule.replacement.strip()
+    if not WORD.fullmatch(old) or not WORD.fullmatch(new):
+        return None
+    return old, new
+
+
+def fix_parts(rules):
+    ## the old words of the tuples risky() looks inside longer words for
+    parts = set()
+    for rule in rules:
+        words = rule_words(rule)
+        if words is not None and rule.word is None:
+            parts.add(words[0])
+    return parts
+
+
+def risky(rules, vocab, min_evidence=MIN_EVIDENCE):
+    ## [(rule, standalone, inside, new count, reasons)] for the tuples the dump
+    ## says are likely to change text that was right
+    found = []
+    for rule in rules:
+        words = rule_words(rule)
+        if words is None:
+            continue
+        old, new = words
+        standalone = vocab.count(old)
+        new_count = vocab.count(new)
+        # a whole-word tuple leaves longer words alone
+        inside = vocab.inside(old) if rule.word is None else 0
+        reasons = []
+        if inside >= min_evidence and inside > INSIDE_RATIO * standalone:
+            reasons.append('mostly inside longer words')
+        if standalone >= min_evidence and standalone >= REAL_RATIO * new_count:
+            reasons.append('a word of its own')
+        if reasons:
+            found.append((rule, standalone, inside, new_count, reasons))
+    return found
+
+
+def main():
+    options, positional = handle_args(sys.argv[1:])
+    path = os.path.expanduser(options.get('vocab', vocab_file))
+    fixes, lines = load_fixes(fixes_file)
+    if 'build' in options:
+        start = time.perf_counter()
+        counts_path = os.path.expanduser(options.get('counts', counts_file))
+        if positional or not os.path.exists(counts_path):
+            dump = positional[0] if positional else dump_file
+            counts, pages = count_words(dump, int(options['limit']) if 'limit' in options else None,
+                                        int(options.get('workers', 1)))
+            print(f"{pages} pages counted")
+        else:
+            # the counts typominer.py already took from the dump
+            counts = load_counts(counts_path)
+        size = build_vocab(counts, path, fix_parts(compile_rules(fixes, None, lines)))
+        print(f"{size} words written to {path} ({os.path.getsize(path) / 1e6:.1f} MB) "
+              f"in {time.perf_counter() - start:.0f}s")
+
+    start = time.perf_counter()
+    vocab = Vocab(path)
+    print(f"{len(vocab)} words mapped in {(time.perf_counter() - start) * 1000:.1f} ms")
+    for word in options.get('word', '').split(',') if 'word' in options else []:
+        print(f"{word}: {vocab.count(word)} on its own, {vocab.inside(word)} inside longer words")
+    rules = compile_rules(fixes, options['fix'] or None, lines)
+    found = risky(rules, vocab, int(options.get('evidence', MIN_EVIDENCE)))
+    for rule, standalone, inside, new_count, reasons in found:
+        line = f", line {rule.lineno}" if rule.lineno else ""
+        print(f"{rule.group}[{rule.position}] {rule.old!r} -> {rule.new!r}{line}: {', '.join(reasons)} "
+              f"({standalone} on its own, {inside} inside words, {new_count} of the new form)")
+    print(f"{len(found)} risky tuples of {len(rules)}")
+    vocab.close()
+
+
+if __name__ == "__main__":
+    main()
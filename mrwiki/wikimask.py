@@ -0,0 +1,307 @@
+import re
+import sys
+from bisect import bisect_right
+
+from fixengine import handle_args
+
+# wiki text never holds NUL, so it can stand between the prose spans of a page
+SEPARATOR = '\x00'
+
+# link prefixes whose target is a file or a category name, not article text (en and mr names)
+FILE_NAMESPACES = {'file', 'image', 'media', 'चित्र', 'संचिका', 'प्रतिमा', 'मिडिया'}
+CATEGORY_NAMESPACES = {'category', 'वर्ग'}
+# language and sister project prefixes: [[en:...]], [[hi:...]], [[s:...]], [[zh-min-nan:...]]
+INTERWIKI = re.compile(r'[a-z]{1,3}(?:-[a-z0-9]+)*$')
+
+# tags whose whole body is a citation, code or markup rather than prose
+SKIPPED_TAGS = ('ref', 'references', 'nowiki', 'math', 'chem', 'ce', 'pre', 'source', 'syntaxhighlight',
+                'code', 'gallery', 'score', 'timeline', 'templatedata', 'graph', 'mapframe', 'maplink')
+
+# everything the tokenizer stops at; the rest of the page is passed over by re,
+# and the lookahead keeps it from trying every alternative at every character
+TOKEN = re.compile(
+    r'(?=[<_\[\]{}|=hf/])(?:'
+    r'(?P<comment><!--)'
+    r'|(?P<tag><(?:' + '|'.join(SKIPPED_TAGS) + r')\b[^>]*>)'
+    r'|(?P<html></?[A-Za-z][A-Za-z0-9]*(?:\s[^<>]*)?/?>)'
+    r'|(?P<url>(?:\b(?:https?|ftp)://|(?<=\[)//)[^\s<>\[\]{}|"]+)'
+    r'|(?P<magic>__[A-Z]+__)'
+    r'|(?P<open>\{\{\{|\{\{|\[\[)'
+    r'|(?P<close>\}\}|\]\])'
+    r'|(?P<pipe>\|)'
+    r'|(?P<equals>=))',
+    re.IGNORECASE)
+TAG_NAME = re.compile(r'<([A-Za-z]+)')
+LINK_TARGET = re.compile(r'\s*(:?)\s*([^\[\]{}|<>\n]*)')
+# a template parameter holding a file name: | चित्र = Foo.jpg
+FILE_VALUE = re.compile(r'[ \t]*[^|{}\[\]<>\n=]*?\.(?:jpe?g|png|svg|gif|tiff?|webp|xcf|og[gva]|webm|mp3|wav|flac|'
+                        r'mid|pdf|djvu)[ \t]*(?=\n|\||\}\})', re.IGNORECASE)
+
+_closers = {}
+
+
+def _closing_tag(name):
+    if name not in _closers:
+        _closers[name] = re.compile(rf'</{name}\s*>', re.IGNORECASE)
+    return _closers[name]
+
+
+def skip_zones(text):
+    ## [(start, end)] of what the fixes have to leave alone, sorted and merged:
+    ## template and parameter names, file and category names, interwiki links,
+    ## URLs, comments, html tags and the bodies of <ref>, <nowiki>, <math> and
+    ## the like; one left to right pass with a stack for {{ }} and [[ ]]
+    zones = []
+    # [kind, start, name still open, start of the parameter being read]
+    stack = []
+    pos = 0
+    while True:
+        match = TOKEN.search(text, pos)
+        if not match:
+            break
+        start, pos = match.span()
+        kind = match.lastgroup
+        top = stack[-1] if stack else None
+        if kind in ('open', 'comment', 'tag', 'html', 'url') and top and top[0] == 'template':
+            # a parameter name is plain text
+            top[3] = None
+
+        if kind == 'comment':
+            end = text.find('-->', pos)
+            pos = len(text) if end < 0 else end + 3
+            zones.append((start, pos))
+        elif kind == 'tag':
+            if not match.group().endswith('/>'):
+                closing = _closing_tag(TAG_NAME.match(match.group()).group(1).lower()).search(text, pos)
+                # an unclosed <nowiki> or <ref> runs to the end of the page
+                pos = closing.end() if closing else len(text)
+            zones.append((start, pos))
+        elif kind in ('html', 'url', 'magic'):
+            zones.append((start, pos))
+        elif kind == 'open':
+            opened = match.group()
+            if opened == '{{{':
+                stack.append(['parameter', start, True, None])
+            elif opened == '{{':
+                stack.append(['template', start, True, None])
+            else:
+                colon, target = LINK_TARGET.match(text, pos).groups()
+                prefix = target.partition(':')[0].strip().lower() if ':' in target else None
+                if prefix is not None and not colon and (prefix in CATEGORY_NAMESPACES or INTERWIKI.match(prefix)):
+                    # sort keys and interwiki titles are names too, the whole link goes
+                    end = text.find(']]', pos)
+                    if end >= 0:
+                        pos = end + 2
+                        zones.append((start, pos))
+                        continue
+                masked = prefix is not None and (prefix in FILE_NAMESPACES or prefix in CATEGORY_NAMESPACES
+                                                 or INTERWIKI.match(prefix) is not None)
+                # a file's caption and a [[:en:...|label]] stay prose, only the target is masked
+                stack.append(['link', start, masked, None])
+        elif kind == 'close':
+            want = 'link' if match.group() == ']]' else 'template'
+            if want == 'template' and text.startswith('}}}', start) and top and top[0] == 'parameter':
+                want = 'parameter'
+                pos = start + 3
+            depth = next((i for i in range(len(stack) - 1, -1, -1) if stack[i][0] == want), None)
+            if depth is None:
+                continue
+            while len(stack) > depth:
+                item = stack.pop()
+                if item[0] == 'parameter':
+                    zones.append((item[1], pos))
+                elif item[2]:
+                    # still in the name: up to the end of its line if left open inside
+                    end = pos if len(stack) == depth else _line_end(text, item[1])
+                    zones.append((item[1], end))
+        elif kind == 'pipe':
+            if top and top[2] and top[0] in ('template', 'link'):
+                zones.append((top[1], pos))
+                top[2] = False
+            if top and top[0] == 'template':
+                top[3] = pos
+        elif kind == 'equals':
+            if top and top[0] == 'template' and top[3] is not None:
+                zones.append((top[3], pos))
+                top[3] = None
+                value = FILE_VALUE.match(text, pos)
+                if value:
+                    zones.append(value.span())
+                    pos = value.end()
+    for item in stack:
+        if item[0] == 'parameter' or item[2]:
+            zones.append((item[1], _line_end(text, item[1])))
+    return _merge(zones)
+
+
+def _line_end(text, start):
+    end = text.find('\n', start)
+    return len(text) if end < 0 else end
+
+
+def _merge(zones):
+    merged = []
+    for start, end in sorted(zones):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def prose_spans(text):
+    ## [(start, end)] of the editable text between the skip zones
+    spans = []
+    last = 0
+    for start, end in skip_zones(text):
+        if start > last:
+            spans.append((last, start))
+        last = end
+    if last < len(text):
+        spans.append((last, len(text)))
+    return spans
+
+
+def prose_text(text):
+    ## (prose, spans): the prose spans joined by SEPARATOR, for one fix run per page
+    spans = prose_spans(text)
+    return SEPARATOR.join(text[start:end] for start, end in spans), spans
+
+
+class ProseView:
+    ## the page behind a prose_text(): regex and whole-word tuples run on the
+    ## real text through it, so a lookaround next to a masked <ref> or template
+    ## sees that markup rather than a SEPARATOR, and a match has to lie inside
+    ## one prose span; literal tuples can keep to the joined prose
+
+    def __init__(self, text, spans):
+        # the skip zones around and between the spans, one more than the spans
+        self.gaps = []
+        last = 0
+        for start, end in spans:
+            self.gaps.append(text[last:start])
+            last = end
+        self.gaps.append(text[last:])
+        # the prose the real text, span starts and ends were last built for
+        self.prose = None
+        self.text = text
+        self.starts = []
+        self.ends = []
+
+    def _sync(self, prose):
+        if prose is self.prose or prose == self.prose:
+            return
+        pieces = prose.split(SEPARATOR)
+        if len(pieces) != len(self.gaps) - 1:
+            raise ValueError("prose no longer matches the spans of the page")
+        parts = []
+        starts = []
+        ends = []
+        position = 0
+        for gap, piece in zip(self.gaps, pieces):
+            parts.append(gap)
+            parts.append(piece)
+            position += len(gap)
+            starts.append(position)
+            position += len(piece)
+            ends.append(position)
+        parts.append(self.gaps[-1])
+        self.prose = prose
+        self.text = ''.join(parts)
+        self.starts = starts
+        self.ends = ends
+
+    def sub(self, prose, pattern, replace):
+        ## replace_except() of `pattern` on the real text, `replace(match)` giving
+        ## the replacement; returns (new prose, number of replacements)
+        self._sync(prose)
+        text, starts, ends = self.text, self.starts, self.ends
+        count = 0
+        index = 0
+        while index <= len(text):
+            match = pattern.search(text, index)
+            if not match:
+                break
+            start, end = match.span()
+            span = bisect_right(starts, start) - 1
+            if span < 0 or start > ends[span] or start == ends[span] and end > start:
+                # in a skip zone, go on from the next span
+                index = starts[span + 1] if span + 1 < len(starts) else len(text) + 1
+                continue
+            if end > ends[span]:
+                # runs into a skip zone
+                index = start + 1
+                continue
+            replacement = replace(match)
+            text = text[:start] + replacement + text[end:]
+            shift = len(replacement) - (end - start)
+            if shift:
+                ends[span] += shift
+                for later in range(span + 1, len(starts)):
+                    starts[later] += shift
+                    ends[later] += shift
+            index = start + len(replacement)
+            if start == end:
+                # empty match, move on by one character
+                index += 1
+            count += 1
+        if count:
+            self.text = text
+            self.prose = SEPARATOR.join(text[start:end] for start, end in zip(starts, ends))
+        return self.prose, count
+
+
+def prose_view(text):
+    ## (prose, view) for engine.apply(prose, view=view)
+    prose, spans = prose_text(text)
+    return prose, ProseView(text, spans)
+
+
+def splice(text, spans, prose):
+    ## puts changed prose back between the skip zones
+    pieces = prose.split(SEPARATOR)
+    if len(pieces) != len(spans):
+        raise ValueError("prose no longer matches the spans of the page")
+    parts = []
+    last = 0
+    for (start, end), piece in zip(spans, pieces):
+        parts.append(text[last:start])
+        parts.append(piece)
+        last = end
+    parts.append(text[last:])
+    return ''.join(parts)
+
+
+def apply_prose(engine, text, groups=None):
+    ## engine.apply() on the prose of the page only, same (new_text, counts)
+    prose, spans = prose_text(text)
+    new_prose, counts = engine.apply(prose, groups, view=ProseView(text, spans))
+    if not counts:
+        return text, counts
+    return splice(text, spans, new_prose), counts
+
+
+def main():
+    ## shows a page with its skip zones in ⟦ ⟧, to check what the fixes can touch
+    _, positional = handle_args(sys.argv[1:])
+    if not positional:
+        print("usage: python wikimask.py <page.txt>")
+        return
+    with open(positional[0], encoding='utf-8') as f:
+        text = f.read()
+    parts = []
+    last = 0
+    zones = skip_zones(text)
+    for start, end in zones:
+        parts.append(text[last:start])
+        parts.append('⟦' + text[start:end] + '⟧')
+        last = end
+    parts.append(text[last:])
+    print(''.join(parts))
+    masked = sum(end - start for start, end in zones)
+    print(f"\n{len(zones)} skip zones, {masked} of {len(text)} characters masked")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import re
+
+# a word is a run of letters, digits, matras, virama, nukta, anusvara/chandrabindu and
+# the zero width joiners; danda, punctuation, spaces and wiki markup ( , . | ]] ) end it
+WORD_CHARS = '\\w\u0900-\u0963\u0966-\u097f\ua8e0-\ua8ff\u200c\u200d'
+WORD = re.compile(f'[{WORD_CHARS}]+')
+
+
+def tokenize(text):
+    ## (start, end, word) for every word of the text
+    for match in WORD.finditer(text):
+        yield match.start(), match.end(), match.group()
+
+
+def word_entry(literal, replacement):
+    ## what a space padded tuple means as a whole-word rule:
+    ## ' X ' -> ' Y ' gives (X, Y), ' X ' -> 'X ' (a detached suffix glued back
+    ## onto the word before it, fix12) gives (X, None), anything else None
+    if literal is None or replacement is None or len(literal) < 3:
+        return None
+    if literal[0] != ' ' or literal[-1] != ' ' or not WORD.fullmatch(literal[1:-1]):
+        return None
+    word = literal[1:-1]
+    if replacement == word + ' ':
+        return word, None
+    new = replacement[1:-1]
+    if len(replacement) >= 3 and replacement[0] == ' ' == replacement[-1] and new == new.strip():
+        return word, new
+    return None
+
+
+def word_pattern(word, new):
+    ## (pattern, replacement) of one whole-word tuple on its own; a glue tuple
+    ## (new None) takes the space in front of the suffix with it. The boundary
+    ## in front is checked behind the match, so re can search for the literal
+    escaped = re.escape(word)
+    if new is None:
+        return re.compile(f' {escaped}(?![{WORD_CHARS}])(?<=[{WORD_CHARS}] {escaped})'), word
+    return re.compile(f'{escaped}(?![{WORD_CHARS}])(?<![{WORD_CHARS}]{escaped})'), new
+
+
+class WordPass:
+    ## the whole-word tuples of one group, applied as one pass over the page with
+    ## a dict lookup per word found; where one tuple's output can change what a
+    ## later one matches ('गाव ला च' is 'गाव लाच' once च is glued, and ला is
+    ## then no longer a word of its own), the tuples run one by one instead
+
+    def __init__(self, rules):
+        self.table = {}
+        for rule in rules:
+            # the earlier tuple wins, as it would have run first
+            self.table.setdefault(rule.word, (rule.index, rule.word_new))
+        self.patterns = {index: word_pattern(word, new) for word, (index, new) in self.table.items()}
+        # tuples whose output can be a word of the table: a new word that is one
+        # of the table's or more than one word, a suffix glued into one of them
+        self.creating = {index for word, (index, new) in self.table.items()
+                         if new is not None and (new in self.table or not WORD.fullmatch(new))
+                         or new is None and any(other != word and other.endswith(word) for other in self.table)}
+        # what the pass can put into a page: new words, and suffixes glued onto the word before
+        self.inserted = [new for _, new in self.table.values() if new is not None]
+        self.joined = [word for word, (_, new) in self.table.items() if new is None]
+        # only the words of the table, ending at a word boundary; the start is
+        # checked by hand, a lookbehind in front would keep re from skipping
+        # ahead to the words' first characters
+        alternatives = '|'.join(re.escape(word) for word in sorted(self.table, key=len, reverse=True))
+        self.scanner = re.compile(f'(?:{alternatives})(?![{WORD_CHARS}])')
+
+    def occurring(self, text):
+        return {index for word, (index, _) in self.table.items() if word in text}
+
+    def matches(self, text):
+        ## [(start, end, index, new)] of every place a tuple's pattern matches
+        table = self.table
+        found = []
+        for match in self.scanner.finditer(text):
+            start = match.start()
+            if start and WORD.match(text, start - 1):
+                # the end of a longer word
+                continue
+            index, new = table[match.group()]
+            # a suffix is glued only right after a single space that follows a word
+            if new is not None or start >= 2 and text[start - 1] == ' ' and WORD.match(text, start - 2):
+                found.append((start, match.end(), index, new))
+        return found
+
+    def apply(self, text, view=None):
+        ## returns (new_text, counts) like FixEngine.apply; with the ProseView of
+        ## the page the tuples run one by one on its real text
+        if view is not None:
+            occurring = self.occurring(text)
+            return self._one_by_one(text, min(occurring), view) if occurring else (text, {})
+        found = self.matches(text)
+        counts = {}
+        if not found:
+            return text, counts
+        # a suffix glued onto a matched word takes away that word's boundary
+        if any(index in self.creating for _, _, index, _ in found) or any(
+                new is None and start == previous[1] + 1 for previous, (start, _, _, new) in zip(found, found[1:])):
+            return self._one_by_one(text, min(index for _, _, index, _ in found))
+        parts = []
+        last = 0
+        for start, end, index, new in found:
+            if new is None:
+                parts.append(text[last:start - 1])
+                last = start
+            else:
+                parts.append(text[last:start])
+                parts.append(new)
+                last = end
+            counts[index] = counts.get(index, 0) + 1
+        parts.append(text[last:])
+        return ''.join(parts), counts
+
+    def _one_by_one(self, text, first, view=None):
+        ## each tuple from the `first` that matches on, like apply_plain; one whose
+        ## word is not on the page (any more, or yet) has nothing to do
+        counts = {}
+        for word, (index, _) in self.table.items():
+            if index < first or word not in text:
+                continue
+            pattern, replacement = self.patterns[index]
+            if view is None:
+                text, count = pattern.subn(lambda match: replacement, text)
+            else:
+                text, count = view.sub(text, pattern, lambda match: replacement)
+            if count:
+                counts[index] = count
+        return text, counts
+
+
+def word_passes(rules):
+    ## {index of a group's first whole-word tuple: WordPass}; the pass runs in
+    ## that tuple's place and covers every whole-word tuple of the group
+    groups = {}
+    for rule in rules:
+        if rule.word is not None:
+            groups.setdefault(rule.group, []).append(rule)
+    return {members[0].index: WordPass(members) for members in groups.values()}